@@ -5,7 +5,9 @@ from .base import AgenteBase
 from .coordinador import AgenteCoordinador
 from .investigador import AgenteInvestigador
 from .analista import AgenteAnalista
+from .condensador import AgenteCondensador
+from .traductor import AgenteTraductor
 from .imagenes import AgenteImagenes
 from .generador_html import AgenteGeneradorHTML
 
-__all__ = ['AgenteBase', 'AgenteCoordinador', 'AgenteInvestigador', 'AgenteAnalista', 'AgenteImagenes', 'AgenteGeneradorHTML']
+__all__ = ['AgenteBase', 'AgenteCoordinador', 'AgenteInvestigador', 'AgenteAnalista', 'AgenteCondensador', 'AgenteTraductor', 'AgenteImagenes', 'AgenteGeneradorHTML']
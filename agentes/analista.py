@@ -1,23 +1,96 @@
+import asyncio
+import hashlib
 import json
 import os
-from google import genai
+import re
+import threading
+import time
 from google.genai.errors import APIError
-from dotenv import load_dotenv
+from .backends_llm import con_reintentos, crear_backend
 from .base import AgenteBase
+from .cache_disco import CacheDisco
+from .esquemas import CLAVES_METADATOS, esquema_respuesta, esquema_respuesta_lote, fusionar_builds, validar_build
+from .configuraciones import CONFIG_CACHE_ANALISIS, CONFIG_LOTE_ANALISIS, CONFIG_MAP_REDUCE, NOMBRES_IDIOMA
+from .utilidades import ejecutar_sincrono, emitir, en_hilo, estimar_tokens
+
+# Subir al cambiar la interpretación de la respuesta o algo del prompt que no
+# forme parte de su texto (los cambios de plantilla y de esquema ya cambian el hash).
+VERSION_PROMPT = 2
+
+
+class LectorCamposJSON:
+    """
+    Lee un objeto JSON que llega por partes y devuelve cada campo de primer nivel
+    en cuanto su valor está completo (le sigue ',' o '}'), sin esperar al final.
+    """
+
+    def __init__(self):
+        self.texto = ""
+        self.posicion = None
+        self._decodificador = json.JSONDecoder()
+
+    def alimentar(self, fragmento):
+        self.texto += fragmento
+        if self.posicion is None:
+            inicio = self.texto.find("{")
+            if inicio < 0:
+                return []
+            self.posicion = inicio + 1
+
+        campos = []
+        while True:
+            posicion = self._saltar(self.posicion, " \t\r\n,")
+            try:
+                clave, posicion = self._decodificador.raw_decode(self.texto, posicion)
+                posicion = self._saltar(posicion, " \t\r\n")
+                if self.texto[posicion:posicion + 1] != ":":
+                    break
+                valor, posicion = self._decodificador.raw_decode(self.texto, self._saltar(posicion + 1, " \t\r\n"))
+            except (json.JSONDecodeError, IndexError):
+                break
+            # Un número o literal al final del búfer puede seguir creciendo
+            siguiente = self._saltar(posicion, " \t\r\n")
+            if self.texto[siguiente:siguiente + 1] not in (",", "}"):
+                break
+            if isinstance(clave, str):
+                campos.append((clave, valor))
+            self.posicion = posicion
+        return campos
+
+    def _saltar(self, posicion, caracteres):
+        while posicion < len(self.texto) and self.texto[posicion] in caracteres:
+            posicion += 1
+        return posicion
+
 
 class AgenteAnalista(AgenteBase):
-    def __init__(self, nombre="Analista"):
+    def __init__(self, nombre="Analista", backend=None):
         super().__init__(nombre)
-        load_dotenv()
-        try:
-            self.cliente = genai.Client()
-        except Exception as e:
-            print(f"[{self.nombre}] ERROR: No se pudo inicializar cliente Gemini. Detalle: {e}")
-            self.cliente = None
+        # backend: Gemini o el stub local según CONFIG_LLM (ver backends_llm.py)
+        self.backend = backend or crear_backend()
         
-        self.modelo_completado = "gemini-2.5-flash"
+        self.modelo_completado = self.backend.modelo
+        self.config_generacion = {"response_mime_type": "application/json"}
+        self.cache_analisis = CacheDisco(
+            CONFIG_CACHE_ANALISIS["directorio"], CONFIG_CACHE_ANALISIS["ttl_s"], CONFIG_CACHE_ANALISIS["max_mb"], nombre="CacheAnalisis"
+        )
+        self.metricas_lote = {"personajes": 0, "desde_cache": 0, "llamadas": 0, "reintentos_individuales": 0}
+        # Trabajo perdido: llamadas fallidas y análisis descartados (que obligan a otra fuente)
+        self._candado_metricas = threading.Lock()
+        self.metricas_desperdicio = {
+            "analisis_fallidos": 0, "reintentos_api": 0, "reparaciones": 0, "campos_reparados": 0,
+            "tokens_entrada_perdidos": 0, "ms_perdidos": 0.0
+        }
+        # Prefijo estático del prompt por (juego, idioma, tamaño de equipo, esquema)
+        self._prefijos = {}
+        self._candado_prefijos = threading.Lock()
+        self.metricas_tokens = {"llamadas": 0, "tokens_entrada": 0, "tokens_salida": 0}
 
     def procesar_solicitud(self, datos):
+        """Envoltorio síncrono de procesar_solicitud_async."""
+        return ejecutar_sincrono(self.procesar_solicitud_async(datos))
+
+    async def procesar_solicitud_async(self, datos):
         """
         Espera que datos contenga:
         - juego
@@ -26,54 +99,379 @@ class AgenteAnalista(AgenteBase):
         - esquema_build
         - tamano_equipo
         - idioma_objetivo
+        - notificar (opcional: eventos de progreso y campos parciales en streaming)
         """
-        if not self.cliente:
-            return None
-
         juego = datos['juego']
         nombre_personaje = datos['nombre_personaje']
         contenido_texto = datos['contenido_texto']
         esquema_build = datos['esquema_build']
         tamano_equipo = datos['tamano_equipo']
         idioma_objetivo = datos.get('idioma_objetivo', 'es')
+        notificar = datos.get('notificar')
 
-        return self.analizar_texto_con_gemini(
-            juego, nombre_personaje, contenido_texto, esquema_build, tamano_equipo, idioma_objetivo
+        return await self.analizar_texto_con_gemini_async(
+            juego, nombre_personaje, contenido_texto, esquema_build, tamano_equipo, idioma_objetivo, notificar
         )
 
     def analizar_texto_con_gemini(self, juego, nombre_personaje, contenido_texto, esquema_build, tamano_equipo, codigo_idioma_objetivo="es"):
-        if juego == "HSR":
-            terminos_juego = """
-            **TÉRMINOS CLAVE HSR:**
-            - Light Cone (Cono de Luz / Arma) - Relics (Reliquias / Set de 4 piezas)
-            - Planar Ornaments (Ornamentos Planetarios / Set de 2 piezas)
-            - Estadísticas Únicas: Effect RES, Effect HIT Rate, Break Effect, Energy Regen Rate.
-            """
-            tipo_equipo = "personajes"
-        elif juego == "ZZZ":
-            terminos_juego = """
-            **TÉRMINOS CLAVE ZZZ:**
-            - W-Engine (Motor W / Arma) - Drives (Componentes de 4 piezas)
-            - Sub/Core Drives (Componentes de 2 piezas)
-            - Estadísticas Únicas: Impact Rating, Energy Charge, Anomaly Proficiency, Attribute DMG.
-            """
-            tipo_equipo = "agentes"
-        else: 
-            terminos_juego = """
-            **TÉRMINOS CLAVE GI:**
-            - Weapon (Arma) - Artifacts (Artefactos / Sets de 4 ó 2 piezas combinadas)
-            - Artefactos con Main Stat variable: Sands (Arena del Tiempo), Goblet (Cáliz de Eonotemo), Circlet (Tiara de Logos).
-            - Estadísticas Únicas: Maestria Elemental, Recarga de Energía.
-            """
-            tipo_equipo = "personajes"
+        return ejecutar_sincrono(self.analizar_texto_con_gemini_async(
+            juego, nombre_personaje, contenido_texto, esquema_build, tamano_equipo, codigo_idioma_objetivo
+        ))
+
+    async def analizar_texto_con_gemini_async(self, juego, nombre_personaje, contenido_texto, esquema_build, tamano_equipo, codigo_idioma_objetivo="es", notificar=None, fragmentar=True):
+        prefijo, prompt = self._construir_prompt(juego, nombre_personaje, contenido_texto, esquema_build, tamano_equipo, codigo_idioma_objetivo)
+        config = self._config_generacion(esquema_respuesta(esquema_build))
+        clave_cache = self._clave_cache(prefijo + prompt, config)
+
+        resultado = await en_hilo(self.cache_analisis.obtener, clave_cache)
+        if resultado is not None:
+            print(f"[{self.nombre}] Análisis servido desde caché {self._resumen_cache()}")
+            emitir(notificar, "analisis_completado", desde_cache=True)
+            return resultado
+        if not self.backend.disponible:
+            return None
+
+        # Los fragmentos se analizan con fragmentar=False: nunca se vuelven a partir
+        umbral = CONFIG_MAP_REDUCE["umbral_tokens"].get(juego, 8000)
+        if fragmentar and estimar_tokens(contenido_texto) > umbral:
+            resultado = await self._analizar_por_fragmentos(
+                juego, nombre_personaje, contenido_texto, esquema_build, tamano_equipo, codigo_idioma_objetivo, notificar
+            )
+            if resultado is not None:
+                await en_hilo(self.cache_analisis.guardar, clave_cache, resultado)
+            return resultado
+
+        emitir(notificar, "analisis_iniciado")
+        inicio = time.monotonic()
+        
+        uso = {}
+        try:
+            # Backend síncrono en un hilo: el cliente aio de Gemini guarda conexiones ligadas
+            # a un bucle y Flask crea un bucle nuevo por petición asíncrona.
+            if notificar is not None:
+                texto_respuesta = await en_hilo(
+                    self._generar, lambda: self._generar_en_streaming(prompt, config, notificar, prefijo, uso), prefijo + prompt
+                )
+            else:
+                texto_respuesta = await en_hilo(
+                    self._generar, lambda: self.backend.generar(prompt, config, prefijo=prefijo, uso=uso), prefijo + prompt
+                )
+        except APIError as e:
+            print(f"[{self.nombre}] Error API: {e}")
+            self._registrar_desperdicio(prefijo + prompt, inicio)
+            return None
+        except Exception as e:
+            print(f"[{self.nombre}] Error Desconocido: {e}")
+            self._registrar_desperdicio(prefijo + prompt, inicio)
+            return None
+        self._registrar_uso(uso)
+
+        resultado, invalidos = validar_build(self._interpretar_parcial(texto_respuesta), esquema_build)
+        if invalidos:
+            # Se conserva lo válido y solo se vuelven a pedir los campos rotos
+            resultado = await self._reparar(juego, nombre_personaje, contenido_texto, esquema_build, resultado, invalidos, codigo_idioma_objetivo)
+        if resultado is None:
+            self._registrar_desperdicio(prefijo + prompt, inicio)
+            return None
+
+        await en_hilo(self.cache_analisis.guardar, clave_cache, resultado)
+        print(f"[{self.nombre}] Análisis obtenido de la API {self._resumen_cache()}")
+        emitir(notificar, "analisis_completado", desde_cache=False)
+        return resultado
+
+    async def _analizar_por_fragmentos(self, juego, nombre_personaje, contenido_texto, esquema_build, tamano_equipo, codigo_idioma_objetivo, notificar=None):
+        """
+        Map-reduce: cada fragmento se analiza por separado (en paralelo, con su propia
+        entrada de caché) y las builds parciales se fusionan campo a campo.
+        """
+        fragmentos = self._fragmentar(contenido_texto)
+        print(f"[{self.nombre}] Texto de ~{estimar_tokens(contenido_texto)} tokens: análisis en {len(fragmentos)} fragmentos.")
+        emitir(notificar, "analisis_iniciado", fragmentos=len(fragmentos))
+
+        semaforo = asyncio.Semaphore(CONFIG_MAP_REDUCE["fragmentos_concurrentes"])
+
+        async def _analizar(fragmento):
+            async with semaforo:
+                return await self.analizar_texto_con_gemini_async(
+                    juego, nombre_personaje, fragmento, esquema_build, tamano_equipo, codigo_idioma_objetivo, fragmentar=False
+                )
+
+        parciales = await asyncio.gather(*(_analizar(f) for f in fragmentos))
+        parciales = [p for p in parciales if p]
+        if not parciales:
+            return None
+        resultado = fusionar_builds(parciales, esquema_build)
+        print(f"[{self.nombre}] {len(parciales)}/{len(fragmentos)} fragmentos con build; resultado fusionado.")
+        emitir(notificar, "analisis_completado", desde_cache=False, fragmentos=len(fragmentos))
+        return resultado
+
+    def _fragmentar(self, contenido_texto):
+        """Fragmentos por oraciones de ~tokens_por_fragmento, con solape entre contiguos."""
+        tokens_objetivo = CONFIG_MAP_REDUCE["tokens_por_fragmento"]
+        solape = CONFIG_MAP_REDUCE["solape_oraciones"]
+        max_fragmentos = CONFIG_MAP_REDUCE["max_fragmentos"]
+
+        # Si salieran demasiados se agrandan en lugar de perder el final de la página
+        # (un fragmento de margen para el solape)
+        tokens_objetivo = max(tokens_objetivo, estimar_tokens(contenido_texto) // max(max_fragmentos - 1, 1) + 1)
+        oraciones = [o for o in re.split(r"(?<=[.!?。！？])\s+", contenido_texto) if o.strip()]
+
+        fragmentos = []
+        actual, tokens = [], 0
+        for oracion in oraciones:
+            tokens_oracion = estimar_tokens(oracion)
+            if actual and tokens + tokens_oracion > tokens_objetivo:
+                fragmentos.append(" ".join(actual))
+                actual = actual[-solape:] if solape else []
+                tokens = sum(estimar_tokens(o) for o in actual)
+            actual.append(oracion)
+            tokens += tokens_oracion
+        if actual:
+            fragmentos.append(" ".join(actual))
+        return fragmentos
+
+    async def _reparar(self, juego, nombre_personaje, contenido_texto, esquema_build, build, invalidos, codigo_idioma_objetivo):
+        """
+        Una llamada corta limitada por schema a los campos inválidos. Los que sigan
+        inválidos quedan vacíos (el chequeo de viabilidad del Coordinador decide).
+        Devuelve None solo si no se pudo completar ningún campo de la build.
+        """
+        print(f"[{self.nombre}] Respuesta incompleta; reparando campos: {', '.join(invalidos)}")
+        with self._candado_metricas:
+            self.metricas_desperdicio["reparaciones"] += 1
+
+        prompt = self._construir_prompt_reparacion(juego, nombre_personaje, contenido_texto, esquema_build, invalidos, codigo_idioma_objetivo)
+        config = self._config_generacion(esquema_respuesta(esquema_build, invalidos))
+        try:
+            texto_respuesta = await en_hilo(self._generar, lambda: self.backend.generar(prompt, config), prompt)
+            parche, aun_invalidos = validar_build(self._interpretar_parcial(texto_respuesta), {k: esquema_build[k] for k in invalidos})
+            reparados = [k for k in invalidos if k not in aun_invalidos]
+        except Exception as e:
+            print(f"[{self.nombre}] Reparación fallida: {e}")
+            parche, reparados = {}, []
+
+        build.update({k: parche[k] for k in reparados})
+        with self._candado_metricas:
+            self.metricas_desperdicio["campos_reparados"] += len(reparados)
+        requeridos = [k for k in esquema_build if k not in CLAVES_METADATOS]
+        if not reparados and set(invalidos) >= set(requeridos):
+            return None
+        return build
+
+    def _generar(self, llamada, prompt):
+        """llamada() con reintentos ante errores transitorios; cada reintento cuenta como trabajo perdido."""
+        def _al_reintentar(error):
+            with self._candado_metricas:
+                self.metricas_desperdicio["reintentos_api"] += 1
+                self.metricas_desperdicio["tokens_entrada_perdidos"] += estimar_tokens(prompt)
+        return con_reintentos(self.backend, llamada, _al_reintentar)
+
+    def _registrar_uso(self, uso):
+        """Tokens de entrada y salida de la llamada y acumulados."""
+        if not uso:
+            return
+        with self._candado_metricas:
+            self.metricas_tokens["llamadas"] += 1
+            for clave in ("tokens_entrada", "tokens_salida"):
+                self.metricas_tokens[clave] += uso.get(clave, 0)
+            acumulado = dict(self.metricas_tokens)
+        print(f"[{self.nombre}] Tokens de entrada: {uso.get('tokens_entrada', 0)}; salida: {uso.get('tokens_salida', 0)}. "
+              f"Acumulado: {acumulado['tokens_entrada']} / {acumulado['tokens_salida']} en {acumulado['llamadas']} llamadas")
+
+    def _registrar_desperdicio(self, prompt, inicio):
+        with self._candado_metricas:
+            self.metricas_desperdicio["analisis_fallidos"] += 1
+            self.metricas_desperdicio["tokens_entrada_perdidos"] += estimar_tokens(prompt)
+            self.metricas_desperdicio["ms_perdidos"] += (time.monotonic() - inicio) * 1000
+            resumen = dict(self.metricas_desperdicio)
+        print(f"[{self.nombre}] Análisis descartado. Desperdicio acumulado: {resumen}")
+
+    def _interpretar_parcial(self, texto_salida_llm):
+        """JSON completo si es válido; si no, los campos de primer nivel que llegaron completos."""
+        try:
+            return self._interpretar_respuesta(texto_salida_llm or "")
+        except json.JSONDecodeError:
+            print(f"[{self.nombre}] Error Parseo JSON; se recuperan los campos completos.")
+            lector = LectorCamposJSON()
+            return dict(lector.alimentar(texto_salida_llm or ""))
+
+    def _config_generacion(self, esquema):
+        return dict(self.config_generacion, response_schema=esquema)
+
+    def analizar_lote(self, juego, pares, esquema_build, tamano_equipo, codigo_idioma_objetivo="en"):
+        """Envoltorio síncrono de analizar_lote_async."""
+        return ejecutar_sincrono(self.analizar_lote_async(
+            juego, pares, esquema_build, tamano_equipo, codigo_idioma_objetivo
+        ))
+
+    async def analizar_lote_async(self, juego, pares, esquema_build, tamano_equipo, codigo_idioma_objetivo="en"):
+        """
+        Analiza varios personajes [(nombre_personaje, contenido_texto)] con el mínimo de llamadas:
+        - los que ya están en la caché (misma clave que el análisis individual) no se envían
+        - el resto se agrupa según CONFIG_LOTE_ANALISIS (tokens de entrada y personajes por llamada),
+          con las instrucciones y el esquema una sola vez por llamada
+        - la respuesta se separa por identificador y se valida contra el esquema; los que
+          faltan o no validan se repiten con el análisis individual
+        Devuelve {nombre_personaje: build o None}.
+        """
+        resultados = {}
+        pendientes = []
+        for nombre_personaje, contenido_texto in pares:
+            prefijo, prompt = self._construir_prompt(juego, nombre_personaje, contenido_texto, esquema_build, tamano_equipo, codigo_idioma_objetivo)
+            clave_cache = self._clave_cache(prefijo + prompt, self._config_generacion(esquema_respuesta(esquema_build)))
+            resultado = await en_hilo(self.cache_analisis.obtener, clave_cache)
+            if resultado is not None:
+                resultados[nombre_personaje] = resultado
+            else:
+                pendientes.append((nombre_personaje, contenido_texto, clave_cache))
+
+        lotes = self._empaquetar(juego, pendientes, esquema_build, tamano_equipo, codigo_idioma_objetivo)
+        print(f"[{self.nombre}] Lote de {len(pares)} personajes: {len(resultados)} desde caché, "
+              f"{len(pendientes)} en {len(lotes)} llamadas.")
+
+        semaforo = asyncio.Semaphore(CONFIG_LOTE_ANALISIS["llamadas_concurrentes"])
 
-        nombre_idioma = {
-            "es": "ESPAÑOL", "en": "INGLÉS", "jp": "JAPONÉS", "cn": "CHINO", "fr": "FRANCÉS", 'cr': "COREANO"
-        }.get(codigo_idioma_objetivo.lower(), "ESPAÑOL")
+        async def _con_limite(lote):
+            async with semaforo:
+                return await self._analizar_un_lote(juego, lote, esquema_build, tamano_equipo, codigo_idioma_objetivo)
 
+        respuestas = await asyncio.gather(*(_con_limite(lote) for lote in lotes))
+
+        fallidos = []
+        for lote, builds in zip(lotes, respuestas):
+            for nombre_personaje, contenido_texto, clave_cache in lote:
+                build = builds.get(nombre_personaje)
+                if build:
+                    await en_hilo(self.cache_analisis.guardar, clave_cache, build)
+                    resultados[nombre_personaje] = build
+                else:
+                    fallidos.append((nombre_personaje, contenido_texto))
+
+        if fallidos:
+            print(f"[{self.nombre}] {len(fallidos)} personajes sin resultado válido en el lote; análisis individual.")
+            individuales = await asyncio.gather(*(
+                self.analizar_texto_con_gemini_async(juego, nombre_personaje, contenido_texto, esquema_build, tamano_equipo, codigo_idioma_objetivo)
+                for nombre_personaje, contenido_texto in fallidos
+            ))
+            for (nombre_personaje, _), build in zip(fallidos, individuales):
+                resultados[nombre_personaje] = build
+
+        self.metricas_lote["personajes"] += len(pares)
+        self.metricas_lote["desde_cache"] += len(pares) - len(pendientes)
+        self.metricas_lote["llamadas"] += len(lotes) + len(fallidos)
+        self.metricas_lote["reintentos_individuales"] += len(fallidos)
+        return {nombre_personaje: resultados.get(nombre_personaje) for nombre_personaje, _ in pares}
+
+    def _empaquetar(self, juego, pendientes, esquema_build, tamano_equipo, codigo_idioma_objetivo):
+        """Agrupa en orden hasta llenar el presupuesto de tokens o el máximo de personajes."""
+        base = estimar_tokens(self._construir_prompt_lote(juego, [], esquema_build, tamano_equipo, codigo_idioma_objetivo))
+        max_tokens = CONFIG_LOTE_ANALISIS["max_tokens_entrada"]
+        max_personajes = CONFIG_LOTE_ANALISIS["max_personajes_por_llamada"]
+
+        lotes = []
+        actual, tokens = [], base
+        for pendiente in pendientes:
+            tokens_pendiente = estimar_tokens(pendiente[1]) + 30  # + cabecera de la sección
+            if actual and (tokens + tokens_pendiente > max_tokens or len(actual) >= max_personajes):
+                lotes.append(actual)
+                actual, tokens = [], base
+            actual.append(pendiente)
+            tokens += tokens_pendiente
+        if actual:
+            lotes.append(actual)
+        return lotes
+
+    async def _analizar_un_lote(self, juego, lote, esquema_build, tamano_equipo, codigo_idioma_objetivo):
+        """Una llamada para todo el lote. Devuelve {nombre_personaje: build validada}."""
+        if not self.backend.disponible:
+            return {}
+        ids = {f"p{i + 1}": nombre_personaje for i, (nombre_personaje, _, _) in enumerate(lote)}
+        prompt = self._construir_prompt_lote(
+            juego, [(id_lote, ids[id_lote], texto) for id_lote, (_, texto, _) in zip(ids, lote)],
+            esquema_build, tamano_equipo, codigo_idioma_objetivo
+        )
+        try:
+            config = self._config_generacion(esquema_respuesta_lote(esquema_build, list(ids)))
+            texto_respuesta = await en_hilo(self._generar, lambda: self.backend.generar(prompt, config), prompt)
+            salida = self._interpretar_respuesta(texto_respuesta)
+        except APIError as e:
+            print(f"[{self.nombre}] Error API en lote: {e}")
+            return {}
+        except (json.JSONDecodeError, AttributeError):
+            print(f"[{self.nombre}] Error Parseo JSON en lote.")
+            return {}
+
+        if not isinstance(salida, dict):
+            return {}
+        builds = {}
+        for id_lote, nombre_personaje in ids.items():
+            build, invalidos = validar_build(salida.get(id_lote), esquema_build)
+            # Los incompletos pasan al análisis individual, que sabe reparar campos
+            if not invalidos:
+                builds[nombre_personaje] = build
+        return builds
+
+    def _generar_en_streaming(self, prompt, config, notificar, prefijo=None, uso=None):
+        """Respuesta en streaming: emite cada campo de la build en cuanto llega completo."""
+        lector = LectorCamposJSON()
+        partes = []
+        for fragmento in self.backend.generar_streaming(prompt, config, prefijo=prefijo, uso=uso):
+            partes.append(fragmento)
+            for campo, valor in lector.alimentar(fragmento):
+                emitir(notificar, "campo_parcial", campo=campo, valor=valor)
+        return "".join(partes)
+
+    def _clave_cache(self, prompt, config):
+        """
+        Hash del modelo, la configuración (incluido el schema de respuesta), la versión
+        del prompt y el prompt completo (texto, juego, personaje, esquema e idioma).
+        """
+        material = json.dumps(
+            [self.modelo_completado, config, VERSION_PROMPT, prompt],
+            ensure_ascii=False, sort_keys=True
+        )
+        return "analisis:" + hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def _resumen_cache(self):
+        estadisticas = self.cache_analisis.estadisticas()
+        return f"(caché: {estadisticas['aciertos']} aciertos / {estadisticas['fallos']} fallos, tasa {estadisticas['tasa_aciertos']:.0%})"
+
+    def _interpretar_respuesta(self, texto_salida_llm):
+        texto_salida_llm = texto_salida_llm.strip()
+
+        if texto_salida_llm.startswith('```json'): 
+            texto_salida_llm = texto_salida_llm[7:].strip().rstrip('`')
+            
+        return json.loads(texto_salida_llm)
+
+    def _construir_prompt(self, juego, nombre_personaje, contenido_texto, esquema_build, tamano_equipo, codigo_idioma_objetivo="es"):
+        """
+        (prefijo, resto): el prefijo solo depende del juego, el idioma, el tamaño de equipo
+        y el esquema, así que se construye una vez y se reutiliza entre llamadas.
+        """
+        prefijo = self._prefijo_prompt(juego, esquema_build, tamano_equipo, codigo_idioma_objetivo)
+
+        prompt = f"""PERSONAJE/AGENTE: '{nombre_personaje}'
+
+        TEXTO A ANALIZAR:
+        ---
+        {contenido_texto}
+        ---
+        """
+        return prefijo, prompt
+
+    def _prefijo_prompt(self, juego, esquema_build, tamano_equipo, codigo_idioma_objetivo="es"):
         contenido_json_schema = json.dumps(esquema_build, indent=4, ensure_ascii=False)
+        clave = (juego, codigo_idioma_objetivo.lower(), tamano_equipo, contenido_json_schema)
+        with self._candado_prefijos:
+            prefijo = self._prefijos.get(clave)
+        if prefijo is not None:
+            return prefijo
+
+        terminos_juego, tipo_equipo = self._terminos_juego(juego)
+        nombre_idioma = NOMBRES_IDIOMA.get(codigo_idioma_objetivo.lower(), "ESPAÑOL")
         
-        instruccion_equipo = f"""Busca las 3 composiciones de equipo más relevantes y variadas que incluyan a '{nombre_personaje}'.
+        instruccion_equipo = f"""Busca las 3 composiciones de equipo más relevantes y variadas que incluyan al personaje/agente indicado.
         Cada entrada en la lista 'team_recommendations' debe ser una única CADENA de texto, conteniendo los nombres de los **{tamano_equipo} {tipo_equipo}** separados por comas y TRADUCIDOS al {nombre_idioma}.
         Ejemplo para HSR/GI: ["Acheron, Sparkle, Pela, Lynx", "Blade, Bronya, Pela, Lynx"].
         Ejemplo para ZZZ: ["Billy, Nicole, Corin"].
@@ -86,7 +484,8 @@ class AgenteAnalista(AgenteBase):
         INSTRUCCIÓN DE LOCALIZACIÓN (CRÍTICA): Analiza el 'TEXTO A ANALIZAR'. Debes TRADUCIR y localizar todos los nombres de los ítems (sets, armas/conos/engines), estadísticas y nombres de personajes/agentes al IDIOMA **{nombre_idioma}** ({codigo_idioma_objetivo}) en el JSON de salida.
         """
         
-        prompt = f"""Eres un agente de recopilación de datos de videojuegos. Tu tarea es analizar el siguiente texto de una página de build del juego {juego} del personaje/agente '{nombre_personaje}' y extraer las recomendaciones.
+        # Todo lo estático va delante: el personaje y el texto de la página, al final
+        prefijo = f"""Eres un agente de recopilación de datos de videojuegos. Tu tarea es analizar el texto de una página de build del juego {juego} que aparece al final, para el PERSONAJE/AGENTE indicado justo antes de él, y extraer las recomendaciones.
 
         {terminos_juego}
         {instruccion_equipo}
@@ -97,31 +496,82 @@ class AgenteAnalista(AgenteBase):
         JSON SCHEMA (Solo proporciona los valores, no las claves estáticas):
         {contenido_json_schema}
 
+        """
+        # Dos hilos pueden construir el mismo prefijo a la vez; el primero que se guarda es el que se usa
+        with self._candado_prefijos:
+            return self._prefijos.setdefault(clave, prefijo)
+
+    def _construir_prompt_lote(self, juego, lote, esquema_build, tamano_equipo, codigo_idioma_objetivo="es"):
+        """Un solo bloque de instrucciones y esquema para varios (id, nombre, texto)."""
+        terminos_juego, tipo_equipo = self._terminos_juego(juego)
+        nombre_idioma = NOMBRES_IDIOMA.get(codigo_idioma_objetivo.lower(), "ESPAÑOL")
+        contenido_json_schema = json.dumps(esquema_build, indent=4, ensure_ascii=False)
+
+        secciones = "\n".join(
+            f"""
+        === PERSONAJE {id_lote}: '{nombre_personaje}' ===
+        {contenido_texto}
+        === FIN {id_lote} ==="""
+            for id_lote, nombre_personaje, contenido_texto in lote
+        )
+
+        prompt = f"""Eres un agente de recopilación de datos de videojuegos. Tu tarea es analizar los siguientes textos de páginas de build del juego {juego}, uno por personaje/agente, y extraer las recomendaciones de CADA UNO por separado, usando solo su propio texto.
+
+        {terminos_juego}
+        Para cada personaje, busca las 3 composiciones de equipo más relevantes y variadas que lo incluyan.
+        Cada entrada en la lista 'team_recommendations' debe ser una única CADENA de texto, conteniendo los nombres de los **{tamano_equipo} {tipo_equipo}** separados por comas y TRADUCIDOS al {nombre_idioma}.
+        Si no encuentras 3 composiciones claras, usa la cadena "Equipo No Encontrado" para las entradas faltantes.
+        **IMPORTANTE:** Si la fuente no proporciona estadísticas finales, rellena el diccionario 'final_stats_targets' con cadenas vacías ("").
+
+        INSTRUCCIÓN DE LOCALIZACIÓN (CRÍTICA): Debes TRADUCIR y localizar todos los nombres de los ítems (sets, armas/conos/engines), estadísticas y nombres de personajes/agentes al IDIOMA **{nombre_idioma}** ({codigo_idioma_objetivo}) en el JSON de salida.
+
+        FORMATO DE SALIDA: Debes responder ÚNICAMENTE con un objeto JSON válido cuyas claves sean los identificadores de personaje ({", ".join(id_lote for id_lote, _, _ in lote)}) y cuyos valores sigan este JSON SCHEMA:
+        {contenido_json_schema}
+
+        TEXTOS A ANALIZAR:
+        {secciones}
+        """
+        return prompt
+
+    def _construir_prompt_reparacion(self, juego, nombre_personaje, contenido_texto, esquema_build, campos, codigo_idioma_objetivo="es"):
+        """Prompt corto para volver a pedir solo los campos que llegaron rotos."""
+        nombre_idioma = NOMBRES_IDIOMA.get(codigo_idioma_objetivo.lower(), "ESPAÑOL")
+        sub_esquema = json.dumps({campo: esquema_build[campo] for campo in campos}, indent=4, ensure_ascii=False)
+
+        prompt = f"""Del siguiente texto de una página de build del juego {juego} del personaje/agente '{nombre_personaje}', extrae ÚNICAMENTE estos campos, con los nombres de ítems, estadísticas y personajes en {nombre_idioma} ({codigo_idioma_objetivo}).
+        Responde solo con un objeto JSON válido con este JSON SCHEMA:
+        {sub_esquema}
+
         TEXTO A ANALIZAR:
         ---
         {contenido_texto}
         ---
         """
-        
-        try:
-            respuesta = self.cliente.models.generate_content(
-                model=self.modelo_completado,
-                contents=prompt,
-                config={"response_mime_type": "application/json"} 
-            )
-            texto_salida_llm = respuesta.text.strip()
-
-            if texto_salida_llm.startswith('```json'): 
-                texto_salida_llm = texto_salida_llm[7:].strip().rstrip('`')
-                
-            return json.loads(texto_salida_llm)
+        return prompt
 
-        except APIError as e:
-            print(f"[{self.nombre}] Error API: {e}")
-            return None
-        except json.JSONDecodeError:
-            print(f"[{self.nombre}] Error Parseo JSON.")
-            return None
-        except Exception as e:
-            print(f"[{self.nombre}] Error Desconocido: {e}")
-            return None
+    def _terminos_juego(self, juego):
+        if juego == "HSR":
+            terminos_juego = """
+            **TÉRMINOS CLAVE HSR:**
+            - Light Cone (Cono de Luz / Arma) - Relics (Reliquias / Set de 4 piezas)
+            - Planar Ornaments (Ornamentos Planetarios / Set de 2 piezas)
+            - Estadísticas Únicas: Effect RES, Effect HIT Rate, Break Effect, Energy Regen Rate.
+            """
+            tipo_equipo = "personajes"
+        elif juego == "ZZZ":
+            terminos_juego = """
+            **TÉRMINOS CLAVE ZZZ:**
+            - W-Engine (Motor W / Arma) - Drives (Componentes de 4 piezas)
+            - Sub/Core Drives (Componentes de 2 piezas)
+            - Estadísticas Únicas: Impact Rating, Energy Charge, Anomaly Proficiency, Attribute DMG.
+            """
+            tipo_equipo = "agentes"
+        else: 
+            terminos_juego = """
+            **TÉRMINOS CLAVE GI:**
+            - Weapon (Arma) - Artifacts (Artefactos / Sets de 4 ó 2 piezas combinadas)
+            - Artefactos con Main Stat variable: Sands (Arena del Tiempo), Goblet (Cáliz de Eonotemo), Circlet (Tiara de Logos).
+            - Estadísticas Únicas: Maestria Elemental, Recarga de Energía.
+            """
+            tipo_equipo = "personajes"
+        return terminos_juego, tipo_equipo
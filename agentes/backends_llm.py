@@ -0,0 +1,226 @@
+import hashlib
+import json
+import os
+import random
+import re
+import time
+from abc import ABC, abstractmethod
+from dotenv import load_dotenv
+from .configuraciones import CONFIG_LLM, CONFIG_REINTENTOS_LLM
+from .utilidades import estimar_tokens
+
+
+class BackendLLM(ABC):
+    """
+    Interfaz mínima que usan Analista y Traductor: texto del prompt -> texto de la
+    respuesta. Las llamadas son síncronas (los agentes las ejecutan en un hilo).
+
+    prefijo: parte estática que va delante del prompt (se envía concatenada). uso: si
+    se pasa un dict, se rellena con los tokens de la llamada (tokens_entrada, tokens_salida).
+    """
+
+    nombre = "base"
+    # False si las respuestas pueden ser sintéticas: no deben guardarse como conocimiento
+    # (p. ej. en el glosario del Traductor)
+    respuestas_reales = True
+
+    def __init__(self, modelo):
+        self.modelo = modelo
+
+    @property
+    def disponible(self):
+        return True
+
+    @abstractmethod
+    def generar(self, prompt, config=None, modelo=None, prefijo=None, uso=None):
+        """Devuelve el texto completo de la respuesta."""
+
+    def generar_streaming(self, prompt, config=None, modelo=None, prefijo=None, uso=None):
+        """Fragmentos de texto a medida que llegan (por defecto, uno solo)."""
+        yield self.generar(prompt, config, modelo, prefijo, uso)
+
+    def es_transitorio(self, error):
+        """True si vale la pena repetir la llamada (cuota, sobrecarga, error interno)."""
+        return False
+
+
+def con_reintentos(backend, llamada, al_reintentar=None):
+    """
+    Ejecuta llamada() repitiéndola con backoff exponencial y jitter mientras el
+    backend considere el error transitorio (CONFIG_REINTENTOS_LLM).
+    """
+    config = CONFIG_REINTENTOS_LLM
+    espera = config["espera_inicial_s"]
+    for intento in range(1, config["max_intentos"] + 1):
+        try:
+            return llamada()
+        except Exception as e:
+            if intento == config["max_intentos"] or not backend.es_transitorio(e):
+                raise
+            espera_real = min(espera, config["espera_max_s"]) * random.uniform(0.5, 1.0)
+            print(f"[LLM] Error transitorio ({e}). Reintento {intento}/{config['max_intentos'] - 1} en {espera_real:.1f} s")
+            if al_reintentar:
+                al_reintentar(e)
+            time.sleep(espera_real)
+            espera *= config["factor"]
+
+
+def _clave_prompt(prompt):
+    return hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+
+class BackendGemini(BackendLLM):
+    """
+    google-genai. Si directorio_grabaciones está configurado, guarda cada respuesta
+    por hash del prompt para que BackendStub pueda reproducirla sin red.
+    """
+
+    nombre = "gemini"
+
+    def __init__(self, modelo, directorio_grabaciones=None):
+        super().__init__(modelo)
+        from google import genai
+        load_dotenv()
+        try:
+            self.cliente = genai.Client()
+        except Exception as e:
+            print(f"[LLM] ERROR: No se pudo inicializar cliente Gemini. Detalle: {e}")
+            self.cliente = None
+        self.directorio_grabaciones = directorio_grabaciones
+        if directorio_grabaciones:
+            os.makedirs(directorio_grabaciones, exist_ok=True)
+
+    @property
+    def disponible(self):
+        return self.cliente is not None
+
+    def es_transitorio(self, error):
+        from google.genai.errors import APIError
+        return isinstance(error, APIError) and getattr(error, "code", None) in CONFIG_REINTENTOS_LLM["codigos_transitorios"]
+
+    def generar(self, prompt, config=None, modelo=None, prefijo=None, uso=None):
+        modelo = modelo or self.modelo
+        respuesta = self.cliente.models.generate_content(model=modelo, contents=(prefijo or "") + prompt, config=config)
+        self._anotar_uso(uso, respuesta)
+        self._grabar((prefijo or "") + prompt, respuesta.text)
+        return respuesta.text
+
+    def generar_streaming(self, prompt, config=None, modelo=None, prefijo=None, uso=None):
+        modelo = modelo or self.modelo
+        partes = []
+        for fragmento in self.cliente.models.generate_content_stream(model=modelo, contents=(prefijo or "") + prompt, config=config):
+            # usage_metadata completo llega en el último fragmento
+            self._anotar_uso(uso, fragmento)
+            if fragmento.text:
+                partes.append(fragmento.text)
+                yield fragmento.text
+        self._grabar((prefijo or "") + prompt, "".join(partes))
+
+    def _anotar_uso(self, uso, respuesta):
+        metadatos = getattr(respuesta, "usage_metadata", None)
+        if uso is None or metadatos is None:
+            return
+        uso["tokens_entrada"] = metadatos.prompt_token_count or 0
+        uso["tokens_salida"] = metadatos.candidates_token_count or 0
+
+    def _grabar(self, prompt, texto):
+        if not self.directorio_grabaciones or texto is None:
+            return
+        ruta = os.path.join(self.directorio_grabaciones, _clave_prompt(prompt) + ".json")
+        with open(ruta, 'w', encoding='utf-8') as f:
+            json.dump({"prompt_inicio": prompt[:300], "respuesta": texto}, f, ensure_ascii=False)
+
+
+class BackendStub(BackendLLM):
+    """
+    Backend local determinista para medir el pipeline sin red:
+    - reproduce las respuestas grabadas por BackendGemini (mismo prompt -> misma respuesta)
+    - si no hay grabación, sintetiza una respuesta válida a partir del esquema del prompt
+    - simula la latencia del modelo (fija + por fragmento en streaming)
+    """
+
+    nombre = "stub"
+    respuestas_reales = False
+
+    def __init__(self, modelo="stub-local", directorio_respuestas=None, latencia_ms=0, ms_por_fragmento=0, tamano_fragmento=80):
+        super().__init__(modelo)
+        self.directorio_respuestas = directorio_respuestas
+        self.latencia_ms = latencia_ms
+        self.ms_por_fragmento = ms_por_fragmento
+        self.tamano_fragmento = tamano_fragmento
+        self.metricas = {"llamadas": 0, "grabadas": 0, "sintetizadas": 0}
+
+    def generar(self, prompt, config=None, modelo=None, prefijo=None, uso=None):
+        time.sleep(self.latencia_ms / 1000)
+        texto = self._respuesta((prefijo or "") + prompt)
+        self._anotar_uso(uso, (prefijo or "") + prompt, texto)
+        return texto
+
+    def generar_streaming(self, prompt, config=None, modelo=None, prefijo=None, uso=None):
+        time.sleep(self.latencia_ms / 1000)
+        texto = self._respuesta((prefijo or "") + prompt)
+        self._anotar_uso(uso, (prefijo or "") + prompt, texto)
+        for inicio in range(0, len(texto), self.tamano_fragmento):
+            time.sleep(self.ms_por_fragmento / 1000)
+            yield texto[inicio:inicio + self.tamano_fragmento]
+
+    def _anotar_uso(self, uso, prompt, texto):
+        if uso is None:
+            return
+        uso["tokens_entrada"] = estimar_tokens(prompt)
+        uso["tokens_salida"] = estimar_tokens(texto)
+
+    def _respuesta(self, prompt):
+        self.metricas["llamadas"] += 1
+        if self.directorio_respuestas:
+            ruta = os.path.join(self.directorio_respuestas, _clave_prompt(prompt) + ".json")
+            if os.path.exists(ruta):
+                with open(ruta, 'r', encoding='utf-8') as f:
+                    self.metricas["grabadas"] += 1
+                    return json.load(f)["respuesta"]
+        self.metricas["sintetizadas"] += 1
+        return json.dumps(self._sintetizar(prompt), ensure_ascii=False)
+
+    def _sintetizar(self, prompt):
+        esquema = self._primer_json(prompt, prompt.find("JSON SCHEMA"), "{")
+        if isinstance(esquema, dict):
+            build = self._rellenar(esquema)
+            ids = re.findall(r"=== PERSONAJE (p\d+):", prompt)
+            return {id_lote: build for id_lote in ids} if ids else build
+        # Traducción: lista de cadenas -> se devuelven tal cual
+        textos = self._primer_json(prompt, 0, "[")
+        if isinstance(textos, list):
+            return {t: t for t in textos if isinstance(t, str)}
+        return {}
+
+    def _primer_json(self, prompt, desde, apertura):
+        if desde < 0:
+            return None
+        inicio = prompt.find(apertura, desde)
+        if inicio < 0:
+            return None
+        try:
+            return json.JSONDecoder().raw_decode(prompt, inicio)[0]
+        except json.JSONDecodeError:
+            return None
+
+    def _rellenar(self, valor):
+        if isinstance(valor, dict):
+            return {k: self._rellenar(v) for k, v in valor.items()}
+        if isinstance(valor, list):
+            return [self._rellenar(valor[0]) if valor else "stub"]
+        if isinstance(valor, str):
+            return valor or "stub"
+        return valor
+
+
+def crear_backend(nombre=None):
+    """
+    Backend según CONFIG_LLM["backend"] (o la variable de entorno BACKEND_LLM):
+    "gemini" o "stub".
+    """
+    load_dotenv()
+    nombre = nombre or os.getenv("BACKEND_LLM") or CONFIG_LLM["backend"]
+    if nombre == "stub":
+        return BackendStub(**CONFIG_LLM["stub"])
+    return BackendGemini(CONFIG_LLM["modelo"], CONFIG_LLM.get("directorio_grabaciones"))
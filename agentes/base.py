@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from .utilidades import en_hilo
 
 class AgenteBase(ABC):
     def __init__(self, nombre):
@@ -13,6 +14,14 @@ class AgenteBase(ABC):
         """
         pass
 
+    async def procesar_solicitud_async(self, datos):
+        """
+        Versión asíncrona de procesar_solicitud. Por defecto ejecuta la versión
+        síncrona en un hilo para no bloquear el bucle de eventos; los agentes con
+        E/S propia (navegador, HTTP, Gemini) la sobrescriben.
+        """
+        return await en_hilo(self.procesar_solicitud, datos)
+
     def recibir_mensaje(self, mensaje):
         """
         Implementación del protocolo A2A.
@@ -21,20 +30,37 @@ class AgenteBase(ABC):
         - cuerpo: { ... datos ... }
         """
         # Validación basica del protocolo
-        if not isinstance(mensaje, dict) or "cabecera" not in mensaje or "cuerpo" not in mensaje:
+        if not self._mensaje_valido(mensaje):
             return {"estado": "ERROR", "error": "Formato de mensaje inválido (A2A Protocol Violation)"}
 
         # Enrutar según acción o llamar al procesador por defecto
         # Aqui simplificamos redirigiendo al método existente procesar_solicitud
         try:
             resultado = self.procesar_solicitud(mensaje["cuerpo"])
-            return {
-                "estado": "OK",
-                "cuerpo": resultado,
-                "cabecera_respuesta": {
-                    "de": self.nombre,
-                    "para": mensaje["cabecera"].get("de", "Desconocido")
-                }
-            }
+            return self._respuesta(mensaje, resultado)
         except Exception as e:
             return {"estado": "ERROR", "error": str(e)}
+
+    async def recibir_mensaje_async(self, mensaje):
+        """Protocolo A2A sobre procesar_solicitud_async (mismo sobre de respuesta)."""
+        if not self._mensaje_valido(mensaje):
+            return {"estado": "ERROR", "error": "Formato de mensaje inválido (A2A Protocol Violation)"}
+
+        try:
+            resultado = await self.procesar_solicitud_async(mensaje["cuerpo"])
+            return self._respuesta(mensaje, resultado)
+        except Exception as e:
+            return {"estado": "ERROR", "error": str(e)}
+
+    def _mensaje_valido(self, mensaje):
+        return isinstance(mensaje, dict) and "cabecera" in mensaje and "cuerpo" in mensaje
+
+    def _respuesta(self, mensaje, resultado):
+        return {
+            "estado": "OK",
+            "cuerpo": resultado,
+            "cabecera_respuesta": {
+                "de": self.nombre,
+                "para": mensaje["cabecera"].get("de", "Desconocido")
+            }
+        }
@@ -0,0 +1,161 @@
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+class CacheDisco:
+    """
+    Caché en disco de valores JSON comprimidos con gzip, con TTL por entrada,
+    hash del contenido, expulsión LRU acotada por tamaño y contadores de aciertos.
+    Los metadatos viven en <directorio>/indice.json y cada valor en su propio .gz.
+    """
+
+    def __init__(self, directorio, ttl_s, max_mb, nombre="Cache"):
+        self.nombre = nombre
+        self.directorio = directorio
+        self.ttl_s = ttl_s
+        self.max_bytes = int(max_mb * 1024 * 1024) if max_mb else None
+        os.makedirs(self.directorio, exist_ok=True)
+        self._ruta_indice = os.path.join(self.directorio, "indice.json")
+        self._candado = threading.Lock()
+        self._accesos_sin_guardar = 0
+        self.entradas = self._cargar_indice()
+        self.metricas = {"aciertos": 0, "fallos": 0, "vencidas": 0, "expulsadas": 0}
+
+    # API
+
+    def obtener(self, clave):
+        """Devuelve el valor si existe y no venció; None en caso contrario."""
+        id_entrada = self._id(clave)
+        with self._candado:
+            entrada = self.entradas.get(id_entrada)
+            if not entrada:
+                self.metricas["fallos"] += 1
+                return None
+            if time.time() - entrada["obtenido"] > entrada["ttl_s"]:
+                self.metricas["vencidas"] += 1
+                self.metricas["fallos"] += 1
+                return None
+
+        try:
+            with gzip.open(self._ruta_valor(id_entrada), 'rt', encoding='utf-8') as f:
+                valor = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            with self._candado:
+                self.entradas.pop(id_entrada, None)
+                self.metricas["fallos"] += 1
+            return None
+
+        with self._candado:
+            entrada["ultimo_acceso"] = time.time()
+            self.metricas["aciertos"] += 1
+            self._accesos_sin_guardar += 1
+            if self._accesos_sin_guardar >= 20:
+                self._guardar_indice()
+        return valor
+
+    def guardar(self, clave, valor, ttl_s=None):
+        id_entrada = self._id(clave)
+        serializado = json.dumps(valor, ensure_ascii=False)
+        hash_contenido = hashlib.sha256(serializado.encode('utf-8')).hexdigest()
+        ahora = time.time()
+
+        with self._candado:
+            entrada = self.entradas.get(id_entrada)
+            if not entrada or entrada["hash_contenido"] != hash_contenido:
+                ruta = self._ruta_valor(id_entrada)
+                with gzip.open(ruta, 'wt', encoding='utf-8') as f:
+                    f.write(serializado)
+                entrada = {"clave": clave, "hash_contenido": hash_contenido, "tamano": os.path.getsize(ruta)}
+                self.entradas[id_entrada] = entrada
+            # Mismo contenido: solo se renueva la marca de tiempo
+            entrada.update({"obtenido": ahora, "ultimo_acceso": ahora, "ttl_s": ttl_s or self.ttl_s})
+            self._expulsar()
+            self._guardar_indice()
+
+    def purgar(self, solo_vencidas=False):
+        """Elimina todas las entradas (o solo las vencidas). Devuelve cuántas se borraron."""
+        ahora = time.time()
+        with self._candado:
+            ids = [
+                i for i, e in self.entradas.items()
+                if not solo_vencidas or ahora - e["obtenido"] > e["ttl_s"]
+            ]
+            for id_entrada in ids:
+                self._borrar(id_entrada)
+            self._guardar_indice()
+        return len(ids)
+
+    def estadisticas(self):
+        with self._candado:
+            consultas = self.metricas["aciertos"] + self.metricas["fallos"]
+            return dict(
+                self.metricas,
+                entradas=len(self.entradas),
+                tamano_mb=round(sum(e["tamano"] for e in self.entradas.values()) / (1024 * 1024), 2),
+                tasa_aciertos=round(self.metricas["aciertos"] / consultas, 3) if consultas else 0.0
+            )
+
+    # Internos (llamar con el candado tomado)
+
+    def _expulsar(self):
+        if self.max_bytes is None:
+            return
+        total = sum(e["tamano"] for e in self.entradas.values())
+        if total <= self.max_bytes:
+            return
+        for id_entrada, entrada in sorted(self.entradas.items(), key=lambda item: item[1]["ultimo_acceso"]):
+            if total <= self.max_bytes:
+                break
+            total -= entrada["tamano"]
+            self._borrar(id_entrada)
+            self.metricas["expulsadas"] += 1
+
+    def _borrar(self, id_entrada):
+        self.entradas.pop(id_entrada, None)
+        try:
+            os.remove(self._ruta_valor(id_entrada))
+        except OSError:
+            pass
+
+    def _cargar_indice(self):
+        if os.path.exists(self._ruta_indice):
+            with open(self._ruta_indice, 'r', encoding='utf-8') as f:
+                try:
+                    return json.load(f)
+                except json.JSONDecodeError:
+                    pass
+        return {}
+
+    def _guardar_indice(self):
+        self._accesos_sin_guardar = 0
+        ruta_temporal = self._ruta_indice + ".tmp"
+        with open(ruta_temporal, 'w', encoding='utf-8') as f:
+            json.dump(self.entradas, f, ensure_ascii=False)
+        os.replace(ruta_temporal, self._ruta_indice)
+
+    def _id(self, clave):
+        return hashlib.sha256(clave.encode('utf-8')).hexdigest()[:32]
+
+    def _ruta_valor(self, id_entrada):
+        return os.path.join(self.directorio, id_entrada + ".json.gz")
+
+
+if __name__ == "__main__":
+    # Uso: python -m agentes.cache_disco cache_paginas purgar [--vencidas]
+    #      python -m agentes.cache_disco cache_paginas estadisticas
+    parser = argparse.ArgumentParser(description="Administración de cachés en disco")
+    parser.add_argument("directorio")
+    parser.add_argument("accion", choices=["purgar", "estadisticas"])
+    parser.add_argument("--vencidas", action="store_true", help="purgar solo entradas vencidas")
+    args = parser.parse_args()
+
+    cache = CacheDisco(args.directorio, ttl_s=0, max_mb=None)
+    if args.accion == "purgar":
+        print(f"Entradas eliminadas: {cache.purgar(solo_vencidas=args.vencidas)}")
+    else:
+        print(json.dumps(cache.estadisticas(), indent=4))
@@ -0,0 +1,89 @@
+from collections import Counter
+from difflib import SequenceMatcher
+from .utilidades import normalizar_nombre
+
+
+def trigramas(clave):
+    """Trigramas de la clave con relleno, para que prefijo y sufijo también cuenten."""
+    relleno = f"  {clave} "
+    return {relleno[i:i + 3] for i in range(len(relleno) - 2)}
+
+
+class IndiceDifuso:
+    """
+    Índice de trigramas sobre claves normalizadas (nombres y alias) -> valor.
+    Los trigramas compartidos preseleccionan candidatos sin recorrer todas las
+    claves; los preseleccionados se puntúan con difflib (0..1, 1 = idéntico).
+    """
+
+    def __init__(self, entradas=()):
+        self.valores = {}
+        self.invertido = {}
+        for alias, valor in entradas:
+            self.agregar(alias, valor)
+
+    def agregar(self, alias, valor):
+        clave = normalizar_nombre(alias)
+        if not clave or clave in self.valores:
+            return
+        self.valores[clave] = valor
+        for trigrama in trigramas(clave):
+            self.invertido.setdefault(trigrama, set()).add(clave)
+
+    def obtener(self, alias):
+        """Valor de una clave exacta tras normalizar (sin puntuar), o None."""
+        return self.valores.get(normalizar_nombre(alias))
+
+    def buscar(self, consulta, limite=5, preseleccion=25):
+        """
+        Candidatos ordenados [(valor, puntuacion, clave)], uno por valor distinto.
+        Una coincidencia exacta de clave (o alias) siempre puntúa 1.0.
+        """
+        clave_consulta = normalizar_nombre(consulta)
+        if not clave_consulta:
+            return []
+        if clave_consulta in self.valores:
+            exactos = [(self.valores[clave_consulta], 1.0, clave_consulta)]
+        else:
+            exactos = []
+
+        compartidos = Counter()
+        for trigrama in trigramas(clave_consulta):
+            for clave in self.invertido.get(trigrama, ()):
+                compartidos[clave] += 1
+
+        puntuados = []
+        for clave, _ in compartidos.most_common(preseleccion):
+            if clave != clave_consulta:
+                puntuados.append((self.valores[clave], self._puntuar(clave_consulta, clave), clave))
+        puntuados.sort(key=lambda c: c[1], reverse=True)
+
+        candidatos = []
+        vistos = set()
+        for valor, puntuacion, clave in exactos + puntuados:
+            if valor in vistos:
+                continue
+            vistos.add(valor)
+            candidatos.append((valor, round(puntuacion, 3), clave))
+            if len(candidatos) >= limite:
+                break
+        return candidatos
+
+    def mejor(self, consulta, umbral):
+        """El mejor candidato si supera el umbral y no empata con otro valor; si no None."""
+        candidatos = self.buscar(consulta, limite=2)
+        if not candidatos or candidatos[0][1] < umbral:
+            return None
+        if len(candidatos) > 1 and candidatos[0][1] < 1.0 and candidatos[1][1] == candidatos[0][1]:
+            return None
+        return candidatos[0]
+
+    def __len__(self):
+        return len(self.valores)
+
+    def _puntuar(self, consulta, clave):
+        puntuacion = SequenceMatcher(None, consulta, clave).ratio()
+        # "acheron" frente a "acheronbuild": el prefijo común pesa algo más que una edición
+        if clave.startswith(consulta) or consulta.startswith(clave):
+            puntuacion = min(0.99, puntuacion + 0.05)
+        return puntuacion
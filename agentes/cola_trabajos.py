@@ -0,0 +1,248 @@
+import asyncio
+import heapq
+import json
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+from .configuraciones import CONFIG_COLA_TRABAJOS
+
+ESTADOS_FINALES = ("completado", "fallido", "cancelado", "expirado")
+
+
+class ColaTrabajos:
+    """
+    Cola de trabajos en segundo plano con un número fijo de trabajadores.
+    - prioridad: menor número = antes; a igual prioridad, por orden de llegada
+    - timeout por trabajo (estado "expirado") y cancelación de pendientes o en curso
+    - estado, datos y resultado persistidos en SQLite: los pendientes (y los que
+      estaban en curso al cerrar) se vuelven a encolar al arrancar
+    - eventos de progreso por trabajo (historial en memoria + suscriptores) para SSE
+
+    ejecutar(datos, notificar) es una corrutina que devuelve un resultado serializable en JSON.
+    """
+
+    def __init__(self, ejecutar, config=None):
+        self.nombre = "ColaTrabajos"
+        self.ejecutar = ejecutar
+        self.config = dict(CONFIG_COLA_TRABAJOS, **(config or {}))
+        self._candado = threading.Lock()
+        self._hay_trabajo = threading.Condition(self._candado)
+        self._pendientes = []           # heap (prioridad, creado, id)
+        self._en_curso = {}             # id -> (bucle, tarea)
+        self._cancelados = set()
+        self._eventos = {}              # id -> deque de eventos
+        self._suscriptores = {}         # id -> [queue.Queue]
+        self._trabajadores = []
+
+        self._bd = sqlite3.connect(self.config["ruta_bd"], check_same_thread=False)
+        self._bd.execute("""
+            CREATE TABLE IF NOT EXISTS trabajos (
+                id TEXT PRIMARY KEY, estado TEXT, prioridad INTEGER, datos TEXT, resultado TEXT,
+                error TEXT, timeout_s REAL, creado REAL, iniciado REAL, terminado REAL
+            )
+        """)
+        self._bd.commit()
+        self._recuperar()
+
+    # API
+
+    def iniciar(self):
+        """Lanza los trabajadores. Idempotente."""
+        with self._candado:
+            if self._trabajadores:
+                return
+            for i in range(self.config["trabajadores"]):
+                hilo = threading.Thread(target=self._trabajar, name=f"trabajador-{i}", daemon=True)
+                self._trabajadores.append(hilo)
+                hilo.start()
+
+    def encolar(self, datos, prioridad=None, timeout_s=None):
+        """Devuelve el id del trabajo (no espera a que termine)."""
+        id_trabajo = uuid.uuid4().hex
+        prioridad = self.config["prioridad_por_defecto"] if prioridad is None else prioridad
+        timeout_s = timeout_s or self.config["timeout_s"]
+        creado = time.time()
+        with self._candado:
+            self._bd.execute(
+                "INSERT INTO trabajos (id, estado, prioridad, datos, timeout_s, creado) VALUES (?, 'pendiente', ?, ?, ?, ?)",
+                (id_trabajo, prioridad, json.dumps(datos, ensure_ascii=False), timeout_s, creado)
+            )
+            self._bd.commit()
+            self._eventos[id_trabajo] = deque(maxlen=self.config["max_eventos"])
+            heapq.heappush(self._pendientes, (prioridad, creado, id_trabajo))
+            en_cola = len(self._pendientes)
+            self._hay_trabajo.notify()
+        print(f"[{self.nombre}] Trabajo {id_trabajo[:8]} encolado (prioridad {prioridad}, {en_cola} en cola).")
+        return id_trabajo
+
+    def obtener(self, id_trabajo):
+        """Estado del trabajo como dict (con resultado si terminó), o None si no existe."""
+        with self._candado:
+            fila = self._bd.execute(
+                "SELECT id, estado, prioridad, resultado, error, creado, iniciado, terminado FROM trabajos WHERE id = ?",
+                (id_trabajo,)
+            ).fetchone()
+            posicion = self._posicion(id_trabajo)
+        if not fila:
+            return None
+        trabajo = dict(zip(("id", "estado", "prioridad", "resultado", "error", "creado", "iniciado", "terminado"), fila))
+        trabajo["resultado"] = json.loads(trabajo["resultado"]) if trabajo["resultado"] else None
+        if posicion is not None:
+            trabajo["posicion"] = posicion
+        return trabajo
+
+    def cancelar(self, id_trabajo):
+        """True si el trabajo estaba pendiente o en curso y se canceló."""
+        with self._candado:
+            fila = self._bd.execute("SELECT estado FROM trabajos WHERE id = ?", (id_trabajo,)).fetchone()
+            if not fila or fila[0] in ESTADOS_FINALES:
+                return False
+            self._cancelados.add(id_trabajo)
+            tomado = id_trabajo in self._en_curso
+            en_curso = self._en_curso.get(id_trabajo)
+        if en_curso:
+            bucle, tarea = en_curso
+            bucle.call_soon_threadsafe(tarea.cancel)
+        elif not tomado:
+            # Pendiente: queda en el heap y el trabajador lo descarta al sacarlo
+            self._finalizar(id_trabajo, "cancelado", error="Cancelado antes de empezar.")
+        # Tomado por un trabajador pero sin tarea todavía: _ejecutar lo ve en _cancelados
+        print(f"[{self.nombre}] Trabajo {id_trabajo[:8]} cancelado.")
+        return True
+
+    def suscribir(self, id_trabajo):
+        """
+        Cola con los eventos del trabajo: primero el historial y luego los nuevos.
+        Termina con None cuando el trabajo llega a un estado final.
+        """
+        cola = queue.Queue()
+        with self._candado:
+            for evento in self._eventos.get(id_trabajo, ()):
+                cola.put(evento)
+            fila = self._bd.execute("SELECT estado FROM trabajos WHERE id = ?", (id_trabajo,)).fetchone()
+            if not fila or fila[0] in ESTADOS_FINALES:
+                cola.put(None)
+            else:
+                self._suscriptores.setdefault(id_trabajo, []).append(cola)
+        return cola
+
+    def desuscribir(self, id_trabajo, cola):
+        with self._candado:
+            suscriptores = self._suscriptores.get(id_trabajo, [])
+            if cola in suscriptores:
+                suscriptores.remove(cola)
+
+    # Trabajadores
+
+    def _trabajar(self):
+        while True:
+            with self._candado:
+                while not self._pendientes:
+                    self._hay_trabajo.wait()
+                _, _, id_trabajo = heapq.heappop(self._pendientes)
+                if id_trabajo in self._cancelados:
+                    self._cancelados.discard(id_trabajo)
+                    continue
+                fila = self._bd.execute("SELECT datos, timeout_s FROM trabajos WHERE id = ?", (id_trabajo,)).fetchone()
+                if not fila:
+                    continue
+                self._bd.execute("UPDATE trabajos SET estado = 'en_curso', iniciado = ? WHERE id = ?", (time.time(), id_trabajo))
+                self._bd.commit()
+                # En curso desde ya (sin tarea aún): cancelar() no debe finalizarlo por su cuenta
+                self._en_curso[id_trabajo] = None
+            self._publicar(id_trabajo, {"etapa": "trabajo_iniciado"})
+            try:
+                asyncio.run(self._ejecutar(id_trabajo, json.loads(fila[0]), fila[1]))
+            except Exception as e:
+                # Normalmente _ejecutar ya publicó el estado (y esto no cambia nada); si no
+                # llegó a empezar (datos ilegibles) o falló el cierre del bucle, queda fallido
+                print(f"[{self.nombre}] Advertencia: trabajo {id_trabajo[:8]} terminado con error: {e}")
+                with self._candado:
+                    self._en_curso.pop(id_trabajo, None)
+                self._finalizar(id_trabajo, "fallido", error=str(e))
+
+    async def _ejecutar(self, id_trabajo, datos, timeout_s):
+        """
+        Ejecuta el trabajo y publica su estado final dentro del bucle, sin esperar a que
+        asyncio.run termine de cerrarlo: un timeout o una cancelación se ven al momento.
+        """
+        tarea = asyncio.ensure_future(self.ejecutar(datos, lambda evento: self._publicar(id_trabajo, evento)))
+        with self._candado:
+            self._en_curso[id_trabajo] = (asyncio.get_running_loop(), tarea)
+            cancelado = id_trabajo in self._cancelados
+        if cancelado:
+            tarea.cancel()
+        try:
+            resultado = await asyncio.wait_for(tarea, timeout_s)
+            self._finalizar(id_trabajo, "completado", resultado=resultado)
+        except asyncio.TimeoutError:
+            print(f"[{self.nombre}] Trabajo {id_trabajo[:8]} superó su timeout ({timeout_s:.0f} s).")
+            self._finalizar(id_trabajo, "expirado", error=f"Tiempo límite de {timeout_s:.0f} s superado.")
+        except asyncio.CancelledError:
+            self._finalizar(id_trabajo, "cancelado", error="Cancelado por el usuario.")
+        except Exception as e:
+            print(f"[{self.nombre}] Trabajo {id_trabajo[:8]} fallido: {e}")
+            self._finalizar(id_trabajo, "fallido", error=str(e))
+        finally:
+            with self._candado:
+                self._en_curso.pop(id_trabajo, None)
+                self._cancelados.discard(id_trabajo)
+
+    def _publicar(self, id_trabajo, evento):
+        with self._candado:
+            historial = self._eventos.setdefault(id_trabajo, deque(maxlen=self.config["max_eventos"]))
+            historial.append(evento)
+            suscriptores = list(self._suscriptores.get(id_trabajo, ()))
+        for cola in suscriptores:
+            cola.put(evento)
+
+    def _finalizar(self, id_trabajo, estado, resultado=None, error=None):
+        """Pasa el trabajo a un estado final; no hace nada si ya estaba en uno."""
+        with self._candado:
+            cursor = self._bd.execute(
+                f"UPDATE trabajos SET estado = ?, resultado = ?, error = ?, terminado = ? "
+                f"WHERE id = ? AND estado NOT IN ({', '.join('?' * len(ESTADOS_FINALES))})",
+                (estado, json.dumps(resultado, ensure_ascii=False) if resultado is not None else None, error, time.time(),
+                 id_trabajo, *ESTADOS_FINALES)
+            )
+            self._bd.commit()
+            if not cursor.rowcount:
+                return
+        self._publicar(id_trabajo, {"etapa": "trabajo_terminado", "estado": estado, "error": error})
+        with self._candado:
+            suscriptores = self._suscriptores.pop(id_trabajo, [])
+            self._eventos.pop(id_trabajo, None)
+        for cola in suscriptores:
+            cola.put(None)
+
+    # Persistencia
+
+    def _recuperar(self):
+        """Vuelve a encolar lo que quedó sin terminar y borra los trabajos terminados antiguos."""
+        limite = time.time() - self.config["retencion_s"]
+        with self._candado:
+            self._bd.execute(
+                f"DELETE FROM trabajos WHERE estado IN ({', '.join('?' * len(ESTADOS_FINALES))}) AND terminado < ?",
+                (*ESTADOS_FINALES, limite)
+            )
+            filas = self._bd.execute(
+                "SELECT id, prioridad, creado FROM trabajos WHERE estado IN ('pendiente', 'en_curso')"
+            ).fetchall()
+            self._bd.execute("UPDATE trabajos SET estado = 'pendiente', iniciado = NULL WHERE estado = 'en_curso'")
+            self._bd.commit()
+            for id_trabajo, prioridad, creado in filas:
+                self._eventos[id_trabajo] = deque(maxlen=self.config["max_eventos"])
+                heapq.heappush(self._pendientes, (prioridad, creado, id_trabajo))
+        if filas:
+            print(f"[{self.nombre}] {len(filas)} trabajos sin terminar recuperados del almacén.")
+
+    def _posicion(self, id_trabajo):
+        """Posición (1 = el siguiente) de un trabajo pendiente; None si no está en cola. Con el candado tomado."""
+        orden = sorted(e for e in self._pendientes if e[2] not in self._cancelados)
+        for posicion, (_, _, id_pendiente) in enumerate(orden, start=1):
+            if id_pendiente == id_trabajo:
+                return posicion
+        return None
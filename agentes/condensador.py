@@ -0,0 +1,139 @@
+import re
+import threading
+from .base import AgenteBase
+from .configuraciones import CONFIG_CONDENSACION, VOCABULARIO_BUILD
+from .utilidades import estimar_tokens, normalizar_nombre
+
+# Frases típicas de navegación, pie de página, comentarios y avisos legales
+PATRON_BOILERPLATE = re.compile(
+    r"cookie|privacy policy|política de privacidad|terms of (use|service)|all rights reserved|©|copyright"
+    r"|sign in|log in|iniciar sesión|subscribe|suscríbete|newsletter|follow us|síguenos|share on|compartir en"
+    r"|leave a (comment|reply)|deja un comentario|\breply\b|responder|comments?\s*\(\d+\)|advertisement|publicidad"
+    r"|read more|leer más|you (might|may) also like|related (posts|articles)|back to top|skip to content"
+    r"|コメント|ログイン|広告|利用規約|プライバシー",
+    re.IGNORECASE
+)
+
+PATRON_ORACION = re.compile(r"(?<=[.!?。！？])\s+")
+
+_patrones_vocabulario = {}
+
+
+def patron_vocabulario(juego):
+    """Regex precompilada del vocabulario del juego (límites de palabra en términos latinos)."""
+    patron = _patrones_vocabulario.get(juego)
+    if patron is None:
+        terminos = sorted(VOCABULARIO_BUILD.get(juego, VOCABULARIO_BUILD["HSR"]), key=len, reverse=True)
+        partes = [rf"\b{re.escape(t)}\b" if t.isascii() else re.escape(t) for t in terminos]
+        patron = _patrones_vocabulario[juego] = re.compile("|".join(partes))
+    return patron
+
+
+class AgenteCondensador(AgenteBase):
+    """
+    Etapa entre Investigador y Analista: elimina texto repetitivo y de navegación,
+    quita oraciones duplicadas, puntúa fragmentos por vocabulario de build y
+    recorta el texto al presupuesto de tokens del juego.
+    """
+
+    def __init__(self, nombre="Condensador"):
+        super().__init__(nombre)
+        self._candado = threading.Lock()
+        self.metricas = {"textos": 0, "tokens_antes": 0, "tokens_despues": 0}
+
+    def procesar_solicitud(self, datos):
+        """
+        Espera que datos contenga:
+        - juego
+        - nombre_personaje
+        - contenido_texto
+        - presupuesto_tokens (opcional: por defecto el del juego en CONFIG_CONDENSACION)
+        """
+        juego = datos['juego']
+        nombre_personaje = datos['nombre_personaje']
+        contenido_texto = datos['contenido_texto']
+        presupuesto = datos.get('presupuesto_tokens')
+
+        tokens_antes = estimar_tokens(contenido_texto)
+        texto_condensado = self.condensar(contenido_texto, juego, nombre_personaje, presupuesto)
+        tokens_despues = estimar_tokens(texto_condensado)
+
+        with self._candado:
+            self.metricas["textos"] += 1
+            self.metricas["tokens_antes"] += tokens_antes
+            self.metricas["tokens_despues"] += tokens_despues
+        print(f"[{self.nombre}] Tokens de entrada estimados: {tokens_antes} -> {tokens_despues} "
+              f"({100 * (1 - tokens_despues / max(tokens_antes, 1)):.0f}% menos)")
+
+        return {"contenido_texto": texto_condensado, "tokens_antes": tokens_antes, "tokens_despues": tokens_despues}
+
+    def condensar(self, contenido_texto, juego, nombre_personaje, presupuesto=None):
+        if not contenido_texto:
+            return contenido_texto
+
+        oraciones = self._oraciones_unicas(contenido_texto)
+        fragmentos = self._agrupar(oraciones)
+        presupuesto = presupuesto or CONFIG_CONDENSACION["presupuesto_tokens"].get(juego, 6000)
+
+        total = sum(f["tokens"] for f in fragmentos)
+        if total <= presupuesto:
+            return " ".join(f["texto"] for f in fragmentos)
+
+        vocabulario = patron_vocabulario(juego)
+        clave_personaje = normalizar_nombre(nombre_personaje)
+        for fragmento in fragmentos:
+            fragmento["puntuacion"] = self._puntuar(fragmento, vocabulario, clave_personaje)
+
+        # Los fragmentos más relevantes hasta agotar el presupuesto, en su orden original
+        elegidos = set()
+        usados = 0
+        for fragmento in sorted(fragmentos, key=lambda f: f["puntuacion"], reverse=True):
+            if fragmento["puntuacion"] <= 0:
+                break
+            if usados + fragmento["tokens"] > presupuesto:
+                continue
+            elegidos.add(fragmento["posicion"])
+            usados += fragmento["tokens"]
+
+        return " ".join(f["texto"] for f in fragmentos if f["posicion"] in elegidos)
+
+    def _oraciones_unicas(self, contenido_texto):
+        max_caracteres = CONFIG_CONDENSACION["max_caracteres_oracion"]
+        vistas = set()
+        oraciones = []
+        for oracion in PATRON_ORACION.split(contenido_texto):
+            # get_text() une tablas y listas sin puntuación: se cortan las oraciones enormes
+            for trozo in self._trocear(oracion.strip(), max_caracteres):
+                if len(trozo) < 3 or (len(trozo) < 200 and PATRON_BOILERPLATE.search(trozo)):
+                    continue
+                clave = re.sub(r"\W+", "", trozo.lower())
+                if clave in vistas:
+                    continue
+                vistas.add(clave)
+                oraciones.append(trozo)
+        return oraciones
+
+    def _trocear(self, oracion, max_caracteres):
+        while len(oracion) > max_caracteres:
+            corte = oracion.rfind(" ", 0, max_caracteres)
+            corte = corte if corte > 0 else max_caracteres
+            yield oracion[:corte]
+            oracion = oracion[corte:].strip()
+        if oracion:
+            yield oracion
+
+    def _agrupar(self, oraciones):
+        tamano = CONFIG_CONDENSACION["oraciones_por_fragmento"]
+        fragmentos = []
+        for posicion, inicio in enumerate(range(0, len(oraciones), tamano)):
+            texto = " ".join(oraciones[inicio:inicio + tamano])
+            fragmentos.append({"posicion": posicion, "texto": texto, "tokens": estimar_tokens(texto)})
+        return fragmentos
+
+    def _puntuar(self, fragmento, vocabulario, clave_personaje):
+        texto = fragmento["texto"].lower()
+        aciertos = len(vocabulario.findall(texto))
+        if clave_personaje and clave_personaje in normalizar_nombre(texto):
+            aciertos += 3
+        # Densidad: aciertos por cada 100 tokens, para no premiar solo la longitud
+        return 100 * aciertos / max(fragmento["tokens"], 1)
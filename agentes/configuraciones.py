@@ -6,6 +6,73 @@ FUENTE_GENSHINLAB = "GenshinLab"
 FUENTE_GENSHINBUILD = "GenshinBuilds"
 FUENTE_GAMEWITH = "GameWithJP"
 
+# Configuración por Fuente
+# - dominio: prefijo para enlaces relativos
+# - patron_enlace: regex que identifica enlaces a personajes en el listado
+# - renderizado_js: True si el contenido solo existe tras ejecutar JS (va directo a Playwright)
+# - preparacion / preparacion_listado: cuándo dar por lista la página de build / el listado.
+#   tipo "selector" (aparece el contenido), "red_inactiva" (networkidle) o "dom_estable"
+#   (el tamaño del DOM deja de cambiar). timeout_ms opcional.
+# - bloqueo: listas propias que se suman a CONFIG_BLOQUEO_RECURSOS
+#   (bloquear_tipos, bloquear_dominios y permitir_dominios, que exime a un dominio de todo bloqueo)
+
+CONFIG_FUENTES = {
+    FUENTE_PRYDWEN: {
+        "dominio": "https://www.prydwen.gg",
+        "patron_enlace": r"/(characters|agents)/[\w-]+/?$",
+        "renderizado_js": True,  # Las pestañas de build se hidratan en cliente
+        "preparacion": {"tipo": "selector", "selector": "div#page-content"},
+        "preparacion_listado": {
+            "tipo": "selector", "selector": 'a[href*="/agents/"], a[href*="/characters/"]',
+            "timeout_ms": 20000, "espera_fija_previa_ms": 0  # Ya esperaba por selector
+        },
+        "bloqueo": {"bloquear_dominios": ["nitropay.com", "snigelweb.com"]}
+    },
+    FUENTE_GAME8: {
+        "dominio": "https://game8.co",
+        "patron_enlace": r"/archives/\d+",
+        "renderizado_js": False,
+        "preparacion": {"tipo": "selector", "selector": "article"},
+        "preparacion_listado": {"tipo": "dom_estable"},
+        "bloqueo": {"bloquear_tipos": ["stylesheet"], "bloquear_dominios": ["gamerch.com", "ad-stir.com"]}
+    },
+    FUENTE_HONKAILAB: {
+        "dominio": "https://honkailab.com",
+        "patron_enlace": r"-build/?$",
+        "renderizado_js": False,
+        "preparacion": {"tipo": "selector", "selector": "div.entry-content"},
+        "preparacion_listado": {"tipo": "selector", "selector": 'div.entry-content a[href*="-build"]'},
+        "bloqueo": {"bloquear_tipos": ["stylesheet"], "bloquear_dominios": ["ezoic.net", "ezojs.com"]}
+    },
+    FUENTE_GENSHINLAB: {
+        "dominio": "https://genshinlab.com",
+        "patron_enlace": r"-build/?$",
+        "renderizado_js": False,
+        "preparacion": {"tipo": "selector", "selector": "div.entry-content"},
+        "preparacion_listado": {"tipo": "selector", "selector": 'div.entry-content a[href*="-build"]'},
+        "bloqueo": {"bloquear_tipos": ["stylesheet"], "bloquear_dominios": ["ezoic.net", "ezojs.com"]}
+    },
+    FUENTE_GENSHINBUILD: {
+        "dominio": "https://genshin-builds.com",
+        "patron_enlace": r"/characters/[\w-]+/?$",
+        "renderizado_js": False,
+        "preparacion": {"tipo": "red_inactiva"},
+        "preparacion_listado": {"tipo": "selector", "selector": 'a[href*="/characters/"]'},
+        "bloqueo": {"bloquear_dominios": ["venatus.com", "fuseplatform.net"]}
+    },
+    FUENTE_GAMEWITH: {
+        "dominio": "https://gamewith.jp",
+        "patron_enlace": r"/genshin/article/show/(\d+)",
+        "renderizado_js": False,
+        "preparacion": {"tipo": "selector", "selector": "div.gdb_col_content, div#page_content"},
+        "preparacion_listado": {"tipo": "dom_estable"},
+        "bloqueo": {
+            "bloquear_tipos": ["stylesheet"],
+            "bloquear_dominios": ["gmossp-sp.jp", "i-mobile.co.jp", "microad.jp", "fluct.jp"]
+        }
+    }
+}
+
 # Configuraciones de Juegos
 
 CONFIG_HSR = {
@@ -16,6 +83,11 @@ CONFIG_HSR = {
     "segmento_ruta_secundaria": "/Honkai-Star-Rail-",
     "url_base_terciaria": "https://honkailab.com/honkai-star-rail-characters/",
     "segmento_ruta_terciaria": "/honkai-star-rail-characters/",
+    "listados": [
+        (FUENTE_PRYDWEN, "url_base_primaria", "segmento_ruta_primaria"),
+        (FUENTE_GAME8, "url_base_secundaria", "segmento_ruta_secundaria"),
+        (FUENTE_HONKAILAB, "url_base_terciaria", "segmento_ruta_terciaria")
+    ],
     
     "ruta_archivo": 'hsr_builds.json',
     "tamano_equipo": 4, 
@@ -50,6 +122,11 @@ CONFIG_ZZZ = {
     "segmento_ruta_secundaria": "/Zenless-Zone-Zero-", 
     "url_base_terciaria": "https://genshinlab.com/zenless-zone-zerozzz-characters/",
     "segmento_ruta_terciaria": "/zenless-zone-zerozzz-characters/",
+    "listados": [
+        (FUENTE_PRYDWEN, "url_base_primaria", "segmento_ruta_primaria"),
+        (FUENTE_GAME8, "url_base_secundaria", "segmento_ruta_secundaria"),
+        (FUENTE_GENSHINLAB, "url_base_terciaria", "segmento_ruta_terciaria")
+    ],
     
     "ruta_archivo": 'zzz_builds.json',
     "tamano_equipo": 3, 
@@ -85,7 +162,11 @@ CONFIG_GI = {
         "furina": "407254",
         "navia": "426179", 
         "neuvillette": "399451"
-    },
+    }, # Semilla; el índice completa el resto al rastrear GameWith (nombres japoneses de ALIAS_PERSONAJES)
+    "listados": [
+        (FUENTE_GENSHINBUILD, "url_base_primaria", "segmento_ruta_primaria"),
+        (FUENTE_GAMEWITH, "url_base_secundaria", "segmento_ruta_secundaria")
+    ],
     
     "ruta_archivo": 'gi_builds.json',
     "tamano_equipo": 4, 
@@ -109,3 +190,315 @@ CONFIG_GI = {
         "team_recommendations": []
     }
 }
+
+# Configuración del Pool de Navegadores (Chromium compartido entre agentes)
+
+CONFIG_POOL_NAVEGADORES = {
+    # Navegadores vivos = páginas concurrentes máximas. None: trabajadores de la cola ×
+    # tareas simultáneas de un trabajo (todas sus fuentes en cobertura + la búsqueda de imágenes)
+    "tamano": None,
+    "max_paginas_por_navegador": 40,  # Reciclar el navegador tras N páginas
+    "max_memoria_mb": 600,            # Reciclar si el heap JS observado supera este valor
+    "timeout_tarea_s": 180,           # Desde que un navegador empieza la tarea (la espera en cola no cuenta)
+    "args_lanzamiento": ['--ignore-certificate-errors', '--ignore-ssl-errors']
+}
+
+# Configuración del Índice de Personajes (listados de cada fuente)
+
+CONFIG_INDICE_PERSONAJES = {
+    "ruta_archivo": "indice_personajes.json",
+    "ttl_s": 24 * 3600
+}
+
+# Configuración del Cliente HTTP (ruta rápida antes de Playwright)
+
+CONFIG_HTTP = {
+    "directorio_copias": "cache_http",  # Copia local para revalidar con ETag / Last-Modified
+    "ttl_copias_s": 30 * 24 * 3600,     # Más antigua: se descarga de nuevo sin GET condicional
+    "max_mb_copias": 200,               # LRU: se expulsan las copias menos usadas
+    "timeout_s": 20,
+    "max_conexiones": 10,
+    "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+}
+
+# Bloqueo de Recursos en las páginas del Investigador (solo se usa el texto)
+
+CONFIG_BLOQUEO_RECURSOS = {
+    "bloquear_tipos": ["image", "font", "media", "beacon", "ping"],
+    "bloquear_dominios": [
+        "googletagmanager.com", "google-analytics.com", "doubleclick.net", "googlesyndication.com",
+        "adservice.google.com", "amazon-adsystem.com", "adnxs.com", "criteo.com", "criteo.net",
+        "taboola.com", "outbrain.com", "scorecardresearch.com", "quantserve.com", "hotjar.com",
+        "facebook.net", "connect.facebook.net", "cloudflareinsights.com", "pubmatic.com", "rubiconproject.com"
+    ],
+    # Tamaño medio estimado por tipo, para reportar bytes ahorrados (no se descargan, no se pueden medir)
+    "bytes_estimados": {"image": 60000, "font": 40000, "media": 400000, "stylesheet": 25000, "script": 35000, "otro": 5000}
+}
+
+# Caché de Páginas (texto extraído por el Investigador, comprimido en disco)
+# Purga manual: python -m agentes.cache_disco cache_paginas purgar [--vencidas]
+
+CONFIG_CACHE_PAGINAS = {
+    "directorio": "cache_paginas",
+    "ttl_s": 3 * 24 * 3600,  # Las guías cambian aprox. semanalmente
+    "max_mb": 200
+}
+
+# Caché de Análisis (resultados de Gemini por hash de modelo + versión de prompt + prompt completo)
+# Purga manual: python -m agentes.cache_disco cache_analisis purgar [--vencidas]
+
+CONFIG_CACHE_ANALISIS = {
+    "directorio": "cache_analisis",
+    "ttl_s": 7 * 24 * 3600,
+    "max_mb": 50
+}
+
+# Backend del Modelo (agentes/backends_llm.py)
+# - gemini: google-genai; con directorio_grabaciones guarda cada respuesta por hash del prompt
+# - stub: local y determinista; reproduce las grabaciones o sintetiza una build del esquema
+# También se puede elegir con la variable de entorno BACKEND_LLM.
+
+CONFIG_LLM = {
+    "backend": "gemini",
+    "modelo": "gemini-2.5-flash",
+    "directorio_grabaciones": None,
+    "stub": {
+        "directorio_respuestas": "respuestas_llm",
+        "latencia_ms": 3000,        # Tiempo típico de una extracción con gemini-2.5-flash
+        "ms_por_fragmento": 40,
+        "tamano_fragmento": 80
+    }
+    # Sin caché de prefijo: el prefijo estático del prompt (~600 tokens con las plantillas
+    # actuales) no llega al mínimo de 1024 tokens de la caché de Gemini, ni explícita ni
+    # implícita, así que cada llamada paga todos sus tokens de entrada.
+}
+
+# Map-Reduce para páginas enormes: por encima del umbral (tokens estimados, por juego)
+# el texto se parte en fragmentos que se analizan en paralelo y se fusionan campo a campo.
+
+CONFIG_MAP_REDUCE = {
+    "umbral_tokens": {"HSR": 8000, "ZZZ": 8000, "GI": 10000},  # GameWith (japonés) rinde menos texto por token
+    "tokens_por_fragmento": 4000,
+    "solape_oraciones": 2,          # Oraciones repetidas entre fragmentos contiguos
+    "max_fragmentos": 8,
+    "fragmentos_concurrentes": 3
+}
+
+# Reintentos ante errores transitorios del modelo (backoff exponencial con jitter)
+
+CONFIG_REINTENTOS_LLM = {
+    "max_intentos": 4,
+    "espera_inicial_s": 1.0,
+    "factor": 2.0,
+    "espera_max_s": 20.0,
+    "codigos_transitorios": [429, 500, 502, 503, 504]
+}
+
+# Análisis por Lotes (varios personajes por llamada al modelo, p. ej. al refrescar un roster)
+# La salida (~1-2k tokens por build) limita cuántos caben por llamada antes que la entrada.
+
+CONFIG_LOTE_ANALISIS = {
+    "max_tokens_entrada": 120000,
+    "max_personajes_por_llamada": 8,
+    "llamadas_concurrentes": 2
+}
+
+# Coordinación de Fuentes
+# - secuencial: prueba las fuentes una tras otra (comportamiento original)
+# - cobertura: lanza la siguiente fuente si la preferida no terminó en retraso_cobertura_s
+# - carrera: lanza todas a la vez
+# En todos los modos gana la fuente viable de mayor prioridad.
+
+CONFIG_COORDINACION = {
+    "modo_fuentes": "cobertura",
+    "retraso_cobertura_s": 20
+}
+
+# Estadísticas por juego y fuente (estadisticas_fuentes.py). Sin fuente elegida por el
+# usuario, las fuentes se prueban por tiempo esperado hasta una build viable.
+
+CONFIG_ESTADISTICAS_FUENTES = {
+    "ruta_archivo": "estadisticas_fuentes.json",
+    "orden_adaptativo": True,
+    "vida_media_s": 3 * 24 * 3600,  # Peso de un intento a los 3 días: la mitad
+    "alfa_media": 0.2,              # Medias móviles de latencias y longitudes
+    "latencia_inicial_ms": 30000,   # Supuesta mientras una fuente no tiene historial
+    "previa_viables": 1,            # Previa de éxito 1/2 (empate = orden configurado)
+    "previa_intentos": 2,
+    "min_caracteres": 500           # Igual que el mínimo del Investigador
+}
+
+# Builds guardadas (*_builds.json) como respuesta directa, stale-while-revalidate:
+# - más reciente que frescura_s[juego][fuente]: se sirve sin rastrear
+# - más antigua (hasta max_antiguedad_s): se sirve y se refresca en segundo plano
+# - sin entrada, de otra fuente que la elegida, sin fecha (_actualizado, entradas anteriores
+#   al almacén) o más antigua que max_antiguedad_s: se calcula en la petición
+# Se sirve en cualquier idioma: la build guarda el suyo (_idioma) y se traduce al pedido.
+# usar_almacen=False vuelve al comportamiento original (siempre rastrear y analizar).
+
+CONFIG_ALMACEN_BUILDS = {
+    "usar_almacen": True,
+    "frescura_s": {
+        "HSR": {FUENTE_PRYDWEN: 3 * 24 * 3600, FUENTE_HONKAILAB: 3 * 24 * 3600},
+        "ZZZ": {FUENTE_PRYDWEN: 3 * 24 * 3600, FUENTE_GENSHINLAB: 3 * 24 * 3600},
+        "GI": {FUENTE_GENSHINBUILD: 7 * 24 * 3600, FUENTE_GAMEWITH: 3 * 24 * 3600}
+    },
+    "frescura_por_defecto_s": 3 * 24 * 3600,
+    "max_antiguedad_s": 30 * 24 * 3600
+}
+
+# Cola de Trabajos: /chat encola la generación de la build y responde con el id al instante.
+# Prioridad: menor número = antes. Los trabajos se guardan en SQLite y sobreviven a un reinicio.
+
+CONFIG_COLA_TRABAJOS = {
+    "ruta_bd": "trabajos.sqlite3",
+    "trabajadores": 2,              # Pipelines completos a la vez (cada uno usa navegador y Gemini)
+    "timeout_s": 300,
+    "prioridad_por_defecto": 5,
+    "prioridad_build_guardada": 1,  # Se sirven desde *_builds.json: no bloquean la cola
+    "retencion_s": 24 * 3600,       # Trabajos terminados que se conservan para consulta
+    "max_eventos": 200              # Historial de eventos por trabajo para suscriptores tardíos
+}
+
+# Vocabulario de Builds por Juego (es / en / jp, según las fuentes configuradas)
+# Lo usa el Condensador para puntuar la relevancia de cada fragmento de texto.
+
+VOCABULARIO_COMUN = [
+    "build", "team", "equipo", "teams", "main stat", "substat", "sub stat", "stats", "estadística",
+    "best", "mejor", "recommended", "recomendad", "bis", "4-piece", "2-piece", "4 piezas", "2 piezas",
+    "crit rate", "crit dmg", "tasa crit", "daño crit", "atk", "hp", "def", "dps", "support", "soporte",
+    "編成", "おすすめ", "最強", "会心率", "会心ダメージ", "攻撃力", "メイン", "サブ"
+]
+
+VOCABULARIO_BUILD = {
+    "HSR": VOCABULARIO_COMUN + [
+        "light cone", "cono de luz", "conos de luz", "relic", "reliquia", "planar", "ornament", "ornamento",
+        "body", "feet", "planar sphere", "link rope", "cuerpo", "pies", "esfera", "cuerda",
+        "spd", "speed", "velocidad", "energy regen", "break effect", "efecto de ruptura",
+        "effect hit rate", "effect res", "eidolon", "superimposition", "trace", "rastro"
+    ],
+    "ZZZ": VOCABULARIO_COMUN + [
+        "w-engine", "w engine", "motor w", "drive disc", "drive disk", "disc", "disk", "disco",
+        "core drive", "head drive", "hand drive", "feet drive", "impact", "anomaly proficiency",
+        "anomaly", "anomalía", "energy regen", "energy charge", "attribute dmg", "pen ratio",
+        "mindscape", "bangboo", "agent", "agente"
+    ],
+    "GI": VOCABULARIO_COMUN + [
+        "weapon", "arma", "artifact", "artefacto", "sands", "goblet", "circlet", "arena", "cáliz", "tiara",
+        "elemental mastery", "maestría elemental", "energy recharge", "recarga de energía",
+        "constellation", "constelación", "talent", "talento", "refinement", "refinamiento",
+        "武器", "聖遺物", "時計", "杯", "冠", "元素熟知", "元素チャージ効率", "凸", "パーティ"
+    ]
+}
+
+# Condensación del texto antes del Analista (presupuesto de tokens de entrada por juego).
+# Las páginas por encima de CONFIG_MAP_REDUCE["umbral_tokens"] usan como presupuesto
+# tokens_por_fragmento * max_fragmentos, para que el Analista las fragmente.
+
+CONFIG_CONDENSACION = {
+    "presupuesto_tokens": {"HSR": 6000, "ZZZ": 6000, "GI": 6000},
+    "oraciones_por_fragmento": 3,
+    "max_caracteres_oracion": 400
+}
+
+# Filtro de Viabilidad previo al Analista (viabilidad.py): descarta sin llamar al modelo
+# las páginas que no pueden contener una build (errores, muros de cookies/verificación,
+# otro personaje, texto sin vocabulario de build). Umbrales conservadores: ante la duda
+# la página pasa al modelo.
+
+CONFIG_VIABILIDAD = {
+    "activar": True,
+    "min_caracteres": 500,
+    "min_aciertos": 6,                 # Términos de VOCABULARIO_BUILD encontrados
+    "min_terminos_distintos": 3,
+    "min_densidad": 0.5,               # Aciertos por cada 1000 tokens estimados
+    "max_caracteres_aviso": 5000,      # Un aviso de error/consentimiento solo descarta páginas cortas
+    "fuentes_sin_nombre": [FUENTE_GAMEWITH]  # El nombre aparece en japonés: no se exige
+}
+
+# Coincidencia Difusa de Nombres (índice de trigramas sobre personajes conocidos)
+# Umbrales de 0 a 1 (1 = idéntico tras normalizar).
+
+CONFIG_COINCIDENCIA = {
+    "umbral_nombre": 0.75,   # Corrección del nombre en analizar_consulta
+    "umbral_enlace": 0.7,    # Respaldo por texto/slug en obtener_url_personaje
+    "umbral_juego": 0.8,     # Palabras clave de juego mal escritas ("zenles", "genshn")
+    "max_candidatos": 5
+}
+
+# Palabras clave de juego que analizar_consulta reconoce aunque estén mal escritas
+PALABRAS_JUEGO = ["honkai", "zenless", "genshin", "impact"]
+
+# Alias habituales -> nombre canónico (el que usan las URLs de las fuentes)
+ALIAS_PERSONAJES = {
+    "HSR": {
+        "march": "march 7th", "marzo": "march 7th", "m7": "march 7th",
+        "dhil": "dan heng imbibitor lunae", "imbibitor lunae": "dan heng imbibitor lunae",
+        "mc": "trailblazer", "rmc": "trailblazer", "stelle": "trailblazer", "caelus": "trailblazer",
+        "sw": "silver wolf", "lobo plateado": "silver wolf"
+    },
+    "ZZZ": {
+        "zhuyuan": "zhu yuan", "yixuan": "yi xuan", "astra": "astra yao"
+    },
+    "GI": {
+        "hutao": "hu tao", "raiden": "raiden shogun", "ei": "raiden shogun", "raiden ei": "raiden shogun",
+        "neuvi": "neuvillette", "childe": "tartaglia", "alhacen": "alhaitham",
+        # Nombres japoneses: el listado de GameWith solo enlaza por ID numérico con el
+        # nombre en japonés, y con ellos el índice completa mapa_id_gamewith
+        "フリーナ": "furina", "ナヴィア": "navia", "ヌヴィレット": "neuvillette", "胡桃": "hu tao",
+        "雷電将軍": "raiden shogun", "タルタリヤ": "tartaglia", "アルハイゼン": "alhaitham", "ナヒーダ": "nahida",
+        "鍾離": "zhongli", "甘雨": "ganyu", "夜蘭": "yelan", "ベネット": "bennett", "行秋": "xingqiu",
+        "香菱": "xiangling", "神里綾華": "kamisato ayaka", "楓原万葉": "kaedehara kazuha", "ウェンティ": "venti",
+        "魈": "xiao", "宵宮": "yoimiya", "八重神子": "yae miko", "アルレッキーノ": "arlecchino",
+        "クロリンデ": "clorinde", "リオセスリ": "wriothesley", "マーヴィカ": "mavuika", "ニィロウ": "nilou"
+    }
+}
+
+# Interpretación de consultas (parser_consultas.py): palabras clave precompiladas.
+# Juego: coincidencia de palabra completa, en este orden de prioridad.
+
+PALABRAS_CLAVE_JUEGO = {
+    "HSR": ["honkai", "star rail", "hsr"],
+    "ZZZ": ["zenless", "zzz", "zone zero", "zenles"],
+    "GI": ["genshin", "impact", "gi"]
+}
+
+# Componentes: (juegos, subcadenas, claves que se solicitan si aparece alguna)
+PALABRAS_COMPONENTES = [
+    (("HSR", "ZZZ", "GI"), ["arma", "engine", "w-engine", "cono", "light cone"], ["weapon_recommendations"]),
+    (("HSR", "ZZZ"), ["reliquia", "artefacto", "disco", "drive", "set", "ornamental"],
+     ["artifact_set_recommendations", "planetary_set_recommendations", "main_stats_recommendations"]),
+    (("GI",), ["reliquia", "artefacto", "set", "tiara", "caliz", "arena"],
+     ["artifact_set_recommendations", "main_stats_recommendations"]),
+    (("HSR", "ZZZ", "GI"), ["stats", "estadística", "objetivo", "target", "final", "substats", "vida", "ataque", "defensa", "critica", "maestria", "recarga"],
+     ["final_stats_targets"]),
+    (("HSR", "ZZZ", "GI"), ["equipo", "team", "composición", "partner"], ["team_recommendations"])
+]
+
+PALABRAS_BUILD_COMPLETA = ["build", "general", "completa", "todo"]
+
+# Palabras que nunca forman parte del nombre del personaje
+PALABRAS_VACIAS_CONSULTA = [
+    "del", "de", "para", "honkai", r"star\s*rail", "zenless", r"zone\s*zero", "zzz", "y", "o", "hsr", "genshin", "impact", "gi",
+    "build", "general", "completa", "todo", "discos", "reliquias", "artefactos", "armas", "arma", "engine", "cono", r"light\s*cone",
+    "stats", "estadística", "objetivo", "target", "final", "substats", "equipo", "team", "composición", "partner", "muestrame",
+    "quiero", "la", "el", "los", "las", "un", "una", "teams", "dame", "vida", "ataque", "defensa", r"probabilidad\s*critica",
+    r"daño\s*critico", r"maestria\s*elemental", "w-engines", r"recarga\s*de\s*energía", "luz"
+]
+
+# Localización: la build se extrae una vez en el idioma canónico y se traduce por idioma
+# solo sobre los valores del JSON, con un glosario persistente de nombres ya traducidos.
+
+NOMBRES_IDIOMA = {
+    "es": "ESPAÑOL", "en": "INGLÉS", "jp": "JAPONÉS", "cn": "CHINO", "fr": "FRANCÉS", "cr": "COREANO"
+}
+
+CONFIG_LOCALIZACION = {
+    "idioma_canonico": "es",  # El idioma por defecto del chat: la petición habitual no se traduce
+    "ruta_glosario": "glosario_traducciones.json",
+    "modelo_traduccion": "gemini-2.5-flash-lite",
+    "claves_sin_traducir": ["character_name", "game", "source", "Analisis_Gemini"],
+    "claves_lista_separada": ["team_recommendations"],  # "Acheron, Pela, ..." se traduce nombre a nombre
+    # Códigos ISO habituales -> código de NOMBRES_IDIOMA; cualquier otro código se rechaza
+    "alias_idioma": {"ja": "jp", "zh": "cn", "ko": "cr", "kr": "cr"}
+}
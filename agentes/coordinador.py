@@ -1,87 +1,82 @@
 import json
 import os
-import re
+import asyncio
+import threading
+import time
 from .base import AgenteBase
+from .utilidades import ejecutar_sincrono, emitir, en_hilo, en_segundo_plano, estimar_tokens, normalizar_nombre
 from .configuraciones import (
-    CONFIG_HSR, CONFIG_ZZZ, CONFIG_GI,
+    CONFIG_HSR, CONFIG_ZZZ, CONFIG_GI, CONFIG_COORDINACION, CONFIG_ALMACEN_BUILDS, CONFIG_LOCALIZACION,
+    CONFIG_ESTADISTICAS_FUENTES, CONFIG_VIABILIDAD, CONFIG_MAP_REDUCE,
     FUENTE_PRYDWEN, FUENTE_HONKAILAB, FUENTE_GENSHINLAB, FUENTE_GENSHINBUILD, FUENTE_GAMEWITH
 )
 from .investigador import AgenteInvestigador
 from .analista import AgenteAnalista
+from .condensador import AgenteCondensador
+from .traductor import AgenteTraductor
+from .parser_consultas import AnalizadorConsultas
+from .vuelo_unico import VueloUnico
+from .estadisticas_fuentes import obtener_estadisticas_fuentes
+from .viabilidad import FiltroViabilidad
+
+# Serializa lectura-modificación-escritura de los *_builds.json entre peticiones concurrentes
+_candado_builds = threading.Lock()
 
 class AgenteCoordinador(AgenteBase):
-    def __init__(self, nombre="Coordinador"):
+    def __init__(self, nombre="Coordinador", investigador=None, condensador=None, analista=None, traductor=None, estadisticas=None):
         super().__init__(nombre)
-        self.investigador = AgenteInvestigador()
-        self.analista = AgenteAnalista()
+        # Los agentes se pueden inyectar (p. ej. en pruebas, con el backend stub y sin navegadores)
+        self.investigador = investigador or AgenteInvestigador()
+        self.condensador = condensador or AgenteCondensador()
+        self.analista = analista or AgenteAnalista()
+        self.traductor = traductor or AgenteTraductor()
+        self.filtro_viabilidad = FiltroViabilidad()
+        self.analizador_consultas = AnalizadorConsultas(self.investigador.indice)
+        # Peticiones idénticas simultáneas comparten un único cálculo: la solicitud completa
+        # (juego, personaje, claves, fuente e idioma) y la extracción (sin el idioma)
+        self.vuelo_solicitudes = VueloUnico(f"{nombre}/solicitudes")
+        self.vuelo_builds = VueloUnico(f"{nombre}/builds")
+        # Historial por fuente: ordena las fuentes cuando el usuario no elige
+        self.estadisticas = estadisticas or obtener_estadisticas_fuentes()
+        # Reloj del almacén de builds (edad y frescura); inyectable en pruebas
+        self.reloj = time.time
 
     def analizar_consulta(self, consulta):
         """
         Analiza la consulta del usuario para identificar juego, personaje y claves solicitadas.
         """
-        consulta = consulta.lower().strip()
-        
-        # Detectar Juego
-        juego = None
-        if any(keyword in consulta for keyword in ["honkai", "star rail", "hsr"]):
-            juego = "HSR"
-        elif any(keyword in consulta for keyword in ["zenless", "zzz", "zone zero", "zenles"]):
-            juego = "ZZZ"
-        elif any(keyword in consulta for keyword in ["genshin", "impact", "gi"]): 
-            juego = "GI" 
-            
-        if not juego:
-            print(f"[{self.nombre}] No se detectó juego. Usando HSR por defecto.")
-            juego = "HSR"
-
-        # Extraer Nombre del Personaje
-        nombre_personaje = None
-        terminos_clave = r'\b(del|de|para|honkai|star\s*rail|zenless|zone\s*zero|zzz|y|o|hsr|genshin|impact|gi|build|general|completa|todo|discos|reliquias|artefactos|armas|arma|engine|cono|light\s*cone|stats|estadística|objetivo|target|final|substats|equipo|team|composición|partner|muestrame|quiero|la|el|los|las|un|una|y|teams|dame|vida|ataque|defensa|probabilidad\s*critica|daño\s*critico|maestria\s*elemental|w-engines|recarga\s*de\s*energía)\b'
-        consulta_temp = re.sub(terminos_clave, ' ', consulta).strip()
-        consulta_temp = re.sub(r'\s+', ' ', consulta_temp).strip()
-
-        if consulta_temp:
-            nombre_personaje = consulta_temp
-            nombre_personaje = re.sub(r'[^\w\s-]', '', nombre_personaje).strip()
-
-        if not nombre_personaje:
-            ultima_palabra = consulta.split()[-1]
-            if ultima_palabra not in ["hsr", "zzz", "build", "completa", "de", "la", "el", "gi", "impact"]:
-                 nombre_personaje = re.sub(r'[^\w\s-]', '', ultima_palabra).strip()
+        interpretacion = self.interpretar_consulta(consulta)
+        return interpretacion["juego"], interpretacion["nombre_personaje"], interpretacion["claves_solicitadas"]
 
-        # Detectar Componentes Solicitados
-        claves_solicitadas = ["character_name", "game", "build_name", "source", "Analisis_Gemini"]
-        es_build_completa = any(keyword in consulta for keyword in ["build", "general", "completa", "todo"])
-        
-        if any(keyword in consulta for keyword in ["arma", "engine", "w-engine", "cono", "light cone"]): claves_solicitadas.append("weapon_recommendations")
-        
-        if juego in ["HSR", "ZZZ"]:
-            if any(keyword in consulta for keyword in ["reliquia", "artefacto", "disco", "drive", "set", "ornamental"]):
-                claves_solicitadas.extend(["artifact_set_recommendations", "planetary_set_recommendations", "main_stats_recommendations"])
-        elif juego == "GI":
-            if any(keyword in consulta for keyword in ["reliquia", "artefacto", "set", "tiara", "caliz", "arena"]):
-                 claves_solicitadas.extend(["artifact_set_recommendations", "main_stats_recommendations"])
+    def interpretar_consulta(self, consulta):
+        """Como analizar_consulta, con las sugerencias si el nombre se rechazó por desconocido."""
+        return self.analizador_consultas.interpretar(consulta)
 
-        if any(keyword in consulta for keyword in ["stats", "estadística", "objetivo", "target", "final", "substats", "vida", "ataque", "defensa", "critica", "maestria", "recarga"]): claves_solicitadas.append("final_stats_targets")
-        if any(keyword in consulta for keyword in ["equipo", "team", "composición", "partner"]): claves_solicitadas.append("team_recommendations")
+    def procesar_solicitud(self, juego, nombre_personaje, claves_solicitadas, eleccion_fuente, idioma_objetivo, notificar=None):
+        """Envoltorio síncrono de procesar_solicitud_async."""
+        return ejecutar_sincrono(self.procesar_solicitud_async(
+            juego, nombre_personaje, claves_solicitadas, eleccion_fuente, idioma_objetivo, notificar
+        ))
 
-        if len(claves_solicitadas) <= 5 or es_build_completa:
-            if juego == "GI":
-                 claves_solicitadas.extend(["weapon_recommendations", "artifact_set_recommendations", "main_stats_recommendations", "final_stats_targets", "team_recommendations"])
-            else:
-                 claves_solicitadas.extend(["weapon_recommendations", "artifact_set_recommendations", "planetary_set_recommendations", "main_stats_recommendations", "final_stats_targets", "team_recommendations"])
-        claves_solicitadas = list(dict.fromkeys(claves_solicitadas))
-
-        return juego, nombre_personaje, claves_solicitadas
-
-    def procesar_solicitud(self, juego, nombre_personaje, claves_solicitadas, eleccion_fuente, idioma_objetivo):
+    async def procesar_solicitud_async(self, juego, nombre_personaje, claves_solicitadas, eleccion_fuente, idioma_objetivo, notificar=None):
         """
-        Orquesta las opciones de build.
+        Orquesta las opciones de build. Devuelve (build, None), (build, aviso) si la build
+        no se pudo traducir por completo al idioma pedido, o (None, error).
+        notificar: callable opcional que recibe los eventos de progreso (ver utilidades.emitir).
         """
         if not nombre_personaje:
             return None, "No nombre de personaje válido."
+        clave = (juego, normalizar_nombre(nombre_personaje), tuple(claves_solicitadas), eleccion_fuente or "", (idioma_objetivo or "es").lower())
+        return await self.vuelo_solicitudes.ejecutar(
+            clave,
+            lambda notificar_comun: self._procesar_solicitud_async(
+                juego, nombre_personaje, claves_solicitadas, eleccion_fuente, idioma_objetivo, notificar_comun
+            ),
+            notificar
+        )
 
-        # Selección de Configuración
+    def fuentes_de_juego(self, juego):
+        """(config_actual, todas_fuentes, mapa_fuentes) del juego; todas_fuentes en el orden configurado."""
         if juego == "HSR":
             config_actual = CONFIG_HSR
             nombre_lab = FUENTE_HONKAILAB
@@ -107,109 +102,389 @@ class AgenteCoordinador(AgenteBase):
                 (FUENTE_GAMEWITH, config_actual["url_base_secundaria"], config_actual["segmento_ruta_secundaria"]),
             ]
             mapa_fuentes = {'1': nombre_lab_1, '2': nombre_lab_2}
+        return config_actual, todas_fuentes, mapa_fuentes
+
+    async def _procesar_solicitud_async(self, juego, nombre_personaje, claves_solicitadas, eleccion_fuente, idioma_objetivo, notificar=None):
+        # Selección de Configuración
+        config_actual, todas_fuentes, mapa_fuentes = self.fuentes_de_juego(juego)
 
         # Prioridad de Fuente
         codigo_fuente_elegido = mapa_fuentes.get(eleccion_fuente)
         if codigo_fuente_elegido:
             prioridad_fuente = [s for s in todas_fuentes if s[0] == codigo_fuente_elegido]
             prioridad_fuente.extend([s for s in todas_fuentes if s[0] != codigo_fuente_elegido])
+        elif CONFIG_ESTADISTICAS_FUENTES["orden_adaptativo"]:
+            prioridad_fuente = self.estadisticas.ordenar(juego, todas_fuentes)
+            if prioridad_fuente != todas_fuentes:
+                print(f"[{self.nombre}] Orden de fuentes por historial: {[s[0] for s in prioridad_fuente]}")
         else:
             prioridad_fuente = todas_fuentes
 
         if not idioma_objetivo:
             idioma_objetivo = "es"
 
+        almacenada = None
+        if CONFIG_ALMACEN_BUILDS["usar_almacen"]:
+            almacenada = await en_hilo(self._leer_build, config_actual["ruta_archivo"], juego, nombre_personaje)
+        estado = self._estado_almacenada(juego, almacenada, codigo_fuente_elegido)
+
+        if estado:
+            build_final, codigo_fuente = almacenada, almacenada.get("source")
+            antiguedad_s = self.reloj() - almacenada["_actualizado"]
+            print(f"[{self.nombre}] Build guardada de {codigo_fuente} ({antiguedad_s / 3600:.1f} h, {estado}).")
+            emitir(notificar, "build_almacenada", fuente=codigo_fuente, fresca=(estado == "fresca"), antiguedad_s=round(antiguedad_s))
+            if estado == "vencida":
+                self._programar_refresco(juego, nombre_personaje, claves_solicitadas, config_actual, prioridad_fuente, codigo_fuente_elegido)
+        else:
+            build_final, codigo_fuente = await self._calcular_build(
+                juego, nombre_personaje, claves_solicitadas, config_actual, prioridad_fuente, codigo_fuente_elegido, notificar
+            )
+
+        if build_final:
+            build_filtrada = {key: build_final.get(key) for key in claves_solicitadas if key in build_final}
+            emitir(notificar, "build_seleccionada", fuente=codigo_fuente)
+            idioma_origen = build_final.get("_idioma", CONFIG_LOCALIZACION["idioma_canonico"])
+            return await self._localizar(juego, build_filtrada, idioma_origen, idioma_objetivo, notificar)
+        else:
+            return None, "No se pudo encontrar una build viable."
+
+    async def _calcular_build(self, juego, nombre_personaje, claves_solicitadas, config_actual, prioridad_fuente, codigo_fuente_elegido, notificar=None):
+        """
+        Rastrea y analiza las fuentes por prioridad y guarda la build. Devuelve (build, fuente) o (None, None).
+        Una sola extracción por (juego, personaje, fuente elegida) a la vez, aunque la pidan
+        en idiomas distintos o coincida con un refresco en segundo plano.
+        """
+        return await self.vuelo_builds.ejecutar(
+            self._clave_calculo(juego, nombre_personaje, codigo_fuente_elegido),
+            lambda notificar_comun: self._rastrear_y_analizar(
+                juego, nombre_personaje, claves_solicitadas, config_actual, prioridad_fuente, codigo_fuente_elegido, notificar_comun
+            ),
+            notificar
+        )
+
+    def _clave_calculo(self, juego, nombre_personaje, codigo_fuente_elegido):
+        return (juego, normalizar_nombre(nombre_personaje), codigo_fuente_elegido or "")
+
+    async def _rastrear_y_analizar(self, juego, nombre_personaje, claves_solicitadas, config_actual, prioridad_fuente, codigo_fuente_elegido, notificar=None):
+        # La extracción siempre se hace en el idioma canónico (un único análisis y una única
+        # entrada en la caché por página); el idioma pedido se obtiene después traduciendo.
+        idioma_extraccion = CONFIG_LOCALIZACION["idioma_canonico"]
+
         build_final = None
+        codigo_fuente = None
         razon_comparacion = ""
 ###############################################################
         #Bucle de Procesamiento llama al investigador e analista
-        for codigo_fuente, url_base, segmento_ruta in prioridad_fuente:
-            print(f"\n[{self.nombre}] Probando fuente: {codigo_fuente}")
-            
-            # 1. Paso Investigador
-            # 1. Paso Investigador (Protocolo A2A)
-            param_investigador = {
-                "cabecera": {"de": self.nombre, "para": "Investigador", "accion": "OBTENER_DATOS"},
-                "cuerpo": {
-                    "url_base": url_base,
-                    "nombre_personaje": nombre_personaje,
-                    "segmento_ruta": segmento_ruta,
-                    "codigo_fuente": codigo_fuente
-                }
+        modo = CONFIG_COORDINACION["modo_fuentes"]
+        if modo == "secuencial" or len(prioridad_fuente) < 2:
+            for codigo_fuente, url_base, segmento_ruta in prioridad_fuente:
+                build_final = await self._intentar_fuente(codigo_fuente, url_base, segmento_ruta, config_actual, nombre_personaje, idioma_extraccion, notificar)
+                if build_final:
+                    break
+        else:
+            retraso_s = 0 if modo == "carrera" else CONFIG_COORDINACION["retraso_cobertura_s"]
+            build_final, codigo_fuente = await self._intentar_fuentes_concurrente(
+                prioridad_fuente, retraso_s, config_actual, nombre_personaje, idioma_extraccion, notificar
+            )
+
+        if not build_final:
+            return None, None
+
+        # Agregar metadatos (usando claves en inglés para compatibilidad json)
+        build_final["game"] = config_actual["esquema_build"]["game"]
+        build_final["source"] = codigo_fuente
+        build_final["character_name"] = nombre_personaje
+        
+        if codigo_fuente_elegido:
+            razon_comparacion = f"Seleccionada porque usuario eligió: {codigo_fuente_elegido}."
+        else:
+            razon_comparacion = f"Seleccionada como primera fuente viable (Prioridad: {codigo_fuente})."
+        
+        await en_hilo(self._guardar_build, build_final, claves_solicitadas, config_actual, juego, nombre_personaje, razon_comparacion)
+        return build_final, codigo_fuente
+
+    def tiene_build_guardada(self, juego, nombre_personaje):
+        """True si hay una build guardada servible (fresca o vencida) sin rastrear."""
+        config_actual = {"HSR": CONFIG_HSR, "ZZZ": CONFIG_ZZZ, "GI": CONFIG_GI}.get(juego)
+        if not config_actual or not nombre_personaje or not CONFIG_ALMACEN_BUILDS["usar_almacen"]:
+            return False
+        almacenada = self._leer_build(config_actual["ruta_archivo"], juego, nombre_personaje)
+        return self._estado_almacenada(juego, almacenada, None) is not None
+
+    def _estado_almacenada(self, juego, build, codigo_fuente_elegido):
+        """
+        "fresca", "vencida" o None (no se puede servir: no existe, es de otra fuente que
+        la elegida o demasiado antigua). Se sirve en cualquier idioma: _localizar la traduce.
+        """
+        if not build:
+            return None
+        if codigo_fuente_elegido and build.get("source") != codigo_fuente_elegido:
+            return None
+        antiguedad_s = self.reloj() - build.get("_actualizado", 0)
+        if antiguedad_s > CONFIG_ALMACEN_BUILDS["max_antiguedad_s"]:
+            return None
+        frescura_s = CONFIG_ALMACEN_BUILDS["frescura_s"].get(juego, {}).get(
+            build.get("source"), CONFIG_ALMACEN_BUILDS["frescura_por_defecto_s"]
+        )
+        return "fresca" if antiguedad_s <= frescura_s else "vencida"
+
+    def _programar_refresco(self, juego, nombre_personaje, claves_solicitadas, config_actual, prioridad_fuente, codigo_fuente_elegido):
+        """
+        Recalcula la build en el ejecutor compartido: la petición ya respondió con la guardada
+        y su bucle de eventos termina con ella. El cálculo pasa por vuelo_builds, así que no se
+        lanza otro si ya hay uno en curso (refresco o extracción) y los que coincidan se unen.
+        Devuelve el Future del refresco, o None si no hizo falta lanzarlo.
+        """
+        clave_build = self._clave_build(juego, nombre_personaje)
+        if self.vuelo_builds.en_curso(self._clave_calculo(juego, nombre_personaje, codigo_fuente_elegido)):
+            return None
+
+        def refrescar():
+            try:
+                build, _ = ejecutar_sincrono(self._calcular_build(
+                    juego, nombre_personaje, claves_solicitadas, config_actual, prioridad_fuente, codigo_fuente_elegido
+                ))
+                print(f"[{self.nombre}] Refresco de '{clave_build}' {'completado' if build else 'sin build viable; se conserva la guardada'}.")
+            except Exception as e:
+                print(f"[{self.nombre}] Error refrescando '{clave_build}': {e}")
+
+        print(f"[{self.nombre}] Refrescando '{clave_build}' en segundo plano.")
+        return en_segundo_plano(refrescar)
+
+    async def _localizar(self, juego, build, idioma_origen, idioma_objetivo, notificar=None):
+        """
+        Traduce la build al idioma pedido (Protocolo A2A con el Traductor). Devuelve
+        (build, aviso): aviso no es None si quedaron valores en el idioma de origen.
+        """
+        if idioma_objetivo.lower() == idioma_origen.lower():
+            return build, None
+        emitir(notificar, "traduccion_iniciada", idioma=idioma_objetivo)
+        param_traductor = {
+            "cabecera": {"de": self.nombre, "para": "Traductor", "accion": "TRADUCIR_BUILD"},
+            "cuerpo": {"juego": juego, "build": build, "idioma_origen": idioma_origen, "idioma_objetivo": idioma_objetivo}
+        }
+        respuesta_sobre = await self.traductor.recibir_mensaje_async(param_traductor)
+        if respuesta_sobre.get("estado") != "OK" or not respuesta_sobre["cuerpo"]:
+            print(f"[{self.nombre}] Error A2A con Traductor: {respuesta_sobre.get('error')}. Se devuelve la build sin traducir.")
+            emitir(notificar, "traduccion_fallida", idioma=idioma_objetivo, idioma_origen=idioma_origen)
+            return build, f"No se pudo traducir la build a '{idioma_objetivo}'; se muestra en '{idioma_origen}'"
+        traduccion = respuesta_sobre["cuerpo"]
+        if traduccion["sin_traducir"]:
+            emitir(notificar, "traduccion_fallida", idioma=idioma_objetivo, idioma_origen=idioma_origen,
+                   sin_traducir=len(traduccion["sin_traducir"]))
+            return traduccion["build"], (
+                f"{len(traduccion['sin_traducir'])} valores no se pudieron traducir a '{idioma_objetivo}' y se muestran en '{idioma_origen}'"
+            )
+        return traduccion["build"], None
+
+    async def _intentar_fuente(self, codigo_fuente, url_base, segmento_ruta, config_actual, nombre_personaje, idioma_objetivo, notificar=None):
+        """Investigador + Analista sobre una fuente. Devuelve la build si es viable, si no None."""
+        intento = {}
+        inicio = time.monotonic()
+        # Una fuente cancelada (perdió la carrera con cobertura) no cuenta en las estadísticas
+        build = await self._recorrer_fuente(
+            codigo_fuente, url_base, segmento_ruta, config_actual, nombre_personaje, idioma_objetivo, notificar, intento
+        )
+        intento["viable"] = build is not None
+        intento["ms_total"] = (time.monotonic() - inicio) * 1000
+        await en_hilo(self.estadisticas.registrar, config_actual["juego"], codigo_fuente, intento)
+        return build
+
+    async def _recorrer_fuente(self, codigo_fuente, url_base, segmento_ruta, config_actual, nombre_personaje, idioma_objetivo, notificar, intento):
+        """Cuerpo de _intentar_fuente; anota en `intento` lo que registran las estadísticas."""
+        print(f"\n[{self.nombre}] Probando fuente: {codigo_fuente}")
+        # Los eventos de los agentes llevan la fuente: con cobertura puede haber varias en curso
+        notificar_fuente = None
+        if notificar is not None:
+            def notificar_fuente(evento):
+                notificar(dict(evento, fuente=codigo_fuente))
+        emitir(notificar_fuente, "fuente_iniciada")
+        
+        # 1. Paso Investigador (Protocolo A2A)
+        param_investigador = {
+            "cabecera": {"de": self.nombre, "para": "Investigador", "accion": "OBTENER_DATOS"},
+            "cuerpo": {
+                "url_base": url_base,
+                "nombre_personaje": nombre_personaje,
+                "segmento_ruta": segmento_ruta,
+                "codigo_fuente": codigo_fuente,
+                "juego": config_actual["juego"],
+                "notificar": notificar_fuente
             }
-            respuesta_sobre = self.investigador.recibir_mensaje(param_investigador)
-            
-            # Verificar respuesta del protocolo
-            resultado_investigacion = {"exito": False}
-            if respuesta_sobre.get("estado") == "OK":
-                 resultado_investigacion = respuesta_sobre["cuerpo"]
-            else:
-                 print(f"[{self.nombre}] Error A2A con Investigador: {respuesta_sobre.get('error')}")
-
-            if resultado_investigacion["exito"]:
-                contenido_texto = resultado_investigacion["contenido_texto"]
-                
-                # 2. Paso Analista
-                # 2. Paso Analista (Protocolo A2A)
-                param_analista = {
-                    "cabecera": {"de": self.nombre, "para": "Analista", "accion": "ANALIZAR_DATOS"},
-                    "cuerpo": {
-                        "juego": config_actual["juego"],
-                        "nombre_personaje": nombre_personaje,
-                        "contenido_texto": contenido_texto,
-                        "esquema_build": config_actual["esquema_build"],
-                        "tamano_equipo": config_actual["tamano_equipo"],
-                        "idioma_objetivo": idioma_objetivo
-                    }
-                }
-                
-                respuesta_analista_sobre = self.analista.recibir_mensaje(param_analista)
-                
-                # Verificar respuesta del protocolo
-                resultado_analista = None
-                if respuesta_analista_sobre.get("estado") == "OK":
-                     resultado_analista = respuesta_analista_sobre["cuerpo"]
-                else:
-                     print(f"[{self.nombre}] Error A2A con Analista: {respuesta_analista_sobre.get('error')}")
-
-                if resultado_analista:
-                    # Chequeo de Viabilidad
-                    es_viable = any(v for k, v in resultado_analista.items() if k not in ["character_name", "game", "source", "build_name", "main_stats_recommendations"])
-                    if es_viable:
-                        build_final = resultado_analista
-                        # Agregar metadatos (usando claves en inglés para compatibilidad json)
-                        build_final["game"] = config_actual["esquema_build"]["game"]
-                        build_final["source"] = codigo_fuente
-                        build_final["character_name"] = nombre_personaje
-                        
-                        if codigo_fuente_elegido:
-                            razon_comparacion = f"Seleccionada porque usuario eligió: {codigo_fuente_elegido}."
-                        else:
-                            razon_comparacion = f"Seleccionada como primera fuente viable (Prioridad: {codigo_fuente})."
-                        break
+        }
+        respuesta_sobre = await self.investigador.recibir_mensaje_async(param_investigador)
         
-        if build_final:
-            self._guardar_build(build_final, claves_solicitadas, config_actual, juego, nombre_personaje, razon_comparacion)
-            build_filtrada = {key: build_final.get(key) for key in claves_solicitadas if key in build_final}
-            return build_filtrada, None
+        # Verificar respuesta del protocolo
+        resultado_investigacion = {"exito": False}
+        if respuesta_sobre.get("estado") == "OK":
+             resultado_investigacion = respuesta_sobre["cuerpo"]
         else:
-            return None, "No se pudo encontrar una build viable."
+             print(f"[{self.nombre}] Error A2A con Investigador: {respuesta_sobre.get('error')}")
+
+        intento.update(
+            url_resuelta=bool(resultado_investigacion.get("url")),
+            desde_cache=resultado_investigacion.get("desde_cache", False),
+            ms_resolucion=resultado_investigacion.get("ms_resolucion"),
+            ms_descarga=resultado_investigacion.get("ms_descarga")
+        )
+        if not resultado_investigacion["exito"]:
+            emitir(notificar_fuente, "fuente_descartada", motivo="pagina_no_obtenida")
+            return None
+        contenido_texto = resultado_investigacion["contenido_texto"]
+        intento["caracteres"] = len(contenido_texto)
+        emitir(notificar_fuente, "pagina_obtenida", url=resultado_investigacion["url"],
+               desde_cache=resultado_investigacion.get("desde_cache", False), caracteres=len(contenido_texto))
+
+        # Páginas que no pueden contener una build se descartan sin llamar al modelo
+        if CONFIG_VIABILIDAD["activar"]:
+            evaluacion = self.filtro_viabilidad.evaluar(config_actual["juego"], nombre_personaje, contenido_texto, codigo_fuente)
+            if not evaluacion["viable"]:
+                emitir(notificar_fuente, "fuente_descartada", motivo="pagina_no_viable", detalle=evaluacion["motivo"])
+                return None
+
+        # 2. Paso Condensador (Protocolo A2A)
+        param_condensador = {
+            "cabecera": {"de": self.nombre, "para": "Condensador", "accion": "CONDENSAR_TEXTO"},
+            "cuerpo": {
+                "juego": config_actual["juego"],
+                "nombre_personaje": nombre_personaje,
+                "contenido_texto": contenido_texto,
+                "presupuesto_tokens": self._presupuesto_condensacion(config_actual["juego"], contenido_texto)
+            }
+        }
+        respuesta_condensador_sobre = await self.condensador.recibir_mensaje_async(param_condensador)
+        if respuesta_condensador_sobre.get("estado") == "OK" and respuesta_condensador_sobre["cuerpo"]["contenido_texto"]:
+            contenido_texto = respuesta_condensador_sobre["cuerpo"]["contenido_texto"]
+        else:
+            # Sin texto condensado se analiza el original completo
+            print(f"[{self.nombre}] Condensador sin resultado, se usa el texto completo.")
+        
+        # 3. Paso Analista (Protocolo A2A)
+        param_analista = {
+            "cabecera": {"de": self.nombre, "para": "Analista", "accion": "ANALIZAR_DATOS"},
+            "cuerpo": {
+                "juego": config_actual["juego"],
+                "nombre_personaje": nombre_personaje,
+                "contenido_texto": contenido_texto,
+                "esquema_build": config_actual["esquema_build"],
+                "tamano_equipo": config_actual["tamano_equipo"],
+                "idioma_objetivo": idioma_objetivo,
+                "notificar": notificar_fuente
+            }
+        }
+        
+        respuesta_analista_sobre = await self.analista.recibir_mensaje_async(param_analista)
+        
+        # Verificar respuesta del protocolo
+        resultado_analista = None
+        if respuesta_analista_sobre.get("estado") == "OK":
+             resultado_analista = respuesta_analista_sobre["cuerpo"]
+        else:
+             print(f"[{self.nombre}] Error A2A con Analista: {respuesta_analista_sobre.get('error')}")
+
+        if resultado_analista:
+            # Chequeo de Viabilidad
+            es_viable = any(v for k, v in resultado_analista.items() if k not in ["character_name", "game", "source", "build_name", "main_stats_recommendations"])
+            if es_viable:
+                return resultado_analista
+        emitir(notificar_fuente, "fuente_descartada", motivo="build_no_viable")
+        return None
+
+    def _presupuesto_condensacion(self, juego, contenido_texto):
+        """
+        Las páginas por encima del umbral de map-reduce no se recortan al presupuesto normal
+        (que queda por debajo del umbral): se condensan hasta lo que caben los fragmentos
+        del Analista, que las analiza por partes. None = presupuesto del juego.
+        """
+        if estimar_tokens(contenido_texto) <= CONFIG_MAP_REDUCE["umbral_tokens"].get(juego, 8000):
+            return None
+        return CONFIG_MAP_REDUCE["tokens_por_fragmento"] * CONFIG_MAP_REDUCE["max_fragmentos"]
+
+    async def _intentar_fuentes_concurrente(self, prioridad_fuente, retraso_s, config_actual, nombre_personaje, idioma_objetivo, notificar=None):
+        """
+        Lanza la fuente preferida y, si no termina en retraso_s, la siguiente (retraso 0 = carrera).
+        Siempre gana la fuente viable de mayor prioridad: el resultado de una fuente solo se
+        acepta cuando todas las de mayor prioridad ya terminaron sin build viable.
+        Devuelve (build, codigo_fuente) o (None, None).
+        """
+        futuros = []
+
+        def lanzar_siguiente():
+            codigo_fuente, url_base, segmento_ruta = prioridad_fuente[len(futuros)]
+            futuros.append(asyncio.create_task(
+                self._intentar_fuente(codigo_fuente, url_base, segmento_ruta, config_actual, nombre_personaje, idioma_objetivo, notificar)
+            ))
+            return time.monotonic() + retraso_s
+
+        try:
+            proximo_lanzamiento = lanzar_siguiente()
+            while True:
+                # ¿Hay ganador? Recorre por prioridad hasta la primera fuente sin terminar
+                for indice, futuro in enumerate(futuros):
+                    if not futuro.done():
+                        break
+                    build = futuro.result() if futuro.exception() is None else None
+                    if build:
+                        print(f"[{self.nombre}] Fuente ganadora: {prioridad_fuente[indice][0]}")
+                        return build, prioridad_fuente[indice][0]
+                else:
+                    # Todas las lanzadas terminaron sin build viable
+                    if len(futuros) == len(prioridad_fuente):
+                        return None, None
+                    proximo_lanzamiento = lanzar_siguiente()
+                    continue
+
+                if len(futuros) < len(prioridad_fuente) and time.monotonic() >= proximo_lanzamiento:
+                    print(f"[{self.nombre}] Lanzando {prioridad_fuente[len(futuros)][0]} en paralelo.")
+                    proximo_lanzamiento = lanzar_siguiente()
+                    continue
+
+                espera = None
+                if len(futuros) < len(prioridad_fuente):
+                    espera = max(0.0, proximo_lanzamiento - time.monotonic())
+                await asyncio.wait([f for f in futuros if not f.done()], timeout=espera, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            # Cancela las fuentes perdedoras: las tareas del pool que aún no empezaron se
+            # descartan; el trabajo ya en curso en hilos termina y su resultado se ignora.
+            for futuro in futuros:
+                if not futuro.done():
+                    futuro.cancel()
 
     def _guardar_build(self, build_final, claves_solicitadas, config_actual, juego, nombre_personaje, razon_comparacion):
         build_final["Analisis_Gemini"] = razon_comparacion
         ruta_archivo = config_actual["ruta_archivo"]
         
+        with _candado_builds:
+            self._escribir_build(ruta_archivo, build_final, juego, nombre_personaje)
+
+    def _leer_build(self, ruta_archivo, juego, nombre_personaje):
+        with _candado_builds:
+            return self._leer_builds(ruta_archivo).get(self._clave_build(juego, nombre_personaje))
+
+    def _leer_builds(self, ruta_archivo):
         if os.path.exists(ruta_archivo):
             with open(ruta_archivo, 'r', encoding='utf-8') as f:
                 try:
-                    todas_builds = json.load(f)
+                    return json.load(f)
                 except json.JSONDecodeError:
-                    todas_builds = {}
-        else:
-            todas_builds = {}
-            
-        clave_build = f"{juego.lower()}_{nombre_personaje.lower().replace(' ', '_')}"
-        todas_builds[clave_build] = build_final
-        
-        with open(ruta_archivo, 'w', encoding='utf-8') as f:
+                    return {}
+        return {}
+
+    def _clave_build(self, juego, nombre_personaje):
+        return f"{juego.lower()}_{nombre_personaje.lower().replace(' ', '_')}"
+
+    def _escribir_build(self, ruta_archivo, build_final, juego, nombre_personaje):
+        todas_builds = self._leer_builds(ruta_archivo)
+
+        # Metadatos del almacén: cuándo y en qué idioma se extrajo (ver CONFIG_ALMACEN_BUILDS)
+        build_final["_actualizado"] = self.reloj()
+        build_final["_idioma"] = CONFIG_LOCALIZACION["idioma_canonico"]
+        todas_builds[self._clave_build(juego, nombre_personaje)] = build_final
+        self._escribir_builds(ruta_archivo, todas_builds)
+
+    def _escribir_builds(self, ruta_archivo, todas_builds):
+        # Escritura atómica: los lectores del almacén nunca ven un JSON a medias
+        ruta_temporal = ruta_archivo + ".tmp"
+        with open(ruta_temporal, 'w', encoding='utf-8') as f:
             json.dump(todas_builds, f, indent=4, ensure_ascii=False)
+        os.replace(ruta_temporal, ruta_archivo)
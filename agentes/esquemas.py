@@ -0,0 +1,155 @@
+# Esquemas de respuesta del modelo y validación de builds a partir de esquema_build.
+# esquema_build (configuraciones.py) es una plantilla: "" -> cadena, [] -> lista de
+# cadenas, {...} -> objeto con esas subclaves (valores cadena).
+
+from .utilidades import normalizar_nombre
+
+# Claves que el Coordinador sobrescribe siempre: no se exigen al modelo
+CLAVES_METADATOS = ("character_name", "game", "source", "build_name")
+
+
+def esquema_respuesta(esquema_build, claves=None):
+    """Schema (formato response_schema de Gemini) para la build completa o solo para `claves`."""
+    claves = [c for c in (claves or esquema_build) if c in esquema_build]
+    return {
+        "type": "OBJECT",
+        "properties": {clave: _esquema_valor(esquema_build[clave]) for clave in claves},
+        "required": [c for c in claves if c not in CLAVES_METADATOS]
+    }
+
+
+def esquema_respuesta_lote(esquema_build, ids):
+    """Un objeto con una build por identificador de sección (análisis por lotes)."""
+    esquema = esquema_respuesta(esquema_build)
+    return {"type": "OBJECT", "properties": {id_lote: esquema for id_lote in ids}, "required": list(ids)}
+
+
+def _esquema_valor(plantilla):
+    if isinstance(plantilla, list):
+        return {"type": "ARRAY", "items": {"type": "STRING"}}
+    if isinstance(plantilla, dict):
+        return {
+            "type": "OBJECT",
+            "properties": {subclave: {"type": "STRING"} for subclave in plantilla},
+            "required": list(plantilla)
+        }
+    return {"type": "STRING"}
+
+
+def validar_build(resultado, esquema_build):
+    """
+    Normaliza la salida del modelo contra el esquema y devuelve (build, campos_invalidos).
+    - claves desconocidas: se descartan
+    - números/booleanos donde se espera texto: se convierten a cadena
+    - subclaves que faltan en un objeto: cadena vacía
+    - campo ausente o de tipo incorrecto: queda con el valor de la plantilla y se
+      informa como inválido (salvo los metadatos, que los pone el Coordinador)
+    """
+    resultado = resultado if isinstance(resultado, dict) else {}
+    build = {}
+    invalidos = []
+    for clave, plantilla in esquema_build.items():
+        valor = _normalizar(resultado.get(clave), plantilla)
+        if valor is None:
+            build[clave] = _vacio(plantilla) if clave not in CLAVES_METADATOS else plantilla
+            if clave not in CLAVES_METADATOS:
+                invalidos.append(clave)
+        else:
+            build[clave] = valor
+    return build, invalidos
+
+
+def _normalizar(valor, plantilla):
+    if isinstance(plantilla, list):
+        if isinstance(valor, str):
+            valor = [valor]
+        if not isinstance(valor, list):
+            return None
+        elementos = [_texto(v) for v in valor]
+        return None if any(e is None for e in elementos) else elementos
+    if isinstance(plantilla, dict):
+        if not isinstance(valor, dict):
+            return None
+        objeto = {subclave: _texto(valor.get(subclave, "")) for subclave in plantilla}
+        return None if any(v is None for v in objeto.values()) else objeto
+    return _texto(valor)
+
+
+def _texto(valor):
+    if isinstance(valor, str):
+        return valor
+    if isinstance(valor, (int, float, bool)):
+        return str(valor)
+    return None
+
+
+def _vacio(plantilla):
+    if isinstance(plantilla, list):
+        return []
+    if isinstance(plantilla, dict):
+        return {subclave: "" for subclave in plantilla}
+    return ""
+
+
+def fusionar_builds(builds, esquema_build, max_equipos=3):
+    """
+    Combina campo a campo las builds parciales de varios fragmentos de una página
+    (en orden de aparición):
+    - listas: sin duplicados (nombre normalizado), las más repetidas primero; los
+      equipos se comparan por el conjunto de miembros y se limitan a max_equipos
+    - objetos: por subclave, el valor no vacío más repetido (empate: el primero)
+    - cadenas: el primer valor no vacío
+    """
+    builds = [b for b in builds if isinstance(b, dict)]
+    fusion = {}
+    for clave, plantilla in esquema_build.items():
+        valores = [b[clave] for b in builds if clave in b]
+        if isinstance(plantilla, list):
+            fusion[clave] = _fusionar_listas(valores, es_equipo=(clave == "team_recommendations"))
+            if clave == "team_recommendations":
+                fusion[clave] = fusion[clave][:max_equipos]
+        elif isinstance(plantilla, dict):
+            fusion[clave] = {
+                subclave: _mas_frecuente([v.get(subclave, "") for v in valores if isinstance(v, dict)])
+                for subclave in plantilla
+            }
+        else:
+            fusion[clave] = next((v for v in valores if v), plantilla)
+    return fusion
+
+
+def _clave_elemento(elemento, es_equipo):
+    if es_equipo:
+        return frozenset(normalizar_nombre(m) for m in elemento.split(",") if m.strip())
+    return normalizar_nombre(elemento)
+
+
+def _fusionar_listas(listas, es_equipo=False):
+    conteo = {}
+    primero = {}
+    for lista in listas:
+        for elemento in lista or []:
+            if not isinstance(elemento, str) or not elemento.strip() or "no encontrado" in elemento.lower():
+                continue
+            clave = _clave_elemento(elemento, es_equipo)
+            if not clave:
+                continue
+            conteo[clave] = conteo.get(clave, 0) + 1
+            primero.setdefault(clave, (len(primero), elemento))
+    ordenadas = sorted(conteo, key=lambda c: (-conteo[c], primero[c][0]))
+    return [primero[c][1] for c in ordenadas]
+
+
+def _mas_frecuente(valores):
+    conteo = {}
+    primero = {}
+    for valor in valores:
+        if not isinstance(valor, str) or not valor.strip():
+            continue
+        clave = normalizar_nombre(valor)
+        conteo[clave] = conteo.get(clave, 0) + 1
+        primero.setdefault(clave, (len(primero), valor))
+    if not conteo:
+        return ""
+    mejor = min(conteo, key=lambda c: (-conteo[c], primero[c][0]))
+    return primero[mejor][1]
@@ -0,0 +1,150 @@
+import json
+import os
+import threading
+import time
+from .configuraciones import CONFIG_ESTADISTICAS_FUENTES
+
+# Contadores que se desvanecen con vida_media_s (lo de hace semanas pesa poco)
+CONTADORES = ("intentos", "viables", "sin_url", "sin_pagina", "texto_corto", "no_viables", "desde_cache")
+# Medias móviles exponenciales (ms y caracteres)
+MEDIAS = ("ms_total", "ms_resolucion", "ms_descarga", "caracteres")
+
+
+class EstadisticasFuentes:
+    """
+    Historial por juego y fuente de cada intento del Coordinador: resolución de URL,
+    tiempo de descarga, longitud del texto extraído, viabilidad del análisis y latencia
+    total. Con él ordena las fuentes por tiempo esperado hasta una build viable:
+    latencia media / probabilidad de éxito, que es el orden que minimiza la espera
+    esperada cuando las fuentes se prueban una tras otra.
+    """
+
+    def __init__(self, config=None):
+        self.nombre = "EstadisticasFuentes"
+        self.config = dict(CONFIG_ESTADISTICAS_FUENTES, **(config or {}))
+        self._candado = threading.Lock()
+        self.datos = self._cargar()
+
+    def registrar(self, juego, codigo_fuente, intento):
+        """
+        intento: url_resuelta, desde_cache, caracteres, viable, ms_resolucion, ms_descarga, ms_total
+        (las claves de tiempo que falten no actualizan su media).
+        """
+        ahora = time.time()
+        with self._candado:
+            entrada = self.datos.setdefault(self._clave(juego, codigo_fuente), self._entrada_vacia(ahora))
+            self._desvanecer(entrada, ahora)
+
+            entrada["intentos"] += 1
+            if intento.get("viable"):
+                entrada["viables"] += 1
+            elif not intento.get("url_resuelta"):
+                entrada["sin_url"] += 1
+            elif intento.get("caracteres") is None:
+                entrada["sin_pagina"] += 1
+            elif intento["caracteres"] < self.config["min_caracteres"]:
+                entrada["texto_corto"] += 1
+            else:
+                entrada["no_viables"] += 1
+            if intento.get("desde_cache"):
+                entrada["desde_cache"] += 1
+
+            alfa = self.config["alfa_media"]
+            for media in MEDIAS:
+                valor = intento.get(media)
+                if valor is None:
+                    continue
+                anterior = entrada["medias"].get(media)
+                entrada["medias"][media] = valor if anterior is None else anterior + alfa * (valor - anterior)
+            self._guardar()
+
+    def ordenar(self, juego, fuentes):
+        """
+        fuentes: [(codigo_fuente, url_base, segmento_ruta)] en el orden configurado.
+        Devuelve la misma lista ordenada por tiempo esperado hasta build viable; en
+        empate (p. ej. sin historial) se conserva el orden configurado.
+        """
+        ahora = time.time()
+        with self._candado:
+            for codigo_fuente, _, _ in fuentes:
+                entrada = self.datos.get(self._clave(juego, codigo_fuente))
+                if entrada:
+                    self._desvanecer(entrada, ahora)
+            esperados = {f[0]: self._tiempo_esperado(juego, f[0]) for f in fuentes}
+        return sorted(fuentes, key=lambda f: esperados[f[0]])
+
+    def resumen(self, fuentes_por_juego=None):
+        """Estadísticas por juego y fuente (con las derivadas) y el orden adaptativo resultante."""
+        ahora = time.time()
+        resumen = {}
+        with self._candado:
+            for clave, entrada in sorted(self.datos.items()):
+                juego, codigo_fuente = clave.split("|", 1)
+                self._desvanecer(entrada, ahora)
+                resumen.setdefault(juego, {"fuentes": {}})["fuentes"][codigo_fuente] = dict(
+                    {c: round(entrada[c], 2) for c in CONTADORES},
+                    medias={m: round(v) for m, v in entrada["medias"].items() if v is not None},
+                    probabilidad_viable=round(self._probabilidad(entrada), 3),
+                    tiempo_esperado_ms=round(self._tiempo_esperado(juego, codigo_fuente)),
+                    ultimo_intento=entrada["actualizado"]
+                )
+        for juego, fuentes in (fuentes_por_juego or {}).items():
+            resumen.setdefault(juego, {"fuentes": {}})["orden"] = [f[0] for f in self.ordenar(juego, fuentes)]
+        return resumen
+
+    # Modelo
+
+    def _probabilidad(self, entrada):
+        """Éxito suavizado con una previa (sin historial = previa_viables / previa_intentos)."""
+        return (entrada["viables"] + self.config["previa_viables"]) / (entrada["intentos"] + self.config["previa_intentos"])
+
+    def _tiempo_esperado(self, juego, codigo_fuente):
+        entrada = self.datos.get(self._clave(juego, codigo_fuente))
+        if not entrada:
+            return self.config["latencia_inicial_ms"] * self.config["previa_intentos"] / self.config["previa_viables"]
+        latencia = entrada["medias"].get("ms_total") or self.config["latencia_inicial_ms"]
+        return latencia / max(self._probabilidad(entrada), 1e-3)
+
+    def _desvanecer(self, entrada, ahora):
+        factor = 0.5 ** ((ahora - entrada["actualizado"]) / self.config["vida_media_s"])
+        for contador in CONTADORES:
+            entrada[contador] *= factor
+        entrada["actualizado"] = ahora
+
+    def _entrada_vacia(self, ahora):
+        return dict({c: 0.0 for c in CONTADORES}, medias={m: None for m in MEDIAS}, actualizado=ahora)
+
+    def _clave(self, juego, codigo_fuente):
+        return f"{juego}|{codigo_fuente}"
+
+    # Persistencia
+
+    def _cargar(self):
+        ruta = self.config["ruta_archivo"]
+        if os.path.exists(ruta):
+            with open(ruta, 'r', encoding='utf-8') as f:
+                try:
+                    return json.load(f)
+                except json.JSONDecodeError:
+                    pass
+        return {}
+
+    def _guardar(self):
+        ruta = self.config["ruta_archivo"]
+        ruta_temporal = ruta + ".tmp"
+        with open(ruta_temporal, 'w', encoding='utf-8') as f:
+            json.dump(self.datos, f, indent=4, ensure_ascii=False)
+        os.replace(ruta_temporal, ruta)
+
+
+_estadisticas_global = None
+_candado_global = threading.Lock()
+
+
+def obtener_estadisticas_fuentes():
+    """Devuelve las estadísticas compartidas del proceso (se cargan bajo demanda)."""
+    global _estadisticas_global
+    with _candado_global:
+        if _estadisticas_global is None:
+            _estadisticas_global = EstadisticasFuentes()
+        return _estadisticas_global
@@ -2,14 +2,23 @@ import os
 import re
 import unicodedata
 from urllib.parse import urljoin, urlparse, quote_plus
-from playwright.sync_api import sync_playwright
 from .base import AgenteBase
+from .pool_navegadores import obtener_pool
+from .utilidades import ejecutar_sincrono
+from .vuelo_unico import VueloUnico
 
 class AgenteImagenes(AgenteBase):
-    def __init__(self, nombre="Buscador de Imágenes"):
+    def __init__(self, nombre="Buscador de Imágenes", pool=None):
         super().__init__(nombre)
+        self.pool = pool or obtener_pool()
+        # Varias peticiones del mismo personaje a la vez: una sola búsqueda en HoYoLAB
+        self.vuelo_unico = VueloUnico(nombre)
 
     def procesar_solicitud(self, datos):
+        """Envoltorio síncrono de procesar_solicitud_async."""
+        return ejecutar_sincrono(self.procesar_solicitud_async(datos))
+
+    async def procesar_solicitud_async(self, datos):
         """
         Espera que datos contenga:
         - etiqueta: str (término de búsqueda)
@@ -21,12 +30,17 @@ class AgenteImagenes(AgenteBase):
         if not etiqueta:
             return {"exito": False, "imagenes": []}
         
-        print(f"[{self.nombre}] Buscando imágenes para: {etiqueta}")
-        imagenes = self._buscar_imagenes_hoyolab(etiqueta, max_imagenes)
-        
-        return {"exito": True, "imagenes": imagenes}
+        async def _buscar(_notificar):
+            print(f"[{self.nombre}] Buscando imágenes para: {etiqueta}")
+            imagenes = await self._buscar_imagenes_hoyolab_async(etiqueta, max_imagenes)
+            return {"exito": True, "imagenes": imagenes}
+
+        return await self.vuelo_unico.ejecutar((etiqueta.strip().lower(), max_imagenes), _buscar)
 
     def _buscar_imagenes_hoyolab(self, etiqueta: str, max_post=6):
+        return ejecutar_sincrono(self._buscar_imagenes_hoyolab_async(etiqueta, max_post))
+
+    async def _buscar_imagenes_hoyolab_async(self, etiqueta: str, max_post=6):
         """
         Busca imágenes relacionadas con la etiqueta en múltiples fuentes.
         - Logs detallados en consola para ver candidatos, respuestas HTTP y razones.
@@ -85,181 +99,169 @@ class AgenteImagenes(AgenteBase):
             f"https://www.pixiv.net/en/tags/{quote_plus(etiqueta)}/artworks",
         ]
 
-        found = []
-        seen = set()
         state_file = "state.json"
         SCORE_THRESHOLD = 0.5
 
-        try:
-            with sync_playwright() as p:
-                # Lanzar navegador con ignorar errores de HTTPS y argumentos para estabilidad
-                browser = p.chromium.launch(
-                    headless=True,
-                    args=['--ignore-certificate-errors', '--ignore-ssl-errors']
-                )
-                
-                if os.path.exists(state_file):
-                    context = browser.new_context(
-                        storage_state=state_file,
-                        ignore_https_errors=True,
-                        user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-                    )
-                    print(f"[{self.nombre}] Usando storage_state: {state_file}")
-                else:
-                    context = browser.new_context(
-                        ignore_https_errors=True,
-                         user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-                    )
-                    print(f"[{self.nombre}] No se encontró storage_state; continuando sin sesión.")
+        opciones_contexto = {
+            "ignore_https_errors": True,
+            "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+        }
+        if os.path.exists(state_file):
+            opciones_contexto["storage_state"] = state_file
+            print(f"[{self.nombre}] Usando storage_state: {state_file}")
+        else:
+            print(f"[{self.nombre}] No se encontró storage_state; continuando sin sesión.")
 
-                page = context.new_page()
-
-                for seed in seeds:
-                    if len(found) >= max_post:
-                        break
-                    try:
-                        print(f"[{self.nombre}] Abriendo seed: {seed}")
-                        network_images = set()
+        def _recorrer_semillas(page):
+            # Listas propias de la tarea: si el llamador deja de esperar (timeout), el hilo
+            # del navegador sigue sin tocar nada que ya se haya devuelto
+            found = []
+            seen = set()
+            for seed in seeds:
+                if len(found) >= max_post:
+                    break
+                try:
+                    print(f"[{self.nombre}] Abriendo seed: {seed}")
+                    network_images = set()
 
-                        def on_response(resp):
-                            try:
-                                url = resp.url
-                                ct = (resp.headers.get("content-type") or "").lower()
-                                if resp.status == 200 and ct.startswith("image"):
-                                    cleanu = url.split("#")[0].split("?")[0]
-                                    network_images.add(cleanu)
-                            except Exception:
-                                pass
+                    def on_response(resp):
+                        try:
+                            url = resp.url
+                            ct = (resp.headers.get("content-type") or "").lower()
+                            if resp.status == 200 and ct.startswith("image"):
+                                cleanu = url.split("#")[0].split("?")[0]
+                                network_images.add(cleanu)
+                        except Exception:
+                            pass
 
-                        page.on("response", on_response)
-                        page.goto(seed, wait_until='domcontentloaded', timeout=60000)
-                        page.wait_for_timeout(800)
-                        
-                        page.evaluate("""
-                            () => {
-                                document.querySelectorAll('img').forEach(img => {
-                                    try {
-                                        const ds = img.getAttribute('data-src') || img.getAttribute('data-original') || img.dataset.src || img.dataset.original;
-                                        if (ds) img.src = ds;
-                                        const dss = img.getAttribute('data-srcset') || img.dataset.srcset;
-                                        if (dss && !img.src) img.src = dss.split(',')[0].trim().split(' ')[0];
-                                    } catch(e){}
-                                });
-                            }
-                        """)
-                        
-                        for _ in range(10):
-                            page.mouse.wheel(0, 1500)
-                            page.wait_for_timeout(500)
-                        page.wait_for_timeout(1000)
+                    page.on("response", on_response)
+                    page.goto(seed, wait_until='domcontentloaded', timeout=60000)
+                    page.wait_for_timeout(800)
+                    
+                    page.evaluate("""
+                        () => {
+                            document.querySelectorAll('img').forEach(img => {
+                                try {
+                                    const ds = img.getAttribute('data-src') || img.getAttribute('data-original') || img.dataset.src || img.dataset.original;
+                                    if (ds) img.src = ds;
+                                    const dss = img.getAttribute('data-srcset') || img.dataset.srcset;
+                                    if (dss && !img.src) img.src = dss.split(',')[0].trim().split(' ')[0];
+                                } catch(e){}
+                            });
+                        }
+                    """)
+                    
+                    for _ in range(10):
+                        page.mouse.wheel(0, 1500)
+                        page.wait_for_timeout(500)
+                    page.wait_for_timeout(1000)
 
-                        imgs = page.locator("img")
+                    imgs = page.locator("img")
+                    total = 0
+                    try:
+                        total = imgs.count()
+                    except Exception:
                         total = 0
-                        try:
-                            total = imgs.count()
-                        except Exception:
-                            total = 0
-                        print(f"[{self.nombre}] imgs DOM detectadas: {total}, network captures: {len(network_images)}")
+                    print(f"[{self.nombre}] imgs DOM detectadas: {total}, network captures: {len(network_images)}")
 
-                        candidates = []
-                        for i in range(total):
+                    candidates = []
+                    for i in range(total):
+                        try:
+                            src = imgs.nth(i).get_attribute("src") or imgs.nth(i).get_attribute("data-src") or imgs.nth(i).get_attribute("data-original") or ""
+                            if not src:
+                                ss = imgs.nth(i).get_attribute("srcset") or ""
+                                if ss:
+                                    src = ss.split(",")[0].strip().split(" ")[0]
+                            src_clean = re.sub(r'\?.*$', '', src)
+                            alt = imgs.nth(i).get_attribute("alt") or imgs.nth(i).get_attribute("title") or ""
+                            parent_text = ""
                             try:
-                                src = imgs.nth(i).get_attribute("src") or imgs.nth(i).get_attribute("data-src") or imgs.nth(i).get_attribute("data-original") or ""
-                                if not src:
-                                    ss = imgs.nth(i).get_attribute("srcset") or ""
-                                    if ss:
-                                        src = ss.split(",")[0].strip().split(" ")[0]
-                                src_clean = re.sub(r'\?.*$', '', src)
-                                alt = imgs.nth(i).get_attribute("alt") or imgs.nth(i).get_attribute("title") or ""
+                                parent_text = imgs.nth(i).locator("xpath=..").inner_text()
+                            except Exception:
                                 parent_text = ""
-                                try:
-                                    parent_text = imgs.nth(i).locator("xpath=..").inner_text()
-                                except Exception:
-                                    parent_text = ""
-                                filename = urlparse(src_clean).path.split("/")[-1] if src_clean else ""
-                                figcaption = ""
-                                try:
-                                    el = imgs.nth(i).locator("xpath=ancestor::figure[1]//figcaption")
-                                    if el.count() > 0:
-                                        figcaption = el.nth(0).inner_text()
-                                except Exception:
-                                    figcaption = ""
-                                if src_clean:
-                                    abs_url = urljoin(page.url, src_clean)
-                                    candidates.append((abs_url, alt, parent_text, filename, figcaption))
+                            filename = urlparse(src_clean).path.split("/")[-1] if src_clean else ""
+                            figcaption = ""
+                            try:
+                                el = imgs.nth(i).locator("xpath=ancestor::figure[1]//figcaption")
+                                if el.count() > 0:
+                                    figcaption = el.nth(0).inner_text()
                             except Exception:
-                                continue
+                                figcaption = ""
+                            if src_clean:
+                                abs_url = urljoin(page.url, src_clean)
+                                candidates.append((abs_url, alt, parent_text, filename, figcaption))
+                        except Exception:
+                            continue
 
-                        for ni in network_images:
-                            candidates.append((ni, "", "", ni.split("/")[-1], ""))
+                    for ni in network_images:
+                        candidates.append((ni, "", "", ni.split("/")[-1], ""))
 
-                        unique_candidates = []
-                        for c in candidates:
-                            u = c[0]
-                            if not u:
-                                continue
-                            u_clean = re.sub(r'\?.*$', '', u)
-                            if u_clean in seen:
-                                continue
-                            seen.add(u_clean)
-                            unique_candidates.append((u_clean, c[1], c[2], c[3], c[4]))
+                    unique_candidates = []
+                    for c in candidates:
+                        u = c[0]
+                        if not u:
+                            continue
+                        u_clean = re.sub(r'\?.*$', '', u)
+                        if u_clean in seen:
+                            continue
+                        seen.add(u_clean)
+                        unique_candidates.append((u_clean, c[1], c[2], c[3], c[4]))
 
-                        print(f"[{self.nombre}] candidatos únicos: {len(unique_candidates)}")
+                    print(f"[{self.nombre}] candidatos únicos: {len(unique_candidates)}")
 
-                        for urlc, alt, parent_text, filename, figcaption in unique_candidates:
-                            if len(found) >= max_post:
-                                break
-                            if _is_placeholder_image(urlc):
-                                continue
+                    for urlc, alt, parent_text, filename, figcaption in unique_candidates:
+                        if len(found) >= max_post:
+                            break
+                        if _is_placeholder_image(urlc):
+                            continue
 
-                            score = _image_match_score(etiqueta, urlc, alt, parent_text, filename, figcaption)
+                        score = _image_match_score(etiqueta, urlc, alt, parent_text, filename, figcaption)
 
+                        status = None
+                        try:
+                            resp = page.request.get(urlc, timeout=8000)
+                            status = resp.status
+                        except Exception:
                             status = None
+
+                        if status == 401:
                             try:
-                                resp = page.request.get(urlc, timeout=8000)
-                                status = resp.status
+                                headers = {"Referer": page.url}
+                                resp2 = page.request.get(urlc, headers=headers, timeout=8000)
+                                status = resp2.status
                             except Exception:
-                                status = None
-
-                            if status == 401:
-                                try:
-                                    headers = {"Referer": page.url}
-                                    resp2 = page.request.get(urlc, headers=headers, timeout=8000)
-                                    status = resp2.status
-                                except Exception:
-                                    pass
+                                pass
 
-                            print(f"[{self.nombre}] candidato: {urlc} score={score:.2f} status={status} alt_len={len(alt)} filename='{filename}'")
+                        print(f"[{self.nombre}] candidato: {urlc} score={score:.2f} status={status} alt_len={len(alt)} filename='{filename}'")
 
-                            if (score >= SCORE_THRESHOLD and status == 200) or (score >= 0.8 and (status is None or status == 200)):
+                        if (score >= SCORE_THRESHOLD and status == 200) or (score >= 0.8 and (status is None or status == 200)):
+                            clean_url = re.sub(r'\?.*$', '', urlc)
+                            if clean_url not in found:
+                                found.append(clean_url)
+                        else:
+                            if status == 200 and score >= 0.45:
                                 clean_url = re.sub(r'\?.*$', '', urlc)
                                 if clean_url not in found:
                                     found.append(clean_url)
-                            else:
-                                if status == 200 and score >= 0.45:
-                                    clean_url = re.sub(r'\?.*$', '', urlc)
-                                    if clean_url not in found:
-                                        found.append(clean_url)
 
-                        page.wait_for_timeout(400)
+                    page.wait_for_timeout(400)
+                    page.remove_listener("response", on_response)
+                except Exception as e:
+                    print(f"[{self.nombre}] fallo seed {seed}: {e}")
+                    try:
                         page.remove_listener("response", on_response)
-                    except Exception as e:
-                        print(f"[{self.nombre}] fallo seed {seed}: {e}")
-                        try:
-                            page.remove_listener("response", on_response)
-                        except Exception:
-                            pass
-                        continue
+                    except Exception:
+                        pass
+                    continue
+            return found
 
-                try:
-                    page.close()
-                    context.close()
-                    browser.close()
-                except Exception:
-                    pass
+        try:
+            # El contexto (y su página) se crea y se cierra dentro del pool compartido
+            found = await self.pool.ejecutar_async(_recorrer_semillas, **opciones_contexto)
 
         except Exception as e:
             print(f"[{self.nombre}] Error general: {e}")
+            found = []
 
         print(f"[{self.nombre}] encontrados: {len(found)} (limit {max_post}) -> {found[:max_post]}")
         return found[:max_post]
@@ -0,0 +1,315 @@
+import json
+import os
+import re
+import threading
+import time
+from urllib.parse import urljoin, urlparse
+from .pool_navegadores import obtener_pool
+from .navegacion import navegar_hasta_preparada
+from .parseo import extraer_enlaces
+from .coincidencia import IndiceDifuso
+from .utilidades import limpiar_url_markdown, normalizar_nombre
+from .configuraciones import (
+    CONFIG_HSR, CONFIG_ZZZ, CONFIG_GI, CONFIG_FUENTES, CONFIG_INDICE_PERSONAJES,
+    CONFIG_COINCIDENCIA, ALIAS_PERSONAJES, FUENTE_GAMEWITH
+)
+
+
+class IndicePersonajes:
+    """
+    Índice persistente juego + fuente + nombre normalizado -> URL del personaje.
+    Se construye rastreando una vez cada url_base_* de configuraciones.py y se
+    refresca cuando el listado supera su TTL. Resolver una URL es una búsqueda
+    en diccionario en lugar de una navegación por el listado completo.
+    """
+
+    def __init__(self, pool=None, config=None):
+        self.nombre = "Indice"
+        self.pool = pool or obtener_pool()
+        self.config = dict(CONFIG_INDICE_PERSONAJES, **(config or {}))
+        self._candado = threading.Lock()
+        self._candados_listado = {}
+        self._difusos = {}
+        self.datos = self._cargar()
+
+    # Consultas
+
+    def resolver(self, juego, codigo_fuente, nombre_personaje, url_base=None, segmento_ruta=None):
+        """Devuelve la URL del personaje o None si el listado no lo contiene."""
+        listado = self.obtener_listado(juego, codigo_fuente, url_base, segmento_ruta)
+        if not listado:
+            return None
+        return listado["personajes"].get(normalizar_nombre(nombre_personaje))
+
+    def enlaces(self, juego, codigo_fuente, url_base=None, segmento_ruta=None):
+        """Todos los enlaces (texto, href absoluto) del listado, para búsquedas de respaldo."""
+        listado = self.obtener_listado(juego, codigo_fuente, url_base, segmento_ruta)
+        return listado["enlaces"] if listado else []
+
+    def candidatos_enlace(self, juego, codigo_fuente, nombre_personaje, url_base=None, segmento_ruta=None):
+        """Candidatos difusos [(url, puntuacion, clave)] entre los personajes del listado, mejor primero."""
+        listado = self.obtener_listado(juego, codigo_fuente, url_base, segmento_ruta)
+        if not listado:
+            return []
+        indice = self._indice_difuso(
+            ("enlaces", juego, codigo_fuente), listado["actualizado"],
+            lambda: listado["personajes"].items()
+        )
+        return indice.buscar(nombre_personaje, limite=CONFIG_COINCIDENCIA["max_candidatos"])
+
+    def resolver_nombre(self, juego, nombre_personaje):
+        """
+        Nombre canónico del personaje a partir de un nombre aproximado ("acheorn", "march"),
+        usando solo lo ya conocido: listados indexados, builds guardadas y alias. No rastrea.
+        Devuelve (nombre, puntuacion) o None si ningún candidato supera el umbral.
+        """
+        indice = self.indice_nombres(juego)
+        if indice is None:
+            return None
+        mejor = indice.mejor(nombre_personaje, CONFIG_COINCIDENCIA["umbral_nombre"])
+        return (mejor[0], mejor[1]) if mejor else None
+
+    def indice_nombres(self, juego):
+        """
+        Nomenclátor del juego: IndiceDifuso alias/nombre -> nombre canónico con todo lo
+        conocido (alias, listados indexados y builds guardadas). None si el juego no existe.
+        """
+        config = {"HSR": CONFIG_HSR, "ZZZ": CONFIG_ZZZ, "GI": CONFIG_GI}.get(juego)
+        if not config:
+            return None
+        ruta_builds = config["ruta_archivo"]
+        marca = (
+            tuple(l["actualizado"] for c, l in sorted(self.datos["listados"].items()) if c.startswith(f"{juego}|")),
+            os.path.getmtime(ruta_builds) if os.path.exists(ruta_builds) else 0
+        )
+        return self._indice_difuso(("nombres", juego), marca, lambda: self._nombres_conocidos(juego, ruta_builds))
+
+    def tiene_listado_vigente(self, juego):
+        """True si algún listado del juego está indexado y dentro de su TTL (el nomenclátor es completo)."""
+        return any(
+            clave.startswith(f"{juego}|") and not self._vencido(listado)
+            for clave, listado in list(self.datos["listados"].items())
+        )
+
+    def _nombres_conocidos(self, juego, ruta_builds):
+        """Pares (alias, nombre canónico); el primero que registra una clave prevalece."""
+        for alias, nombre in ALIAS_PERSONAJES.get(juego, {}).items():
+            yield alias, nombre
+            yield nombre, nombre
+
+        for clave, listado in sorted(self.datos["listados"].items()):
+            juego_listado, codigo_fuente = clave.split("|", 1)
+            if juego_listado != juego:
+                continue
+            patron = re.compile(CONFIG_FUENTES.get(codigo_fuente, {}).get("patron_enlace", r"$^"))
+            for texto, href in listado["enlaces"]:
+                if not patron.search(href):
+                    continue
+                slug = re.sub(r'-build$', '', urlparse(href).path.rstrip('/').split('/')[-1])
+                # Los IDs numéricos (GameWith) no dan un nombre utilizable en las demás fuentes
+                if slug.isdigit():
+                    continue
+                nombre = slug.replace('-', ' ').replace('_', ' ').lower()
+                yield nombre, nombre
+                yield texto, nombre
+
+        if os.path.exists(ruta_builds):
+            with open(ruta_builds, 'r', encoding='utf-8') as f:
+                try:
+                    builds = json.load(f)
+                except json.JSONDecodeError:
+                    builds = {}
+            prefijo = f"{juego.lower()}_"
+            for clave_build in builds:
+                if clave_build.startswith(prefijo):
+                    nombre = clave_build[len(prefijo):].replace('_', ' ')
+                    yield nombre, nombre
+
+    def _indice_difuso(self, clave, marca, entradas):
+        """IndiceDifuso cacheado; se reconstruye cuando cambia la marca (listado o builds actualizados)."""
+        with self._candado:
+            guardado = self._difusos.get(clave)
+            if guardado and guardado[0] == marca:
+                return guardado[1]
+        indice = IndiceDifuso(entradas())
+        with self._candado:
+            self._difusos[clave] = (marca, indice)
+        return indice
+
+    def mapa_gamewith(self):
+        """
+        Nombre normalizado -> ID de artículo GameWith. Parte del mapa semilla de
+        CONFIG_GI y se completa con los artículos del listado: sus enlaces solo tienen
+        el ID y el nombre en japonés, que se traduce al canónico con los alias japoneses
+        de ALIAS_PERSONAJES["GI"] (el enlace puede llevar un sufijo: "フリーナの評価").
+        """
+        mapa = {normalizar_nombre(k): v for k, v in CONFIG_GI.get("mapa_id_gamewith", {}).items()}
+        listado = self.datos["listados"].get(self._clave("GI", FUENTE_GAMEWITH))
+        if not listado:
+            return mapa
+
+        # Los alias más largos primero: "雷電将軍" antes que un posible "雷電"
+        nombres_japoneses = sorted(
+            ((normalizar_nombre(alias), nombre) for alias, nombre in ALIAS_PERSONAJES.get("GI", {}).items() if not alias.isascii()),
+            key=lambda par: len(par[0]), reverse=True
+        )
+        patron = re.compile(CONFIG_FUENTES[FUENTE_GAMEWITH]["patron_enlace"])
+        for texto, href in listado["enlaces"]:
+            coincidencia = patron.search(href)
+            clave_texto = normalizar_nombre(texto)
+            if not coincidencia or not clave_texto:
+                continue
+            nombre = next((n for alias, n in nombres_japoneses if clave_texto.startswith(alias)), None)
+            if nombre:
+                mapa.setdefault(normalizar_nombre(nombre), coincidencia.group(1))
+        return mapa
+
+    def obtener_listado(self, juego, codigo_fuente, url_base=None, segmento_ruta=None):
+        """Devuelve el listado indexado, rastreándolo de nuevo si falta o venció su TTL."""
+        clave = self._clave(juego, codigo_fuente)
+        listado = self.datos["listados"].get(clave)
+        if listado and not self._vencido(listado):
+            return listado
+
+        if not url_base:
+            url_base, segmento_ruta = self._url_base_de(juego, codigo_fuente)
+            if not url_base:
+                return listado
+
+        with self._candado_listado(clave):
+            # Otro hilo pudo haberlo actualizado mientras esperábamos
+            listado = self.datos["listados"].get(clave)
+            if listado and not self._vencido(listado):
+                return listado
+            return self.actualizar_listado(juego, codigo_fuente, url_base, segmento_ruta) or listado
+
+    # Construcción
+
+    def construir(self, forzar=False):
+        """Rastrea todos los url_base_* de los juegos configurados."""
+        for config in (CONFIG_HSR, CONFIG_ZZZ, CONFIG_GI):
+            for codigo_fuente, clave_url, clave_segmento in config["listados"]:
+                clave = self._clave(config["juego"], codigo_fuente)
+                listado = self.datos["listados"].get(clave)
+                if forzar or not listado or self._vencido(listado):
+                    with self._candado_listado(clave):
+                        self.actualizar_listado(config["juego"], codigo_fuente, config[clave_url], config.get(clave_segmento))
+        return self.resumen()
+
+    def actualizar_listado(self, juego, codigo_fuente, url_base, segmento_ruta=None):
+        url_base = limpiar_url_markdown(url_base)
+        print(f"[{self.nombre}] Rastreando listado {codigo_fuente} ({juego}): {url_base}")
+
+        estrategia = CONFIG_FUENTES.get(codigo_fuente, {}).get("preparacion_listado")
+
+        def _cargar_listado(pagina):
+            return navegar_hasta_preparada(pagina, url_base, codigo_fuente, estrategia, fase="listado")
+
+        try:
+            contenido_html = self.pool.ejecutar(_cargar_listado)
+        except Exception as e:
+            print(f"[{self.nombre}] Error rastreando {codigo_fuente}: {e}")
+            return None
+
+        listado = self._indexar(contenido_html, codigo_fuente, url_base)
+        with self._candado:
+            self.datos["listados"][self._clave(juego, codigo_fuente)] = listado
+            self._guardar()
+        print(f"[{self.nombre}] {codigo_fuente} ({juego}): {len(listado['personajes'])} personajes indexados.")
+        return listado
+
+    def _indexar(self, contenido_html, codigo_fuente, url_base):
+        config_fuente = CONFIG_FUENTES.get(codigo_fuente, {})
+        patron = re.compile(config_fuente.get("patron_enlace", r"$^"))
+        dominio = config_fuente.get("dominio", url_base)
+
+        enlaces = []
+        personajes = {}
+        for texto, href in extraer_enlaces(contenido_html):
+            href = limpiar_url_markdown(urljoin(dominio + "/", href))
+            enlaces.append([texto, href])
+
+            if not patron.search(href):
+                continue
+            # Clave desde el slug de la URL (más fiable) y desde el texto del enlace
+            slug = urlparse(href).path.rstrip('/').split('/')[-1]
+            slug = re.sub(r'-build$', '', slug)
+            for candidato in (slug, texto):
+                clave = normalizar_nombre(candidato)
+                if clave and not clave.isdigit() and len(clave) <= 40:
+                    personajes.setdefault(clave, href)
+
+        return {"url_base": url_base, "actualizado": time.time(), "personajes": personajes, "enlaces": enlaces}
+
+    # Persistencia
+
+    def _cargar(self):
+        ruta = self.config["ruta_archivo"]
+        if os.path.exists(ruta):
+            with open(ruta, 'r', encoding='utf-8') as f:
+                try:
+                    datos = json.load(f)
+                    if "listados" in datos:
+                        return datos
+                except json.JSONDecodeError:
+                    pass
+        return {"listados": {}}
+
+    def _guardar(self):
+        ruta = self.config["ruta_archivo"]
+        ruta_temporal = ruta + ".tmp"
+        with open(ruta_temporal, 'w', encoding='utf-8') as f:
+            json.dump(self.datos, f, ensure_ascii=False)
+        os.replace(ruta_temporal, ruta)
+
+    # Auxiliares
+
+    def resumen(self):
+        return {
+            clave: {"personajes": len(l["personajes"]), "edad_s": int(time.time() - l["actualizado"])}
+            for clave, l in self.datos["listados"].items()
+        }
+
+    def _clave(self, juego, codigo_fuente):
+        return f"{juego}|{codigo_fuente}"
+
+    def _vencido(self, listado):
+        return time.time() - listado.get("actualizado", 0) > self.config["ttl_s"]
+
+    def _candado_listado(self, clave):
+        with self._candado:
+            return self._candados_listado.setdefault(clave, threading.Lock())
+
+    def juego_de_url_base(self, url_base):
+        for config in (CONFIG_HSR, CONFIG_ZZZ, CONFIG_GI):
+            for _, clave_url, _ in config["listados"]:
+                if limpiar_url_markdown(config[clave_url]) == url_base:
+                    return config["juego"]
+        return None
+
+    def _url_base_de(self, juego, codigo_fuente):
+        config = {"HSR": CONFIG_HSR, "ZZZ": CONFIG_ZZZ, "GI": CONFIG_GI}.get(juego)
+        if config:
+            for fuente, clave_url, clave_segmento in config["listados"]:
+                if fuente == codigo_fuente:
+                    return config[clave_url], config.get(clave_segmento)
+        return None, None
+
+
+_indice_global = None
+_candado_global = threading.Lock()
+
+
+def obtener_indice():
+    """Devuelve el índice compartido del proceso (se crea bajo demanda)."""
+    global _indice_global
+    with _candado_global:
+        if _indice_global is None:
+            _indice_global = IndicePersonajes()
+        return _indice_global
+
+
+if __name__ == "__main__":
+    # Uso: python -m agentes.indice_personajes  (reconstruye todos los listados)
+    print(json.dumps(obtener_indice().construir(forzar=True), indent=4, ensure_ascii=False))
+    obtener_pool().cerrar()
@@ -1,56 +1,90 @@
-import re
 import time
-from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright
 from .base import AgenteBase
-from .utilidades import limpiar_url_markdown
+from .pool_navegadores import obtener_pool
+from .indice_personajes import obtener_indice
+from .obtencion import ClienteHTTP
+from .cache_disco import CacheDisco
+from .navegacion import navegar_hasta_preparada
+from .parseo import extraer_texto_seccion
+from .utilidades import limpiar_url_markdown, normalizar_nombre, ejecutar_sincrono, emitir, en_hilo
 from .configuraciones import (
-    CONFIG_GI, 
-    FUENTE_PRYDWEN, FUENTE_GAME8, FUENTE_HONKAILAB,
+    CONFIG_FUENTES, CONFIG_CACHE_PAGINAS, CONFIG_COINCIDENCIA,
+    FUENTE_PRYDWEN, FUENTE_HONKAILAB,
     FUENTE_GENSHINLAB, FUENTE_GENSHINBUILD, FUENTE_GAMEWITH
 )
 
 class AgenteInvestigador(AgenteBase):
-    def __init__(self, nombre="Investigador"):
+    def __init__(self, nombre="Investigador", pool=None, indice=None):
         super().__init__(nombre)
+        self.pool = pool or obtener_pool()
+        self.indice = indice or obtener_indice()
+        self.cliente_http = ClienteHTTP()
+        self.cache_paginas = CacheDisco(
+            CONFIG_CACHE_PAGINAS["directorio"], CONFIG_CACHE_PAGINAS["ttl_s"], CONFIG_CACHE_PAGINAS["max_mb"], nombre="CachePaginas"
+        )
 
     def procesar_solicitud(self, datos):
+        """Envoltorio síncrono de procesar_solicitud_async."""
+        return ejecutar_sincrono(self.procesar_solicitud_async(datos))
+
+    async def procesar_solicitud_async(self, datos):
         """
         Espera que datos contenga:
         - url_base
         - nombre_personaje
         - segmento_ruta
         - codigo_fuente
+        - juego (opcional, se deduce de url_base)
+        - notificar (opcional, eventos de progreso)
         """
         url_base = datos.get("url_base")
         nombre_personaje = datos.get("nombre_personaje")
         segmento_ruta = datos.get("segmento_ruta")
         codigo_fuente = datos.get("codigo_fuente")
+        juego = datos.get("juego")
+        notificar = datos.get("notificar")
         
         print(f"[{self.nombre}] Buscando URL...")
-        url_personaje = self.obtener_url_personaje(url_base, nombre_personaje, segmento_ruta, codigo_fuente)
+        inicio = time.monotonic()
+        url_personaje = await en_hilo(
+            self.obtener_url_personaje, url_base, nombre_personaje, segmento_ruta, codigo_fuente, juego
+        )
         
+        ms_resolucion = (time.monotonic() - inicio) * 1000
         if url_personaje:
-            print(f"[{self.nombre}] Obteniendo contenido de {url_personaje}...")
-            sopa = self.obtener_y_analizar(url_personaje, codigo_fuente)
-            if sopa:
-                print(f"[{self.nombre}] Extrayendo texto...")
-                contenido_texto = self.extraer_texto(sopa, codigo_fuente)
-                return {"exito": True, "contenido_texto": contenido_texto, "url": url_personaje}
+            emitir(notificar, "url_resuelta", url=url_personaje)
+            inicio = time.monotonic()
+            contenido_texto = await en_hilo(self.cache_paginas.obtener, url_personaje)
+            if contenido_texto is not None:
+                print(f"[{self.nombre}] Contenido servido desde caché: {url_personaje} {self._resumen_cache()}")
+                return {"exito": True, "contenido_texto": contenido_texto, "url": url_personaje, "desde_cache": True,
+                        "ms_resolucion": ms_resolucion, "ms_descarga": (time.monotonic() - inicio) * 1000}
+
+            print(f"[{self.nombre}] Obteniendo contenido de {url_personaje}... {self._resumen_cache()}")
+            contenido_texto = await self.obtener_texto_async(url_personaje, codigo_fuente)
+            if contenido_texto is not None:
+                if contenido_texto:
+                    await en_hilo(self.cache_paginas.guardar, url_personaje, contenido_texto)
+                return {"exito": True, "contenido_texto": contenido_texto, "url": url_personaje, "desde_cache": False,
+                        "ms_resolucion": ms_resolucion, "ms_descarga": (time.monotonic() - inicio) * 1000}
         
-        return {"exito": False, "error": "No se pudo recuperar el contenido."}
+        return {"exito": False, "error": "No se pudo recuperar el contenido.", "url": url_personaje, "ms_resolucion": ms_resolucion}
+
+    def _resumen_cache(self):
+        estadisticas = self.cache_paginas.estadisticas()
+        return f"(caché: {estadisticas['aciertos']} aciertos / {estadisticas['fallos']} fallos)"
 
-    def obtener_url_personaje(self, url_base, nombre_personaje, segmento_ruta, codigo_fuente):
+    def obtener_url_personaje(self, url_base, nombre_personaje, segmento_ruta, codigo_fuente, juego=None):
         url_base = limpiar_url_markdown(url_base)
         target_name_normalized = nombre_personaje.strip().lower().replace(" ", "-").replace("_", "-").replace("'", "")
-        target_name_simple = nombre_personaje.strip().lower()
+        juego = juego or self.indice.juego_de_url_base(url_base)
         
         segmento_enlace_check = ""
         
         if codigo_fuente == FUENTE_GAMEWITH:
-            # Chequeo de Mapa de ID
-            target_name_key = target_name_normalized.replace("-", "")
-            mapa_gamewith = CONFIG_GI.get("mapa_id_gamewith", {})
+            # Chequeo de Mapa de ID (semilla de configuración + IDs rastreados por el índice)
+            target_name_key = normalizar_nombre(nombre_personaje)
+            mapa_gamewith = self.indice.mapa_gamewith()
             
             if target_name_key in mapa_gamewith:
                   id_articulo = mapa_gamewith[target_name_key]
@@ -67,132 +101,88 @@ class AgenteInvestigador(AgenteBase):
             segmento_enlace_check = f"{segmento_ruta}{target_name_normalized}"
         
         print(f"[{self.nombre}] Buscando enlace para: {nombre_personaje} en {url_base}")
+
+        # Búsqueda directa en el índice de personajes (sin navegar el listado)
+        url_completa = self.indice.resolver(juego, codigo_fuente, nombre_personaje, url_base, segmento_ruta)
+        if url_completa:
+            print(f"[{self.nombre}] Enlace encontrado en índice: {url_completa}")
+            return url_completa
+
+        if codigo_fuente == FUENTE_GAMEWITH and url_base.count('/') > 4: 
+            print(f"La URL base parece ser un artículo: {url_base}")
+            return url_base
+
+        # Respaldo sobre los enlaces ya indexados del listado
+        enlaces = self.indice.enlaces(juego, codigo_fuente, url_base, segmento_ruta)
+        enlace = None
+
+        # Estrategia 1: Busqueda por slug en HREF
+        if segmento_enlace_check:
+            enlace = next((href for _, href in enlaces if segmento_enlace_check in href), None)
         
-        try:
-            with sync_playwright() as p:
-                navegador = p.chromium.launch(headless=True)
-                pagina = navegador.new_page()
-                pagina.goto(url_base, wait_until='domcontentloaded', timeout=90000) 
-                
-                # Espera dinámica para Prydwen
-                if codigo_fuente == FUENTE_PRYDWEN:
-                    selector_a_esperar = 'a[href*="/agents/"], a[href*="/characters/"]'
-                    try:
-                        pagina.wait_for_selector(selector_a_esperar, timeout=20000)
-                    except Exception as e:
-                        print(f"Advertencia: Selector de lista Prydwen no apareció. Fallback 5s. Error: {e}")
-                        pagina.wait_for_timeout(5000)
-                else:
-                    pagina.wait_for_timeout(5000)
-    
-                contenido_html = pagina.content()
-                navegador.close()
-                
-                sopa = BeautifulSoup(contenido_html, 'html.parser')
-                enlace = None
-                
-                if codigo_fuente == FUENTE_GAMEWITH and url_base.count('/') > 4: 
-                    print(f"La URL base parece ser un artículo: {url_base}")
-                    return url_base
-    
-                # Estrategia 1: Busqueda por slug en HREF
-                if segmento_enlace_check:
-                    enlace = sopa.find('a', href=lambda href: href and segmento_enlace_check in href)
-                
-                # Estrategia 2: Busqueda por texto
-                if not enlace:
-                    print(f"[{self.nombre}] Fallback a búsqueda por texto para {codigo_fuente}.")
-                    todos_los_enlaces = sopa.find_all('a', href=True)
-                    busqueda_normalizada = target_name_simple.replace(" ", "").replace("_", "").replace("'", "")
-                    
-                    for a in todos_los_enlaces:
-                        texto_enlace = a.get_text(strip=True).strip().lower()
-                        texto_enlace_normalizado = texto_enlace.replace(" ", "").replace("_", "").replace("'", "")
-                        
-                        if texto_enlace_normalizado == busqueda_normalizada:
-                            enlace = a
-                            break
-                        
-                        if len(busqueda_normalizada) > 3 and busqueda_normalizada in texto_enlace_normalizado:
-                            if any(char.isalpha() for char in texto_enlace): 
-                                enlace = a
-                                break
-    
-                if enlace:
-                    url_completa = enlace['href']
-                    if not url_completa.startswith("http"):
-                        if codigo_fuente == FUENTE_PRYDWEN:
-                            url_completa = "https://www.prydwen.gg" + url_completa
-                        elif codigo_fuente == FUENTE_HONKAILAB:
-                            url_completa = "https://honkailab.com" + url_completa
-                        elif codigo_fuente == FUENTE_GENSHINLAB:
-                            url_completa = "https://genshinlab.com" + url_completa
-                        elif codigo_fuente == FUENTE_GENSHINBUILD: 
-                            url_completa = "https://genshin-builds.com" + url_completa
-                        elif codigo_fuente == FUENTE_GAMEWITH: 
-                            url_completa = "https://gamewith.jp" + url_completa 
-                            
-                    url_completa = limpiar_url_markdown(url_completa)
-                    print(f"[{self.nombre}] Enlace encontrado: {url_completa}")
-                    return url_completa
-                else:
-                    print(f"[{self.nombre}] Enlace no encontrado para '{nombre_personaje}'.")
-                    return None
-    
-        except Exception as e:
-            print(f"Error en obtener_url_personaje para {codigo_fuente}: {e}")
+        # Estrategia 2: Coincidencia difusa sobre los personajes del listado
+        if not enlace:
+            print(f"[{self.nombre}] Fallback a coincidencia difusa para {codigo_fuente}.")
+            candidatos = self.indice.candidatos_enlace(juego, codigo_fuente, nombre_personaje, url_base, segmento_ruta)
+            if candidatos:
+                print(f"[{self.nombre}] Candidatos: " + ", ".join(f"{clave} ({puntuacion:.2f})" for _, puntuacion, clave in candidatos[:3]))
+                href, puntuacion, _ = candidatos[0]
+                if puntuacion >= CONFIG_COINCIDENCIA["umbral_enlace"]:
+                    enlace = href
+
+        if enlace:
+            url_completa = limpiar_url_markdown(enlace)
+            print(f"[{self.nombre}] Enlace encontrado: {url_completa}")
+            return url_completa
+        else:
+            print(f"[{self.nombre}] Enlace no encontrado para '{nombre_personaje}'.")
             return None
 
-    def obtener_y_analizar(self, url, codigo_fuente):
+    async def obtener_texto_async(self, url, codigo_fuente):
+        """
+        Ruta HTTP primero (con revalidación condicional). Solo se recurre a Playwright
+        si la fuente está marcada como renderizada por JS o si el texto extraído no
+        supera el chequeo de longitud de extraer_texto.
+        Devuelve None si ninguna de las dos rutas obtuvo la página.
+        """
         url = limpiar_url_markdown(url)
+        if self.cliente_http.disponible and not CONFIG_FUENTES.get(codigo_fuente, {}).get("renderizado_js"):
+            contenido_html = await en_hilo(self.cliente_http.obtener, url)
+            if contenido_html:
+                print(f"[{self.nombre}] Extrayendo texto (HTTP)...")
+                try:
+                    contenido_texto = await en_hilo(self._extraer_de_html, contenido_html, codigo_fuente)
+                except Exception as e:
+                    print(f"[{self.nombre}] Error extrayendo el HTML estático: {e}")
+                    contenido_texto = ""
+                if contenido_texto:
+                    return contenido_texto
+                print(f"[{self.nombre}] HTML estático insuficiente, usando Playwright.")
+
         print(f"[{self.nombre}] Playwright obteniendo: {url}")
         try:
-            with sync_playwright() as p:
-                navegador = p.chromium.launch(headless=True)
-                pagina = navegador.new_page()
-                pagina.goto(url, wait_until='domcontentloaded', timeout=90000) 
-                pagina.wait_for_timeout(5000)
-                
-                # Manejo de pop-ups
-                selectores_cookies = ['text="Accept"', 'text="Aceptar"', 'text="I accept"', 'text="Consent"'] 
-                try:
-                    for selector in selectores_cookies:
-                        pagina.click(selector, timeout=100) 
-                except:
-                    pass
-                    
-                pagina.wait_for_selector('h1, article, body', timeout=15000) 
-                pagina.wait_for_timeout(2000) 
-    
-                contenido_html = pagina.content()
-                navegador.close()
-                return BeautifulSoup(contenido_html, 'html.parser')
-    
+            contenido_html = await self.pool.ejecutar_async(self._renderizador(url, codigo_fuente))
+            print(f"[{self.nombre}] Extrayendo texto...")
+            return await en_hilo(self._extraer_de_html, contenido_html, codigo_fuente)
         except Exception as e:
             print(f"[{self.nombre}] Error obteniendo {codigo_fuente}: {e}")
             return None
 
-    def extraer_texto(self, sopa, fuente):
-        if fuente == FUENTE_PRYDWEN:
-             seccion_build = sopa.find('div', id='page-content') or sopa.main
-        elif fuente == FUENTE_GAME8:
-             seccion_build = sopa.find('article', class_=re.compile(r'a-article')) or sopa.main
-        elif fuente == FUENTE_HONKAILAB or fuente == FUENTE_GENSHINLAB: 
-             seccion_build = sopa.find('div', class_='entry-content') or sopa.main
-        elif fuente == FUENTE_GENSHINBUILD: 
-             seccion_build = sopa.find('div', class_='main-content') or sopa.find('article') or sopa.main
-        elif fuente == FUENTE_GAMEWITH: 
-             seccion_build = sopa.find('div', class_='gdb_col_content') or sopa.find('div', id='page_content') or sopa.main
-        else:
-            seccion_build = None
+    def _renderizador(self, url, codigo_fuente):
+        """Tarea para el pool de navegadores: navega hasta que la build está presente y devuelve el HTML."""
+        estrategia = CONFIG_FUENTES.get(codigo_fuente, {}).get("preparacion")
 
-        if not seccion_build:
-             seccion_build = sopa.body
-        
-        if seccion_build:
-            texto_completo = seccion_build.get_text(separator=' ', strip=True)
-            if len(texto_completo) < 500:
-                print(f"[{self.nombre}] Texto extraído muy corto (<500 caracteres).")
-                return ""
-            return texto_completo
-        return ""
+        def _renderizar(pagina):
+            return navegar_hasta_preparada(pagina, url, codigo_fuente, estrategia)
+
+        return _renderizar
+
+    def _extraer_de_html(self, contenido_html, codigo_fuente):
+        # Parseo dirigido: solo el contenedor de la build, sin árbol de la página completa
+        return self._validar_longitud(extraer_texto_seccion(contenido_html, codigo_fuente))
+
+    def _validar_longitud(self, texto_completo):
+        if len(texto_completo) < 500:
+            print(f"[{self.nombre}] Texto extraído muy corto (<500 caracteres).")
+            return ""
+        return texto_completo
@@ -0,0 +1,188 @@
+import re
+import threading
+import time
+from urllib.parse import urlparse
+from .configuraciones import CONFIG_BLOQUEO_RECURSOS, CONFIG_FUENTES
+
+# Esperas fijas que usaba el Investigador antes de las estrategias por fuente,
+# para medir el tiempo ahorrado en cada navegación.
+ESPERA_FIJA_PREVIA_MS = {
+    "pagina": 5000 + 2000 + 4 * 100,  # 5 s + 2 s + clic de cookies (100 ms por selector)
+    "listado": 5000
+}
+
+TIMEOUT_PREPARACION_MS = 15000
+
+PATRON_BOTON_COOKIES = re.compile(r"^\s*(accept|aceptar|i accept|consent|accept all|aceptar todo)\s*$", re.IGNORECASE)
+
+
+def esperar_preparacion(pagina, estrategia):
+    """
+    Espera hasta que la página esté lista según la estrategia de la fuente:
+    - selector: el contenido de la build está en el DOM
+    - red_inactiva: no hay peticiones de red en curso
+    - dom_estable: el tamaño del DOM no cambia entre varias mediciones
+    Devuelve True si la condición se cumplió antes del timeout.
+    """
+    estrategia = estrategia or {"tipo": "dom_estable"}
+    tipo = estrategia.get("tipo")
+    timeout_ms = estrategia.get("timeout_ms", TIMEOUT_PREPARACION_MS)
+
+    try:
+        if tipo == "selector":
+            pagina.wait_for_selector(estrategia["selector"], state="attached", timeout=timeout_ms)
+            return True
+        if tipo == "red_inactiva":
+            pagina.wait_for_load_state("networkidle", timeout=timeout_ms)
+            return True
+        return _esperar_dom_estable(pagina, timeout_ms)
+    except Exception as e:
+        print(f"Advertencia: preparación '{tipo}' no se cumplió en {timeout_ms} ms: {e}")
+        return False
+
+
+def _esperar_dom_estable(pagina, timeout_ms, intervalo_ms=250, repeticiones=3):
+    inicio = time.monotonic()
+    tamano_anterior = -1
+    estables = 0
+    while (time.monotonic() - inicio) * 1000 < timeout_ms:
+        tamano = pagina.evaluate("() => document.body ? document.body.innerHTML.length : 0")
+        if tamano and tamano == tamano_anterior:
+            estables += 1
+            if estables >= repeticiones:
+                return True
+        else:
+            estables = 0
+        tamano_anterior = tamano
+        pagina.wait_for_timeout(intervalo_ms)
+    return False
+
+
+def cerrar_banner_cookies(pagina):
+    """Pulsa el botón de consentimiento si ya está en la página, sin esperar a que aparezca."""
+    try:
+        boton = pagina.get_by_role("button", name=PATRON_BOTON_COOKIES)
+        if boton.count() > 0:
+            boton.first.click(timeout=1000)
+            return True
+    except Exception:
+        pass
+    return False
+
+
+class MetricasEspera:
+    """Acumula por fuente y fase el tiempo de espera real y el ahorrado frente a las esperas fijas."""
+
+    def __init__(self):
+        self._candado = threading.Lock()
+        self.datos = {}
+
+    def registrar(self, codigo_fuente, fase, ms_espera, estrategia=None):
+        fija = (estrategia or {}).get("espera_fija_previa_ms", ESPERA_FIJA_PREVIA_MS[fase])
+        ahorro = fija - ms_espera
+        with self._candado:
+            entrada = self.datos.setdefault(f"{codigo_fuente}|{fase}", {"navegaciones": 0, "ms_espera": 0.0, "ms_ahorrados": 0.0})
+            entrada["navegaciones"] += 1
+            entrada["ms_espera"] += ms_espera
+            entrada["ms_ahorrados"] += ahorro
+        print(f"[Navegacion] {codigo_fuente} ({fase}) lista en {ms_espera:.0f} ms (ahorro {ahorro:+.0f} ms vs espera fija)")
+        return ahorro
+
+    def resumen(self):
+        with self._candado:
+            return {
+                clave: {
+                    "navegaciones": e["navegaciones"],
+                    "ms_espera_medio": round(e["ms_espera"] / e["navegaciones"]),
+                    "ms_ahorrados_total": round(e["ms_ahorrados"])
+                }
+                for clave, e in self.datos.items()
+            }
+
+
+metricas_espera = MetricasEspera()
+
+
+def _dominio_en(host, dominios):
+    return any(host == d or host.endswith("." + d) for d in dominios)
+
+
+class BloqueoRecursos:
+    """
+    Intercepta las peticiones de una página y aborta imágenes, fuentes, media y
+    tráfico de anuncios/analítica según las listas globales y las de la fuente.
+    Cuenta las peticiones bloqueadas y estima los bytes ahorrados.
+    """
+
+    def __init__(self, codigo_fuente):
+        config_fuente = CONFIG_FUENTES.get(codigo_fuente, {}).get("bloqueo", {})
+        self.codigo_fuente = codigo_fuente
+        self.tipos = set(CONFIG_BLOQUEO_RECURSOS["bloquear_tipos"]) | set(config_fuente.get("bloquear_tipos", []))
+        self.dominios = list(CONFIG_BLOQUEO_RECURSOS["bloquear_dominios"]) + config_fuente.get("bloquear_dominios", [])
+        self.permitidos = config_fuente.get("permitir_dominios", [])
+        self.bytes_estimados = CONFIG_BLOQUEO_RECURSOS["bytes_estimados"]
+        self.peticiones_permitidas = 0
+        self.peticiones_bloqueadas = 0
+        self.bytes_ahorrados = 0
+
+    def instalar(self, pagina):
+        pagina.route("**/*", self._manejar)
+        return self
+
+    def _manejar(self, ruta, peticion):
+        tipo = peticion.resource_type
+        host = (urlparse(peticion.url).hostname or "").lower()
+
+        bloquear = False
+        if not _dominio_en(host, self.permitidos):
+            bloquear = tipo in self.tipos or _dominio_en(host, self.dominios)
+
+        if bloquear:
+            self.peticiones_bloqueadas += 1
+            self.bytes_ahorrados += self.bytes_estimados.get(tipo, self.bytes_estimados["otro"])
+            ruta.abort()
+        else:
+            self.peticiones_permitidas += 1
+            ruta.continue_()
+
+
+class MetricasBloqueo:
+    """Acumula por fuente las peticiones y bytes (estimados) ahorrados por el bloqueo."""
+
+    def __init__(self):
+        self._candado = threading.Lock()
+        self.datos = {}
+
+    def registrar(self, bloqueo):
+        with self._candado:
+            entrada = self.datos.setdefault(bloqueo.codigo_fuente, {"navegaciones": 0, "peticiones_bloqueadas": 0, "peticiones_permitidas": 0, "bytes_ahorrados": 0})
+            entrada["navegaciones"] += 1
+            entrada["peticiones_bloqueadas"] += bloqueo.peticiones_bloqueadas
+            entrada["peticiones_permitidas"] += bloqueo.peticiones_permitidas
+            entrada["bytes_ahorrados"] += bloqueo.bytes_ahorrados
+        print(f"[Navegacion] {bloqueo.codigo_fuente}: {bloqueo.peticiones_bloqueadas} peticiones bloqueadas "
+              f"(~{bloqueo.bytes_ahorrados / 1024:.0f} KB), {bloqueo.peticiones_permitidas} permitidas")
+
+    def resumen(self):
+        with self._candado:
+            return {fuente: dict(e) for fuente, e in self.datos.items()}
+
+
+metricas_bloqueo = MetricasBloqueo()
+
+
+def navegar_hasta_preparada(pagina, url, codigo_fuente, estrategia, fase="pagina"):
+    """
+    Bloqueo de recursos + goto + estrategia de preparación + banner de cookies,
+    registrando el tiempo de espera y lo ahorrado por el bloqueo.
+    """
+    bloqueo = BloqueoRecursos(codigo_fuente).instalar(pagina)
+    pagina.goto(url, wait_until='domcontentloaded', timeout=90000)
+    inicio = time.monotonic()
+    esperar_preparacion(pagina, estrategia)
+    if fase == "pagina":
+        cerrar_banner_cookies(pagina)
+    metricas_espera.registrar(codigo_fuente, fase, (time.monotonic() - inicio) * 1000, estrategia)
+    contenido_html = pagina.content()
+    metricas_bloqueo.registrar(bloqueo)
+    return contenido_html
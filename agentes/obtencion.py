@@ -0,0 +1,96 @@
+import threading
+from .cache_disco import CacheDisco
+from .configuraciones import CONFIG_HTTP
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    requests = None
+
+
+class ClienteHTTP:
+    """
+    Cliente HTTP con conexiones reutilizadas (keep-alive) y GET condicional.
+    Guarda una copia local de cada página junto a su ETag / Last-Modified y la
+    revalida en cada petición: un 304 devuelve la copia sin volver a descargarla.
+    Las copias viven en una CacheDisco (TTL y expulsión LRU acotada por tamaño).
+    """
+
+    def __init__(self, config=None):
+        self.nombre = "ClienteHTTP"
+        self.config = dict(CONFIG_HTTP, **(config or {}))
+        self.copias = CacheDisco(
+            self.config["directorio_copias"], self.config["ttl_copias_s"], self.config["max_mb_copias"], nombre="CopiasHTTP"
+        )
+        self.sesion = self._crear_sesion()
+        self._candado = threading.Lock()
+        self.metricas = {"descargas": 0, "revalidadas_304": 0, "errores": 0}
+
+    def _crear_sesion(self):
+        if requests is None:
+            print(f"[{self.nombre}] 'requests' no está instalado; se usará solo Playwright.")
+            return None
+        sesion = requests.Session()
+        adaptador = HTTPAdapter(pool_connections=10, pool_maxsize=self.config["max_conexiones"], max_retries=1)
+        sesion.mount("https://", adaptador)
+        sesion.mount("http://", adaptador)
+        sesion.headers.update({
+            "User-Agent": self.config["user_agent"],
+            "Accept": "text/html,application/xhtml+xml",
+            "Accept-Language": "es,en;q=0.8"
+        })
+        return sesion
+
+    @property
+    def disponible(self):
+        return self.sesion is not None
+
+    def obtener(self, url):
+        """Devuelve el HTML de la URL (descargado o revalidado) o None si falla."""
+        if not self.disponible:
+            return None
+
+        copia = self.copias.obtener(url) or {}
+
+        cabeceras = {}
+        if copia.get("etag"):
+            cabeceras["If-None-Match"] = copia["etag"]
+        if copia.get("last_modified"):
+            cabeceras["If-Modified-Since"] = copia["last_modified"]
+
+        try:
+            respuesta = self.sesion.get(url, headers=cabeceras, timeout=self.config["timeout_s"])
+        except Exception as e:
+            print(f"[{self.nombre}] Error HTTP en {url}: {e}")
+            self._contar("errores")
+            return None
+
+        if respuesta.status_code == 304 and copia:
+            print(f"[{self.nombre}] 304 Not Modified, usando copia local: {url}")
+            self._contar("revalidadas_304")
+            return copia["html"]
+
+        tipo_contenido = respuesta.headers.get("Content-Type", "")
+        if respuesta.status_code != 200 or "html" not in tipo_contenido:
+            print(f"[{self.nombre}] Respuesta no utilizable ({respuesta.status_code}, {tipo_contenido}): {url}")
+            self._contar("errores")
+            return None
+
+        if "charset" not in tipo_contenido.lower():
+            respuesta.encoding = respuesta.apparent_encoding
+        contenido_html = respuesta.text
+        self._contar("descargas")
+        self._guardar_copia(url, contenido_html, respuesta.headers)
+        return contenido_html
+
+    def _guardar_copia(self, url, contenido_html, cabeceras):
+        etag = cabeceras.get("ETag")
+        last_modified = cabeceras.get("Last-Modified")
+        if not etag and not last_modified:
+            return  # Sin validadores no hay revalidación posible
+        self.copias.guardar(url, {"html": contenido_html, "etag": etag, "last_modified": last_modified})
+
+    def _contar(self, metrica):
+        with self._candado:
+            self.metricas[metrica] += 1
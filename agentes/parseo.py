@@ -0,0 +1,130 @@
+import re
+from bs4 import BeautifulSoup, SoupStrainer
+from .configuraciones import (
+    FUENTE_PRYDWEN, FUENTE_GAME8, FUENTE_HONKAILAB,
+    FUENTE_GENSHINLAB, FUENTE_GENSHINBUILD, FUENTE_GAMEWITH
+)
+
+try:
+    from lxml import etree, html as lxml_html
+except ImportError:
+    lxml_html = None
+
+# Contenedor de la build por fuente, en orden de preferencia: (etiqueta, atributo, valor)
+# atributo "id" = igualdad, "class" = una de las clases, "class*" = subcadena de la clase.
+# Si ninguno aparece se usa <main> y después <body>.
+CONTENEDORES_FUENTE = {
+    FUENTE_PRYDWEN: [("div", "id", "page-content")],
+    FUENTE_GAME8: [("article", "class*", "a-article")],
+    FUENTE_HONKAILAB: [("div", "class", "entry-content")],
+    FUENTE_GENSHINLAB: [("div", "class", "entry-content")],
+    FUENTE_GENSHINBUILD: [("div", "class", "main-content"), ("article", None, None)],
+    FUENTE_GAMEWITH: [("div", "class", "gdb_col_content"), ("div", "id", "page_content")]
+}
+
+CONTENEDORES_RESPALDO = [("main", None, None), ("body", None, None)]
+
+# lxml rechaza cadenas str que declaran su codificación (<?xml ... encoding="utf-8"?>)
+PATRON_DECLARACION_XML = re.compile(r"^\s*<\?xml[^>]*\?>")
+
+
+def _atributos_bs4(atributo, valor):
+    if atributo == "id":
+        return {"id": valor}
+    if atributo == "class":
+        return {"class": valor}
+    if atributo == "class*":
+        return {"class": re.compile(re.escape(valor))}
+    return {}
+
+
+def _xpath(etiqueta, atributo, valor):
+    if atributo == "id":
+        return f".//{etiqueta}[@id='{valor}']"
+    if atributo == "class":
+        return f".//{etiqueta}[contains(concat(' ', normalize-space(@class), ' '), ' {valor} ')]"
+    if atributo == "class*":
+        return f".//{etiqueta}[contains(@class, '{valor}')]"
+    return f".//{etiqueta}"
+
+
+def buscar_seccion(sopa, fuente):
+    """Sección de la build dentro de una sopa ya construida (misma prioridad que el parseo dirigido)."""
+    for etiqueta, atributo, valor in CONTENEDORES_FUENTE.get(fuente, []) + CONTENEDORES_RESPALDO:
+        seccion = sopa.find(etiqueta, attrs=_atributos_bs4(atributo, valor))
+        if seccion:
+            return seccion
+    return None
+
+
+def extraer_texto_seccion(contenido_html, fuente):
+    """
+    Devuelve el texto (separado por espacios) de la sección de la build sin construir
+    el árbol BeautifulSoup de toda la página:
+    - con lxml: parseo en C y XPath al contenedor; el árbol se libera al salir.
+    - sin lxml: html.parser con SoupStrainer, que solo materializa el contenedor.
+    """
+    contenedores = CONTENEDORES_FUENTE.get(fuente, []) + CONTENEDORES_RESPALDO
+    if lxml_html is not None:
+        return _texto_lxml(contenido_html, contenedores)
+    return _texto_strainer(contenido_html, contenedores)
+
+
+def _documento_lxml(contenido_html):
+    """Árbol lxml del documento, o None si está vacío o no se puede parsear."""
+    contenido_html = PATRON_DECLARACION_XML.sub("", contenido_html or "", count=1)
+    if not contenido_html.strip():
+        return None
+    try:
+        return lxml_html.document_fromstring(contenido_html)
+    except (etree.ParserError, ValueError):
+        return None
+
+
+def _texto_lxml(contenido_html, contenedores):
+    documento = _documento_lxml(contenido_html)
+    if documento is None:
+        return ""
+    try:
+        for etiqueta, atributo, valor in contenedores:
+            secciones = documento.xpath(_xpath(etiqueta, atributo, valor))
+            if secciones:
+                seccion = secciones[0]
+                # get_text() de BeautifulSoup tampoco incluye scripts, estilos ni comentarios
+                etree.strip_elements(seccion, etree.Comment, "script", "style", "template", with_tail=False)
+                return " ".join(t.strip() for t in seccion.itertext() if t.strip())
+        return ""
+    finally:
+        del documento
+
+
+def _texto_strainer(contenido_html, contenedores):
+    for etiqueta, atributo, valor in contenedores:
+        atributos = _atributos_bs4(atributo, valor)
+        sopa = BeautifulSoup(contenido_html, 'html.parser', parse_only=SoupStrainer(etiqueta, attrs=atributos))
+        seccion = sopa.find(etiqueta, attrs=atributos)
+        texto = seccion.get_text(separator=' ', strip=True) if seccion else None
+        sopa.decompose()
+        if texto is not None:
+            return texto
+    return ""
+
+
+def extraer_enlaces(contenido_html):
+    """Lista [texto, href] de todos los <a href> del documento, sin construir el árbol completo."""
+    if lxml_html is not None:
+        documento = _documento_lxml(contenido_html)
+        if documento is None:
+            return []
+        try:
+            return [
+                ["".join(t.strip() for t in a.itertext()), a.get("href")]
+                for a in documento.iterfind(".//a[@href]")
+            ]
+        finally:
+            del documento
+
+    sopa = BeautifulSoup(contenido_html, 'html.parser', parse_only=SoupStrainer('a', href=True))
+    enlaces = [[a.get_text(strip=True), a['href']] for a in sopa.find_all('a', href=True)]
+    sopa.decompose()
+    return enlaces
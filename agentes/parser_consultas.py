@@ -0,0 +1,154 @@
+import re
+from .coincidencia import IndiceDifuso
+from .configuraciones import (
+    CONFIG_COINCIDENCIA, PALABRAS_JUEGO, PALABRAS_CLAVE_JUEGO, PALABRAS_COMPONENTES,
+    PALABRAS_BUILD_COMPLETA, PALABRAS_VACIAS_CONSULTA
+)
+
+CLAVES_BASE = ["character_name", "game", "build_name", "source", "Analisis_Gemini"]
+
+CLAVES_BUILD_COMPLETA = {
+    "GI": ["weapon_recommendations", "artifact_set_recommendations", "main_stats_recommendations", "final_stats_targets", "team_recommendations"],
+    "otros": ["weapon_recommendations", "artifact_set_recommendations", "planetary_set_recommendations", "main_stats_recommendations", "final_stats_targets", "team_recommendations"]
+}
+
+# Nombres de hasta 4 palabras ("dan heng imbibitor lunae")
+MAX_PALABRAS_NOMBRE = 4
+
+
+def _alternativas(palabras, limite_palabra=False):
+    partes = "|".join(p if "\\" in p else re.escape(p) for p in palabras)
+    return re.compile(rf"\b(?:{partes})\b" if limite_palabra else partes)
+
+
+class AnalizadorConsultas:
+    """
+    Interpreta la consulta del chat (juego, personaje y claves) con patrones
+    compilados una sola vez y el nomenclátor de personajes conocidos de cada juego
+    (IndicePersonajes.indice_nombres). El nombre se busca primero como n-grama
+    exacto; si no aparece se corrige por similitud y, cuando el nomenclátor del
+    juego es completo, un nombre desconocido se rechaza con sugerencias en lugar
+    de lanzar un rastreo que fallará.
+    """
+
+    def __init__(self, indice):
+        self.nombre = "Consultas"
+        self.indice = indice
+        self.palabras_juego = IndiceDifuso((palabra, palabra) for palabra in PALABRAS_JUEGO)
+        self._patrones_juego = [(juego, _alternativas(palabras, True)) for juego, palabras in PALABRAS_CLAVE_JUEGO.items()]
+        self._patrones_componente = [(juegos, _alternativas(palabras), claves) for juegos, palabras, claves in PALABRAS_COMPONENTES]
+        self._patron_build_completa = _alternativas(PALABRAS_BUILD_COMPLETA)
+        self._patron_vacias = _alternativas(PALABRAS_VACIAS_CONSULTA, True)
+        # Palabra entera que es una palabra clave de componente o su plural ("conos", "finales")
+        palabras_componente = {p for _, palabras, _ in PALABRAS_COMPONENTES for frase in palabras for p in frase.split()}
+        self._patron_palabra_componente = re.compile(rf"(?:{'|'.join(map(re.escape, palabras_componente))})(?:e?s)?")
+        self._patron_palabra = re.compile(r"[\w-]+")
+
+    def interpretar(self, consulta):
+        """
+        Devuelve {"juego", "nombre_personaje", "claves_solicitadas", "sugerencias"}.
+        nombre_personaje es None si no se identificó; sugerencias lista los nombres
+        conocidos más parecidos cuando el nombre se rechazó por desconocido.
+        """
+        consulta = self._corregir_palabras_juego(consulta.lower().strip())
+        palabras = self._patron_palabra.findall(consulta)
+
+        juego = self._detectar_juego(consulta)
+        nombre_personaje = None
+        sugerencias = []
+
+        # 1. Nombre conocido tal cual (también decide el juego si la consulta no lo dice)
+        for juego_candidato in ([juego] if juego else list(PALABRAS_CLAVE_JUEGO)):
+            nombre_personaje = self._buscar_exacto(juego_candidato, palabras)
+            if nombre_personaje:
+                juego = juego_candidato
+                break
+
+        if not juego:
+            print(f"[{self.nombre}] No se detectó juego. Usando HSR por defecto.")
+            juego = "HSR"
+
+        # 2. Lo que queda sin palabras clave, corregido por similitud
+        if not nombre_personaje:
+            restante = self._texto_restante(consulta)
+            if restante:
+                nombre_personaje, sugerencias = self._resolver_aproximado(juego, restante)
+
+        return {
+            "juego": juego,
+            "nombre_personaje": nombre_personaje,
+            "claves_solicitadas": self._claves_solicitadas(juego, consulta),
+            "sugerencias": sugerencias
+        }
+
+    def _detectar_juego(self, consulta):
+        for juego, patron in self._patrones_juego:
+            if patron.search(consulta):
+                return juego
+        return None
+
+    def _corregir_palabras_juego(self, consulta):
+        """Sustituye palabras clave de juego mal escritas ("zenles" -> "zenless") antes de detectar el juego."""
+        palabras = consulta.split()
+        for i, palabra in enumerate(palabras):
+            if len(palabra) < 5 or palabra in PALABRAS_JUEGO:
+                continue
+            mejor = self.palabras_juego.mejor(palabra, CONFIG_COINCIDENCIA["umbral_juego"])
+            if mejor:
+                print(f"[{self.nombre}] Palabra de juego corregida: '{palabra}' -> '{mejor[0]}' ({mejor[1]:.2f})")
+                palabras[i] = mejor[0]
+        return " ".join(palabras)
+
+    def _buscar_exacto(self, juego, palabras):
+        """El n-grama más largo de la consulta que es un nombre o alias conocido del juego."""
+        nomenclator = self.indice.indice_nombres(juego)
+        if not nomenclator:
+            return None
+        vacias = [bool(self._patron_vacias.fullmatch(p)) for p in palabras]
+        for tamano in range(min(MAX_PALABRAS_NOMBRE, len(palabras)), 0, -1):
+            for inicio in range(len(palabras) - tamano + 1):
+                # Un n-grama solo de palabras clave no es un nombre ("la build")
+                if all(vacias[inicio:inicio + tamano]):
+                    continue
+                nombre = nomenclator.obtener(" ".join(palabras[inicio:inicio + tamano]))
+                if nombre:
+                    return nombre
+        return None
+
+    def _texto_restante(self, consulta):
+        restante = " ".join(palabra for palabra in consulta.split() if not self._patron_palabra_componente.fullmatch(palabra))
+        restante = " ".join(self._patron_vacias.sub(' ', restante).split())
+        restante = re.sub(r'[^\w\s-]', '', restante).strip()
+        if restante:
+            return restante
+        ultima_palabra = consulta.split()[-1] if consulta.split() else ""
+        if ultima_palabra not in ["hsr", "zzz", "build", "completa", "de", "la", "el", "gi", "impact"]:
+            return re.sub(r'[^\w\s-]', '', ultima_palabra).strip()
+        return ""
+
+    def _resolver_aproximado(self, juego, restante):
+        """(nombre, sugerencias): nombre corregido, el texto tal cual o None si se rechaza."""
+        nomenclator = self.indice.indice_nombres(juego)
+        if not nomenclator:
+            return restante, []
+        mejor = nomenclator.mejor(restante, CONFIG_COINCIDENCIA["umbral_nombre"])
+        if mejor:
+            if mejor[0] != restante:
+                print(f"[{self.nombre}] Nombre corregido: '{restante}' -> '{mejor[0]}' ({mejor[1]:.2f})")
+            return mejor[0], []
+        # Sin listado vigente el nomenclátor puede no tener a los personajes nuevos: se deja pasar
+        if not self.indice.tiene_listado_vigente(juego):
+            return restante, []
+        sugerencias = [valor for valor, _, _ in nomenclator.buscar(restante, limite=CONFIG_COINCIDENCIA["max_candidatos"])]
+        print(f"[{self.nombre}] '{restante}' no es un personaje conocido de {juego}. Sugerencias: {sugerencias}")
+        return None, sugerencias
+
+    def _claves_solicitadas(self, juego, consulta):
+        claves_solicitadas = list(CLAVES_BASE)
+        for juegos, patron, claves in self._patrones_componente:
+            if juego in juegos and patron.search(consulta):
+                claves_solicitadas.extend(claves)
+
+        if len(claves_solicitadas) <= len(CLAVES_BASE) or self._patron_build_completa.search(consulta):
+            claves_solicitadas.extend(CLAVES_BUILD_COMPLETA["GI" if juego == "GI" else "otros"])
+        return list(dict.fromkeys(claves_solicitadas))
@@ -0,0 +1,210 @@
+import asyncio
+import queue
+import threading
+from concurrent.futures import Future, InvalidStateError
+from playwright.sync_api import sync_playwright
+from .configuraciones import CONFIG_POOL_NAVEGADORES, CONFIG_COLA_TRABAJOS, CONFIG_HSR, CONFIG_ZZZ, CONFIG_GI
+
+
+class _RanuraNavegador(threading.Thread):
+    """
+    Hilo dueño de un Chromium. La API síncrona de Playwright está ligada al hilo
+    que la inicia, por eso cada navegador vive en su propio hilo y las tareas se
+    le envían a través de la cola compartida del pool.
+    """
+
+    def __init__(self, pool, indice):
+        super().__init__(name=f"navegador-{indice}", daemon=True)
+        self.pool = pool
+        self.indice = indice
+        self.listo = threading.Event()
+        self.paginas_servidas = 0
+        self.memoria_max_mb = 0.0
+        self.reciclajes = 0
+
+    def run(self):
+        try:
+            self._bucle()
+        except Exception as e:
+            print(f"[Pool] Navegador {self.indice} detenido por error: {e}")
+        finally:
+            self.listo.set()
+
+    def _bucle(self):
+        with sync_playwright() as p:
+            navegador = self._lanzar(p)
+            self.listo.set()
+
+            while True:
+                tarea = self.pool._tareas.get()
+                if tarea is None:
+                    break
+                funcion, opciones_contexto, futuro, inicio = tarea
+                if not futuro.set_running_or_notify_cancel():
+                    continue
+                try:
+                    inicio.set_result(None)
+                except InvalidStateError:
+                    pass  # Quien esperaba el inicio ya se canceló; el resultado se ignora
+
+                try:
+                    if not navegador.is_connected():
+                        navegador = self._reciclar(p, navegador, "desconectado")
+                    futuro.set_result(self._ejecutar(navegador, funcion, opciones_contexto))
+                except Exception as e:
+                    futuro.set_exception(e)
+
+                if self._necesita_reciclaje():
+                    navegador = self._reciclar(p, navegador, "límite alcanzado")
+
+            try:
+                navegador.close()
+            except Exception:
+                pass
+
+    def _lanzar(self, p):
+        self.paginas_servidas = 0
+        self.memoria_max_mb = 0.0
+        return p.chromium.launch(headless=True, args=self.pool.config["args_lanzamiento"])
+
+    def _reciclar(self, p, navegador, motivo):
+        print(f"[Pool] Reciclando navegador {self.indice} ({motivo}): "
+              f"{self.paginas_servidas} páginas, {self.memoria_max_mb:.0f} MB")
+        try:
+            navegador.close()
+        except Exception:
+            pass
+        self.reciclajes += 1
+        return self._lanzar(p)
+
+    def _ejecutar(self, navegador, funcion, opciones_contexto):
+        contexto = navegador.new_context(**opciones_contexto)
+        try:
+            pagina = contexto.new_page()
+            resultado = funcion(pagina)
+            self._medir_memoria(pagina)
+            return resultado
+        finally:
+            self.paginas_servidas += 1
+            try:
+                contexto.close()
+            except Exception:
+                pass
+
+    def _medir_memoria(self, pagina):
+        try:
+            bytes_heap = pagina.evaluate("() => performance.memory ? performance.memory.usedJSHeapSize : 0")
+            self.memoria_max_mb = max(self.memoria_max_mb, bytes_heap / (1024 * 1024))
+        except Exception:
+            pass
+
+    def _necesita_reciclaje(self):
+        return (self.paginas_servidas >= self.pool.config["max_paginas_por_navegador"]
+                or self.memoria_max_mb >= self.pool.config["max_memoria_mb"])
+
+
+class PoolNavegadores:
+    """
+    Pool de navegadores Chromium de larga vida compartido por el Investigador y el
+    Buscador de Imágenes. Cada tarea recibe una página en un contexto nuevo (aislado)
+    y el contexto se cierra al terminar; el navegador se reutiliza.
+    """
+
+    def __init__(self, config=None):
+        self.config = dict(CONFIG_POOL_NAVEGADORES, **(config or {}))
+        if not self.config["tamano"]:
+            tareas_por_trabajo = max(len(c["listados"]) for c in (CONFIG_HSR, CONFIG_ZZZ, CONFIG_GI)) + 1
+            self.config["tamano"] = CONFIG_COLA_TRABAJOS["trabajadores"] * tareas_por_trabajo
+        self._tareas = queue.Queue()
+        self._ranuras = []
+        self._candado = threading.Lock()
+
+    def iniciar(self, esperar=True):
+        """Lanza los navegadores (calentamiento). Idempotente."""
+        with self._candado:
+            if not self._ranuras:
+                for i in range(self.config["tamano"]):
+                    ranura = _RanuraNavegador(self, i)
+                    ranura.start()
+                    self._ranuras.append(ranura)
+                print(f"[Pool] {len(self._ranuras)} navegadores iniciándose...")
+        if esperar:
+            for ranura in self._ranuras:
+                ranura.listo.wait(timeout=60)
+        return self
+
+    def enviar(self, funcion, **opciones_contexto):
+        """
+        Encola funcion(pagina) y devuelve un Future. La concurrencia queda limitada
+        por el número de navegadores del pool.
+        """
+        return self._encolar(funcion, opciones_contexto)[1]
+
+    def ejecutar(self, funcion, timeout=None, **opciones_contexto):
+        """Versión bloqueante de enviar(); el timeout cuenta desde que la tarea empieza."""
+        timeout = timeout or self.config["timeout_tarea_s"]
+        inicio, futuro = self._encolar(funcion, opciones_contexto)
+        try:
+            inicio.result()
+        except BaseException:
+            futuro.cancel()
+            raise
+        return futuro.result(timeout=timeout)
+
+    async def ejecutar_async(self, funcion, timeout=None, **opciones_contexto):
+        """
+        Versión asíncrona de enviar(): espera turno sin límite y aplica el timeout desde
+        que un navegador empieza la tarea. Si se cancela antes de empezar, la tarea se descarta.
+        """
+        timeout = timeout or self.config["timeout_tarea_s"]
+        inicio, futuro = self._encolar(funcion, opciones_contexto)
+        try:
+            await asyncio.wrap_future(inicio)
+        except BaseException:
+            futuro.cancel()
+            raise
+        return await asyncio.wait_for(asyncio.wrap_future(futuro), timeout)
+
+    def _encolar(self, funcion, opciones_contexto):
+        """(inicio, futuro): inicio se completa cuando un navegador toma la tarea."""
+        self.iniciar(esperar=False)
+        if not any(r.is_alive() for r in self._ranuras):
+            raise RuntimeError("El pool de navegadores no tiene navegadores activos.")
+        futuro, inicio = Future(), Future()
+        # Cancelada antes de empezar (p. ej. una fuente perdedora): nadie espera su inicio
+        futuro.add_done_callback(lambda f: inicio.cancel())
+        self._tareas.put((funcion, opciones_contexto, futuro, inicio))
+        return inicio, futuro
+
+    def estado(self):
+        return [
+            {
+                "navegador": r.indice,
+                "vivo": r.is_alive(),
+                "paginas_servidas": r.paginas_servidas,
+                "memoria_max_mb": round(r.memoria_max_mb, 1),
+                "reciclajes": r.reciclajes
+            }
+            for r in self._ranuras
+        ]
+
+    def cerrar(self):
+        with self._candado:
+            for _ in self._ranuras:
+                self._tareas.put(None)
+            for ranura in self._ranuras:
+                ranura.join(timeout=10)
+            self._ranuras = []
+
+
+_pool_global = None
+_candado_global = threading.Lock()
+
+
+def obtener_pool():
+    """Devuelve el pool compartido del proceso (se crea bajo demanda)."""
+    global _pool_global
+    with _candado_global:
+        if _pool_global is None:
+            _pool_global = PoolNavegadores()
+        return _pool_global
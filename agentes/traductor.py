@@ -0,0 +1,173 @@
+import json
+import os
+import threading
+from google.genai.errors import APIError
+from .backends_llm import con_reintentos, crear_backend
+from .base import AgenteBase
+from .configuraciones import CONFIG_LOCALIZACION, NOMBRES_IDIOMA
+from .utilidades import ejecutar_sincrono, en_hilo
+
+def normalizar_idioma(codigo):
+    """Código de NOMBRES_IDIOMA para el idioma pedido ("EN" -> "en", "ja" -> "jp") o None si no se admite."""
+    codigo = (codigo or "").strip().lower()
+    codigo = CONFIG_LOCALIZACION["alias_idioma"].get(codigo, codigo)
+    return codigo if codigo in NOMBRES_IDIOMA else None
+
+
+class Glosario:
+    """
+    Traducciones ya resueltas por juego e idioma: {juego: {idioma: {original: traducción}}}.
+    Persistido en JSON; los nombres de sets, armas y personajes se repiten entre
+    builds, así que la mayoría de valores se traducen sin llamar a la API.
+    """
+
+    def __init__(self, ruta_archivo):
+        self.ruta_archivo = ruta_archivo
+        self._candado = threading.Lock()
+        self.datos = self._cargar()
+
+    def buscar(self, juego, idioma, textos):
+        """Devuelve ({original: traducción} de los conocidos, [faltantes])."""
+        with self._candado:
+            entradas = self.datos.get(juego, {}).get(idioma, {})
+            conocidos = {t: entradas[t] for t in textos if t in entradas}
+        return conocidos, [t for t in textos if t not in conocidos]
+
+    def agregar(self, juego, idioma, traducciones):
+        if not traducciones:
+            return
+        with self._candado:
+            self.datos.setdefault(juego, {}).setdefault(idioma, {}).update(traducciones)
+            ruta_temporal = self.ruta_archivo + ".tmp"
+            with open(ruta_temporal, 'w', encoding='utf-8') as f:
+                json.dump(self.datos, f, indent=4, ensure_ascii=False)
+            os.replace(ruta_temporal, self.ruta_archivo)
+
+    def _cargar(self):
+        if os.path.exists(self.ruta_archivo):
+            with open(self.ruta_archivo, 'r', encoding='utf-8') as f:
+                try:
+                    return json.load(f)
+                except json.JSONDecodeError:
+                    pass
+        return {}
+
+
+class AgenteTraductor(AgenteBase):
+    """
+    Localiza una build ya extraída (en el idioma canónico u otro): recorre solo los valores
+    del JSON, resuelve los conocidos con el glosario y traduce el resto en una
+    única llamada corta a Gemini.
+    """
+
+    def __init__(self, nombre="Traductor", backend=None):
+        super().__init__(nombre)
+        self.backend = backend or crear_backend()
+
+        self.modelo_traduccion = CONFIG_LOCALIZACION["modelo_traduccion"]
+        self.glosario = Glosario(CONFIG_LOCALIZACION["ruta_glosario"])
+
+    def procesar_solicitud(self, datos):
+        """Envoltorio síncrono de procesar_solicitud_async."""
+        return ejecutar_sincrono(self.procesar_solicitud_async(datos))
+
+    async def procesar_solicitud_async(self, datos):
+        """
+        Espera que datos contenga:
+        - juego
+        - build
+        - idioma_objetivo
+        - idioma_origen (opcional, por defecto el canónico)
+        Devuelve {"build": build localizada, "sin_traducir": [valores que quedaron en el idioma de origen]}.
+        """
+        juego = datos['juego']
+        build = datos['build']
+        idioma_objetivo = normalizar_idioma(datos['idioma_objetivo'])
+        idioma_origen = normalizar_idioma(datos.get('idioma_origen') or CONFIG_LOCALIZACION["idioma_canonico"])
+        # Un código desconocido no se traduce "a español" ni se guarda en el glosario con otro nombre
+        if idioma_objetivo is None:
+            raise ValueError(f"Idioma no admitido: '{datos['idioma_objetivo']}' (admitidos: {', '.join(NOMBRES_IDIOMA)})")
+
+        if idioma_objetivo == idioma_origen:
+            return {"build": build, "sin_traducir": []}
+
+        textos = list(dict.fromkeys(self._recolectar(build)))
+        traducciones, faltantes = self.glosario.buscar(juego, idioma_objetivo, textos)
+        print(f"[{self.nombre}] {len(textos)} valores a '{idioma_objetivo}': {len(traducciones)} del glosario, {len(faltantes)} a traducir.")
+
+        if faltantes:
+            nuevas = await self._traducir_con_gemini(juego, faltantes, idioma_objetivo)
+            # Respuestas sintéticas (stub): no deben quedar en el glosario
+            if self.backend.respuestas_reales:
+                self.glosario.agregar(juego, idioma_objetivo, nuevas)
+            traducciones.update(nuevas)
+
+        sin_traducir = [t for t in textos if t not in traducciones]
+        if sin_traducir:
+            print(f"[{self.nombre}] {len(sin_traducir)} valores sin traducir a '{idioma_objetivo}'.")
+        return {"build": self._aplicar(build, traducciones), "sin_traducir": sin_traducir}
+
+    # Recorrido de la build
+
+    def _recolectar(self, valor, clave=None):
+        if clave in CONFIG_LOCALIZACION["claves_sin_traducir"]:
+            return
+        if isinstance(valor, dict):
+            for k, v in valor.items():
+                yield from self._recolectar(v, k)
+        elif isinstance(valor, list):
+            for elemento in valor:
+                yield from self._recolectar(elemento, clave)
+        elif isinstance(valor, str):
+            for parte in self._partes(valor, clave):
+                if any(c.isalpha() for c in parte):
+                    yield parte
+
+    def _aplicar(self, valor, traducciones, clave=None):
+        if clave in CONFIG_LOCALIZACION["claves_sin_traducir"]:
+            return valor
+        if isinstance(valor, dict):
+            return {k: self._aplicar(v, traducciones, k) for k, v in valor.items()}
+        if isinstance(valor, list):
+            return [self._aplicar(elemento, traducciones, clave) for elemento in valor]
+        if isinstance(valor, str):
+            partes = [traducciones.get(parte, parte) for parte in self._partes(valor, clave)]
+            return ", ".join(partes) if clave in CONFIG_LOCALIZACION["claves_lista_separada"] else (partes[0] if partes else valor)
+        return valor
+
+    def _partes(self, texto, clave):
+        if clave in CONFIG_LOCALIZACION["claves_lista_separada"]:
+            return [p.strip() for p in texto.split(",") if p.strip()]
+        texto = texto.strip()
+        return [texto] if texto else []
+
+    # Traducción de los valores nuevos
+
+    async def _traducir_con_gemini(self, juego, textos, idioma_objetivo):
+        if not self.backend.disponible:
+            return {}
+
+        nombre_idioma = NOMBRES_IDIOMA[idioma_objetivo]
+        prompt = f"""Traduce al {nombre_idioma} ({idioma_objetivo}) cada cadena de la lista, que son valores de una build del juego {juego}.
+        Usa los nombres OFICIALES localizados de personajes, armas, sets y estadísticas del juego en ese idioma.
+        Responde ÚNICAMENTE con un objeto JSON que asocie cada cadena original (exacta) con su traducción.
+
+        {json.dumps(textos, ensure_ascii=False)}
+        """
+        try:
+            texto_respuesta = await en_hilo(
+                con_reintentos, self.backend,
+                lambda: self.backend.generar(prompt, {"response_mime_type": "application/json"}, self.modelo_traduccion)
+            )
+            traducciones = json.loads(texto_respuesta.strip())
+        except APIError as e:
+            print(f"[{self.nombre}] Error API: {e}")
+            return {}
+        except (json.JSONDecodeError, AttributeError):
+            print(f"[{self.nombre}] Error Parseo JSON.")
+            return {}
+
+        if not isinstance(traducciones, dict):
+            return {}
+        # Solo las claves pedidas: el glosario no debe aprender entradas inventadas
+        return {t: traducciones[t] for t in textos if isinstance(traducciones.get(t), str) and traducciones[t].strip()}
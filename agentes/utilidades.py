@@ -1,4 +1,16 @@
+import asyncio
+import contextvars
+import functools
 import re
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+
+# Hilos compartidos para el trabajo bloqueante de los agentes (HTTP, índice, caché, modelo).
+# No es el ejecutor por defecto del bucle: asyncio.run() espera al cerrar a que terminen los
+# hilos de ese ejecutor, y una tarea cancelada (p. ej. la fuente que perdió la carrera)
+# retendría así al que la llamó hasta que su hilo acabase.
+MAX_HILOS_BLOQUEANTES = 32
+_ejecutor_bloqueante = ThreadPoolExecutor(max_workers=MAX_HILOS_BLOQUEANTES, thread_name_prefix="agentes")
 
 def limpiar_url_markdown(url):
     """
@@ -14,3 +26,72 @@ def limpiar_url_markdown(url):
     url = url.replace('[', '').replace(']', '').replace('(', '').replace(')', '').replace('\"', '').strip()
     url = url.split(' ')[0]
     return url.strip()
+
+
+def normalizar_nombre(nombre):
+    """
+    Normaliza un nombre de personaje para usarlo como clave de búsqueda:
+    minúsculas, sin acentos y sin espacios, guiones ni signos ("Hu Tao" -> "hutao").
+    """
+    if not nombre:
+        return ""
+    nombre = unicodedata.normalize("NFKD", nombre)
+    nombre = "".join(c for c in nombre if not unicodedata.combining(c))
+    return re.sub(r'[\W_]+', '', nombre.lower())
+
+
+def estimar_tokens(texto):
+    """
+    Estimación rápida de tokens sin llamar al modelo: ~4 caracteres por token en
+    alfabeto latino y ~1.5 en japonés/chino (las páginas de GameWith son en japonés).
+    """
+    if not texto:
+        return 0
+    ascii_ = sum(1 for c in texto if c.isascii())
+    return int(ascii_ / 4 + (len(texto) - ascii_) / 1.5) + 1
+
+
+def ejecutar_sincrono(corutina):
+    """
+    Ejecuta una corrutina desde código síncrono. Si el hilo actual ya tiene un
+    bucle de eventos en marcha, la corrutina corre en un hilo auxiliar con su
+    propio bucle para no bloquearlo ni anidar asyncio.run().
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(corutina)
+
+    with ThreadPoolExecutor(max_workers=1) as ejecutor:
+        return ejecutor.submit(asyncio.run, corutina).result()
+
+
+async def en_hilo(funcion, *args, **kwargs):
+    """
+    Como asyncio.to_thread, pero en el ejecutor compartido del proceso. Si la tarea que
+    espera se cancela, el hilo termina por su cuenta sin bloquear el cierre del bucle.
+    """
+    bucle = asyncio.get_running_loop()
+    llamada = functools.partial(contextvars.copy_context().run, funcion, *args, **kwargs)
+    return await bucle.run_in_executor(_ejecutor_bloqueante, llamada)
+
+
+def en_segundo_plano(funcion, *args, **kwargs):
+    """
+    Lanza funcion en el ejecutor compartido sin esperarla: para trabajo que debe seguir
+    después de que termine el bucle de eventos que lo pidió. Devuelve su Future.
+    """
+    return _ejecutor_bloqueante.submit(funcion, *args, **kwargs)
+
+
+def emitir(notificar, etapa, **datos):
+    """
+    Envía un evento de progreso {"etapa": ..., **datos} si hay suscriptor.
+    Un fallo del suscriptor (cliente desconectado) nunca interrumpe el pipeline.
+    """
+    if notificar is None:
+        return
+    try:
+        notificar(dict(datos, etapa=etapa))
+    except Exception as e:
+        print(f"Advertencia: evento '{etapa}' no entregado: {e}")
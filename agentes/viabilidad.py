@@ -0,0 +1,90 @@
+import re
+import threading
+from .condensador import patron_vocabulario
+from .configuraciones import CONFIG_VIABILIDAD
+from .utilidades import estimar_tokens, normalizar_nombre
+
+# Páginas de error, verificación anti-bots y muros de consentimiento
+PATRON_AVISO = re.compile(
+    r"\b404\b|page not found|página no encontrada|not found|access denied|acceso denegado|forbidden"
+    r"|just a moment|checking (if the site connection is secure|your browser)|verify you are human"
+    r"|enable javascript|activa javascript|attention required|too many requests|rate limit"
+    r"|we value your privacy|accept (all )?cookies|aceptar (todas las )?cookies|consent|consentimiento"
+    r"|ページが見つかりません|アクセスが集中",
+    re.IGNORECASE
+)
+
+
+class FiltroViabilidad:
+    """
+    Clasificador local y barato que decide si el texto de una página puede contener
+    una build antes de pagar una llamada al modelo. Descarta si:
+    - el texto es demasiado corto
+    - es corto, con poco vocabulario y contiene avisos de error, verificación o consentimiento
+    - el nombre del personaje no aparece (página de otro personaje o genérica)
+    - el vocabulario de build del juego (VOCABULARIO_BUILD) es escaso o poco denso
+    """
+
+    def __init__(self, config=None):
+        self.nombre = "Viabilidad"
+        self.config = dict(CONFIG_VIABILIDAD, **(config or {}))
+        self._candado = threading.Lock()
+        self.metricas = {"evaluadas": 0, "descartadas": 0, "motivos": {}}
+
+    def evaluar(self, juego, nombre_personaje, contenido_texto, codigo_fuente=None):
+        """
+        Devuelve {"viable", "motivo", "aciertos", "terminos", "densidad"}; motivo es None
+        si la página pasa al Analista.
+        """
+        motivo, senales = self._clasificar(juego, nombre_personaje, contenido_texto or "", codigo_fuente)
+        with self._candado:
+            self.metricas["evaluadas"] += 1
+            if motivo:
+                self.metricas["descartadas"] += 1
+                self.metricas["motivos"][motivo] = self.metricas["motivos"].get(motivo, 0) + 1
+        if motivo:
+            print(f"[{self.nombre}] Página de {codigo_fuente or juego} descartada antes del modelo: {motivo} "
+                  f"({senales['aciertos']} términos, {senales['densidad']:.1f}/1000 tokens) {self._resumen()}")
+        else:
+            print(f"[{self.nombre}] Página de {codigo_fuente or juego} apta para el modelo "
+                  f"({senales['aciertos']} términos, {senales['densidad']:.1f}/1000 tokens) {self._resumen()}")
+        return dict(senales, viable=motivo is None, motivo=motivo)
+
+    def _clasificar(self, juego, nombre_personaje, texto, codigo_fuente):
+        tokens = estimar_tokens(texto)
+        coincidencias = patron_vocabulario(juego).findall(texto.lower())
+        senales = {
+            "aciertos": len(coincidencias),
+            "terminos": len(set(coincidencias)),
+            "densidad": 1000 * len(coincidencias) / max(tokens, 1)
+        }
+
+        if len(texto) < self.config["min_caracteres"]:
+            return "texto_corto", senales
+        # Un aviso en una página corta con poco vocabulario: error o muro, no una build con banner de cookies
+        if (len(texto) <= self.config["max_caracteres_aviso"] and senales["aciertos"] < 2 * self.config["min_aciertos"]
+                and PATRON_AVISO.search(texto)):
+            return "pagina_de_aviso", senales
+        if codigo_fuente not in self.config["fuentes_sin_nombre"] and not self._menciona(nombre_personaje, texto):
+            return "sin_nombre_personaje", senales
+        if senales["aciertos"] < self.config["min_aciertos"] or senales["terminos"] < self.config["min_terminos_distintos"]:
+            return "sin_vocabulario_build", senales
+        if senales["densidad"] < self.config["min_densidad"]:
+            return "vocabulario_disperso", senales
+        return None, senales
+
+    def _menciona(self, nombre_personaje, texto):
+        """El nombre completo (normalizado) o alguna de sus palabras largas ("March 7th" -> "march")."""
+        clave = normalizar_nombre(nombre_personaje)
+        if not clave:
+            return True
+        texto_normalizado = normalizar_nombre(texto)
+        if clave in texto_normalizado:
+            return True
+        palabras = [normalizar_nombre(p) for p in re.split(r"[\s•·\-_()]+", nombre_personaje)]
+        return any(len(p) >= 4 and p in texto_normalizado for p in palabras)
+
+    def _resumen(self):
+        with self._candado:
+            evaluadas, descartadas = self.metricas["evaluadas"], self.metricas["descartadas"]
+        return f"({descartadas} de {evaluadas} páginas descartadas, {100 * descartadas / max(evaluadas, 1):.0f}%)"
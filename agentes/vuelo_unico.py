@@ -0,0 +1,87 @@
+import asyncio
+import copy
+import threading
+from concurrent.futures import Future
+from .utilidades import emitir
+
+
+class VueloUnico:
+    """
+    Agrupa ejecuciones idénticas simultáneas (single-flight): la primera petición
+    con una clave calcula el resultado y las que llegan mientras tanto lo esperan
+    en lugar de repetir el rastreo y el análisis.
+
+    Funciona entre hilos: Flask atiende cada petición asíncrona en su propio bucle
+    de eventos, así que el resultado se comparte con un concurrent.futures.Future.
+    Los eventos de progreso (notificar) del cálculo llegan a todos los que esperan.
+    """
+
+    def __init__(self, nombre):
+        self.nombre = nombre
+        self._candado = threading.Lock()
+        self._en_vuelo = {}     # clave -> (Future, [suscriptores de notificar])
+        self.metricas = {"ejecuciones": 0, "compartidas": 0, "en_vuelo": 0}
+
+    async def ejecutar(self, clave, funcion, notificar=None):
+        """
+        funcion(notificar) -> corrutina. Devuelve su resultado; las peticiones que se
+        unen a un cálculo en curso reciben una copia (pueden modificarla sin afectar
+        a las demás).
+        """
+        with self._candado:
+            en_vuelo = self._en_vuelo.get(clave)
+            if en_vuelo:
+                futuro, suscriptores = en_vuelo
+                if notificar is not None:
+                    suscriptores.append(notificar)
+                self.metricas["compartidas"] += 1
+                lider = False
+            else:
+                futuro, suscriptores = Future(), [notificar] if notificar is not None else []
+                self._en_vuelo[clave] = (futuro, suscriptores)
+                self.metricas["ejecuciones"] += 1
+                lider = True
+            self.metricas["en_vuelo"] = len(self._en_vuelo)
+
+        if not lider:
+            print(f"[{self.nombre}] Petición idéntica en curso; se comparte su resultado {self._resumen()}")
+            emitir(notificar, "solicitud_compartida")
+            # shield: si esta petición se cancela, el cálculo compartido sigue para las demás
+            resultado = await asyncio.shield(asyncio.wrap_future(futuro))
+            return copy.deepcopy(resultado)
+
+        def notificar_a_todos(evento):
+            with self._candado:
+                destinos = list(suscriptores)
+            for destino in destinos:
+                try:
+                    destino(evento)
+                except Exception as e:
+                    print(f"[{self.nombre}] Advertencia: evento '{evento.get('etapa')}' no entregado: {e}")
+
+        try:
+            resultado = await funcion(notificar_a_todos)
+        except asyncio.CancelledError:
+            # Cancelar a quien calcula (p. ej. un trabajo cancelado) no cancela a los que esperan
+            futuro.set_exception(RuntimeError("El cálculo compartido se canceló; vuelve a intentarlo."))
+            raise
+        except BaseException as e:
+            futuro.set_exception(e)
+            raise
+        else:
+            futuro.set_result(resultado)
+            return resultado
+        finally:
+            with self._candado:
+                self._en_vuelo.pop(clave, None)
+                self.metricas["en_vuelo"] = len(self._en_vuelo)
+
+    def en_curso(self, clave):
+        """True si ya hay un cálculo con esa clave (quien llegue ahora se unirá a él)."""
+        with self._candado:
+            return clave in self._en_vuelo
+
+    def _resumen(self):
+        with self._candado:
+            ejecuciones, compartidas = self.metricas["ejecuciones"], self.metricas["compartidas"]
+        return f"({compartidas} ejecuciones ahorradas de {ejecuciones + compartidas} peticiones)"
@@ -1,16 +1,119 @@
+import asyncio
 import json
 import os
 import re
-from flask import Flask, render_template, request, jsonify
+import threading
+from flask import Flask, Response, abort, render_template, request, jsonify, stream_with_context
 from agentes.coordinador import AgenteCoordinador
+from agentes.cola_trabajos import ColaTrabajos, ESTADOS_FINALES
+from agentes.configuraciones import CONFIG_COLA_TRABAJOS
 from agentes.imagenes import AgenteImagenes
 from agentes.generador_html import AgenteGeneradorHTML
+from agentes.pool_navegadores import obtener_pool
+from agentes.indice_personajes import obtener_indice
+from agentes.utilidades import emitir
 
 app = Flask(__name__)
 coordinador = AgenteCoordinador()
 agente_imagenes = AgenteImagenes()
 agente_html = AgenteGeneradorHTML()
 
+# Calentamiento del pool de Chromium compartido (no bloquea el arranque)
+obtener_pool().iniciar(esperar=False)
+# Refresco de los listados de personajes vencidos en segundo plano
+threading.Thread(target=obtener_indice().construir, daemon=True).start()
+
+# Pipeline Auxiliar
+
+async def buscar_imagenes(state, notificar=None):
+    """Busca las imágenes del personaje (Protocolo A2A con AgenteImagenes)."""
+    images_list = []
+    try:
+        game_names = {
+            "HSR": "Honkai Star Rail",
+            "ZZZ": "Zenless Zone Zero", 
+            "GI": "Genshin Impact"
+        }
+        game_full = game_names.get(state['game'], state['game'])
+        etiqueta_busqueda = f"{state['target_character']} {game_full} hoyoverse"
+        
+        # Protocolo A2A para AgenteImagenes
+        msg_img = {
+            "cabecera": {"de": "OrquestadorFlask", "para": "AgenteImagenes", "accion": "BUSCAR_IMAGENES"},
+            "cuerpo": {
+                "etiqueta": etiqueta_busqueda,
+                "max_imagenes": 6
+            }
+        }
+        resp_img = await agente_imagenes.recibir_mensaje_async(msg_img)
+        
+        if resp_img.get("estado") == "OK":
+            resultado_imagenes = resp_img["cuerpo"]
+            if resultado_imagenes["exito"]:
+                images_list = resultado_imagenes["imagenes"]
+        else:
+            print(f"Error A2A Imagenes: {resp_img.get('error')}")
+
+    except Exception as e:
+        print(f"Error buscando imágenes: {e}")
+
+    emitir(notificar, "imagenes_encontradas", imagenes=images_list)
+    return images_list
+
+async def generar_build(state, notificar=None):
+    """Trabajo de la cola: build + imágenes en paralelo y página HTML. Devuelve la respuesta del chat."""
+#genera la build (la búsqueda de imágenes corre en paralelo)
+    (result, error), images_list = await asyncio.gather(
+        coordinador.procesar_solicitud_async(
+            state['game'], state['target_character'], state['requested_keys'],
+            state.get('source_choice', ''), state.get('target_language', 'es'), notificar
+        ),
+        buscar_imagenes(state, notificar)
+    )
+
+#esta parte ahce el response final
+    if result:
+        # Generar página HTML con la build
+        try:
+            # Protocolo A2A para AgenteGeneradorHTML
+            msg_html = {
+                "cabecera": {"de": "OrquestadorFlask", "para": "AgenteGeneradorHTML", "accion": "GENERAR_HTML"},
+                "cuerpo": {
+                    "build_data": result,
+                    "imagenes": images_list,
+                    "nombre_personaje": state['target_character'],
+                    "juego": state['game']
+                }
+            }
+            resp_html = await agente_html.recibir_mensaje_async(msg_html)
+            
+            if resp_html.get("estado") == "OK":
+                resultado_html = resp_html["cuerpo"]
+                if resultado_html["exito"]:
+                    print(f"✓ Página HTML generada: {resultado_html['ruta_archivo']}")
+            else:
+                print(f"Error A2A HTML: {resp_html.get('error')}")
+
+        except Exception as e:
+            print(f"Error generando HTML: {e}")
+        
+        # Con build, error es un aviso (p. ej. traducción incompleta)
+        aviso = f"<br><em>Aviso: {error}.</em>" if error else ""
+        response_text = f"¡Aquí tienes la build para <strong>{state['target_character'].title()}</strong>!{aviso}<br>¿Necesitas otra build?"
+        return {
+            'response': response_text,
+            'aviso': error,
+            'data': result,
+            'images': images_list,  
+            'game': state.get('game'),
+            'state': {'step': 'initial'}
+        }
+    response_text = f"Lo siento, hubo un error: {error}.<br>¿Quieres intentar con otro personaje?"
+    return {'response': response_text, 'data': None, 'game': state.get('game'), 'state': {'step': 'initial'}}
+
+cola_trabajos = ColaTrabajos(generar_build)
+cola_trabajos.iniciar()
+
 # Main Flask Routes
 
 
@@ -19,16 +122,107 @@ def index():
     return render_template('index.html')
 
 @app.route('/chat', methods=['POST'])
-def chat():
+async def chat():
     """Maneja los mensajes del chat y el estado de la conversación."""
-    data = request.json
+    return jsonify(await responder(request.json))
+
+@app.route('/chat/stream', methods=['POST'])
+def chat_stream():
+    """
+    Igual que /chat, pero como server-sent events. Si la respuesta encola un trabajo,
+    emite 'trabajo_encolado' con su id, sigue las etapas del pipeline en la cola
+    (url_resuelta, pagina_obtenida, analisis_iniciado, campo_parcial, imagenes_encontradas...)
+    y termina con un evento 'resultado' con la respuesta final del chat.
+    """
+    try:
+        json_response = asyncio.run(responder(request.json))
+    except Exception as e:
+        print(f"Error en el stream: {e}")
+        json_response = {'response': f"Lo siento, hubo un error: {e}.", 'data': None, 'state': {'step': 'initial'}}
+
+    def generar():
+        id_trabajo = json_response.get('trabajo')
+        if not id_trabajo:
+            yield evento_sse(dict(json_response, etapa='resultado'))
+            return
+        yield evento_sse(dict(json_response, etapa='trabajo_encolado'))
+        yield from eventos_hasta_terminar(id_trabajo)
+
+    return Response(stream_with_context(generar()), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def evento_sse(evento):
+    return f"event: {evento['etapa']}\ndata: {json.dumps(evento, ensure_ascii=False)}\n\n"
+
+def eventos_hasta_terminar(id_trabajo):
+    """Eventos SSE del trabajo (historial y luego en vivo) y un 'resultado' final con la respuesta del chat."""
+    eventos = cola_trabajos.suscribir(id_trabajo)
+    try:
+        while True:
+            evento = eventos.get()
+            if evento is None:
+                break
+            yield evento_sse(evento)
+    finally:
+        cola_trabajos.desuscribir(id_trabajo, eventos)
+    yield evento_sse(dict(respuesta_de_trabajo(cola_trabajos.obtener(id_trabajo), id_trabajo), etapa='resultado'))
+
+def respuesta_de_trabajo(trabajo, id_trabajo=None):
+    """
+    Respuesta del chat de un trabajo terminado (resultado, o mensaje de error si no se completó).
+    Un trabajo que ya no existe (id desconocido o borrado por la retención) también termina con error.
+    """
+    if trabajo is None:
+        response_text = "Lo siento, esa búsqueda ya no está disponible.<br>¿Quieres intentar con otro personaje?"
+        return {'response': response_text, 'data': None, 'trabajo': id_trabajo, 'estado': 'desconocido', 'state': {'step': 'initial'}}
+    if trabajo['estado'] == 'completado' and trabajo['resultado']:
+        return dict(trabajo['resultado'], trabajo=trabajo['id'], estado=trabajo['estado'])
+    motivos = {'cancelado': "se canceló", 'expirado': "tardó demasiado", 'fallido': "falló"}
+    response_text = f"Lo siento, la búsqueda {motivos.get(trabajo['estado'], 'no terminó')}: {trabajo.get('error') or ''}<br>¿Quieres intentar con otro personaje?"
+    return {'response': response_text, 'data': None, 'trabajo': trabajo['id'], 'estado': trabajo['estado'], 'state': {'step': 'initial'}}
+
+@app.route('/trabajos/<id_trabajo>')
+def estado_trabajo(id_trabajo):
+    """
+    Estado del trabajo para consulta periódica: pendiente (con posición en la cola), en_curso
+    o final; los finales incluyen 'respuesta' con la respuesta del chat.
+    """
+    trabajo = cola_trabajos.obtener(id_trabajo)
+    if not trabajo:
+        abort(404)
+    if trabajo['estado'] in ESTADOS_FINALES:
+        trabajo['respuesta'] = respuesta_de_trabajo(trabajo)
+    return jsonify(trabajo)
+
+@app.route('/trabajos/<id_trabajo>/eventos')
+def eventos_trabajo(id_trabajo):
+    """Eventos del trabajo como server-sent events hasta que termina."""
+    if not cola_trabajos.obtener(id_trabajo):
+        abort(404)
+    return Response(stream_with_context(eventos_hasta_terminar(id_trabajo)), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/trabajos/<id_trabajo>/cancelar', methods=['POST'])
+def cancelar_trabajo(id_trabajo):
+    return jsonify({'cancelado': cola_trabajos.cancelar(id_trabajo)})
+
+@app.route('/estadisticas/fuentes')
+def estadisticas_fuentes():
+    """Historial por juego y fuente y el orden en que se probarían sin elección del usuario."""
+    fuentes_por_juego = {juego: coordinador.fuentes_de_juego(juego)[1] for juego in ("HSR", "ZZZ", "GI")}
+    return jsonify(coordinador.estadisticas.resumen(fuentes_por_juego))
+
+async def responder(data):
+    """Lógica de la conversación compartida por /chat y /chat/stream."""
     user_input = data.get('message', '').strip()
     state = data.get('state', {'step': 'initial'})
     json_response = {}
 
     if state['step'] == 'initial':
-        game, target_character, requested_keys = coordinador.analizar_consulta(user_input)
-        if not target_character:
+        consulta = coordinador.interpretar_consulta(user_input)
+        game, target_character, requested_keys = consulta['juego'], consulta['nombre_personaje'], consulta['claves_solicitadas']
+        if not target_character and consulta['sugerencias']:
+            sugerencias = ", ".join(f"<strong>{s.title()}</strong>" for s in consulta['sugerencias'])
+            json_response = {'response': f"No encontré ese personaje en {game}. ¿Quisiste decir: {sugerencias}?", 'state': {'step': 'initial'}}
+        elif not target_character:
             json_response = {'response': "No pude identificar el nombre del personaje. Por favor, sé más específico (ej: 'Build para Acheron HSR').", 'state': {'step': 'initial'}}
         else:
             state.update({'step': 'waiting_source', 'game': game, 'target_character': target_character, 'requested_keys': requested_keys})
@@ -46,84 +240,18 @@ def chat():
 
     elif state['step'] == 'waiting_language':
         state['target_language'] = user_input if user_input else 'es'
-#genera la build
-        result, error = coordinador.procesar_solicitud(
-            state['game'], state['target_character'], state['requested_keys'],
-            state.get('source_choice', ''), state.get('target_language', 'es')
-        )
-
-        images_list = []
-        try:
-            game_names = {
-                "HSR": "Honkai Star Rail",
-                "ZZZ": "Zenless Zone Zero", 
-                "GI": "Genshin Impact"
-            }
-            game_full = game_names.get(state['game'], state['game'])
-            etiqueta_busqueda = f"{state['target_character']} {game_full} hoyoverse"
-            
-            # Protocolo A2A para AgenteImagenes
-            msg_img = {
-                "cabecera": {"de": "OrquestadorFlask", "para": "AgenteImagenes", "accion": "BUSCAR_IMAGENES"},
-                "cuerpo": {
-                    "etiqueta": etiqueta_busqueda,
-                    "max_imagenes": 6
-                }
-            }
-            resp_img = agente_imagenes.recibir_mensaje(msg_img)
-            
-            if resp_img.get("estado") == "OK":
-                resultado_imagenes = resp_img["cuerpo"]
-                if resultado_imagenes["exito"]:
-                    images_list = resultado_imagenes["imagenes"]
-            else:
-                print(f"Error A2A Imagenes: {resp_img.get('error')}")
-
-        except Exception as e:
-            print(f"Error buscando imágenes: {e}")
-
-#esta parte ahce el response final
-        if result:
-            # Generar página HTML con la build
-            try:
-                # Protocolo A2A para AgenteGeneradorHTML
-                msg_html = {
-                    "cabecera": {"de": "OrquestadorFlask", "para": "AgenteGeneradorHTML", "accion": "GENERAR_HTML"},
-                    "cuerpo": {
-                        "build_data": result,
-                        "imagenes": images_list,
-                        "nombre_personaje": state['target_character'],
-                        "juego": state['game']
-                    }
-                }
-                resp_html = agente_html.recibir_mensaje(msg_html)
-                
-                if resp_html.get("estado") == "OK":
-                    resultado_html = resp_html["cuerpo"]
-                    if resultado_html["exito"]:
-                        print(f"✓ Página HTML generada: {resultado_html['ruta_archivo']}")
-                else:
-                    print(f"Error A2A HTML: {resp_html.get('error')}")
-
-            except Exception as e:
-                print(f"Error generando HTML: {e}")
-            
-            response_text = f"¡Aquí tienes la build para <strong>{state['target_character'].title()}</strong>!<br>¿Necesitas otra build?"
-            json_response = {
-                'response': response_text,
-                'data': result,
-                'images': images_list,  
-                'game': state.get('game'),
-                'state': {'step': 'initial'}
-            }
-        else:
-            response_text = f"Lo siento, hubo un error: {error}.<br>¿Quieres intentar con otro personaje?"
-            json_response = {'response': response_text, 'data': None, 'game': state.get('game'), 'state': {'step': 'initial'}}
+        # La build se genera en la cola de trabajos: la petición responde al instante con el id
+        prioridad = CONFIG_COLA_TRABAJOS["prioridad_build_guardada"] if coordinador.tiene_build_guardada(
+            state['game'], state['target_character']
+        ) else CONFIG_COLA_TRABAJOS["prioridad_por_defecto"]
+        id_trabajo = cola_trabajos.encolar(state, prioridad=prioridad)
+        response_text = f"Preparando la build de <strong>{state['target_character'].title()}</strong>..."
+        json_response = {'response': response_text, 'trabajo': id_trabajo, 'game': state.get('game'), 'state': {'step': 'initial'}}
 
     else:
         json_response = {'response': "Ha ocurrido un error de estado. Reiniciando.", 'state': {'step': 'initial'}}
 
-    return jsonify(json_response)
+    return json_response
 
 if __name__ == "__main__":
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,72 @@
+"""
+Sobrecarga propia del pipeline Condensador + Analista con el backend local (sin red).
+
+Lanza N análisis concurrentes con BackendStub (latencia simulada configurable) sobre
+textos sintéticos y compara el tiempo total con el ideal (latencia del modelo sola).
+La diferencia es el coste de prompt, caché, parseo, hilos y bucle de eventos.
+
+Uso:
+    python benchmarks/bench_analista.py --concurrencia 1 8 32 --latencia-ms 500
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agentes import configuraciones  # noqa: E402
+from agentes.backends_llm import BackendStub  # noqa: E402
+from agentes.configuraciones import CONFIG_HSR  # noqa: E402
+
+TEXTO_PAGINA = (
+    "Acheron is a Nihility DPS. Best light cone: Along the Passing Shore. Relic set: Pioneer Diver 4-piece. "
+    "Planar ornament: Izumo Gensei. Body: CRIT Rate. Feet: ATK% or SPD. Sphere: Lightning DMG. Rope: ATK%. "
+    "Team: Acheron, Pela, Silver Wolf, Aventurine. Log in to comment. "
+) * 40
+
+
+async def medir(concurrencia, latencia_ms):
+    from agentes.analista import AgenteAnalista
+    from agentes.condensador import AgenteCondensador
+
+    analista = AgenteAnalista(backend=BackendStub(latencia_ms=latencia_ms))
+    condensador = AgenteCondensador()
+
+    async def una(i):
+        inicio = time.perf_counter()
+        condensado = await condensador.procesar_solicitud_async({
+            "juego": "HSR", "nombre_personaje": f"acheron{i}", "contenido_texto": TEXTO_PAGINA + str(i)
+        })
+        await analista.analizar_texto_con_gemini_async(
+            "HSR", f"acheron{i}", condensado["contenido_texto"], CONFIG_HSR["esquema_build"], 4, "en"
+        )
+        return (time.perf_counter() - inicio) * 1000
+
+    inicio = time.perf_counter()
+    latencias = await asyncio.gather(*(una(i) for i in range(concurrencia)))
+    total_ms = (time.perf_counter() - inicio) * 1000
+    return total_ms, statistics.median(latencias)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrencia", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--latencia-ms", type=int, default=500)
+    args = parser.parse_args()
+
+    # Caché de análisis temporal: cada medición debe llegar al backend
+    with tempfile.TemporaryDirectory() as directorio:
+        configuraciones.CONFIG_CACHE_ANALISIS["directorio"] = directorio
+        print(f"{'concurrencia':>12}{'total ms':>10}{'mediana ms':>12}{'sobrecarga ms':>15}{'análisis/s':>12}")
+        for concurrencia in args.concurrencia:
+            total_ms, mediana_ms = asyncio.run(medir(concurrencia, args.latencia_ms))
+            print(f"{concurrencia:>12}{total_ms:>10.0f}{mediana_ms:>12.0f}{mediana_ms - args.latencia_ms:>15.1f}"
+                  f"{concurrencia / (total_ms / 1000):>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Rendimiento del intérprete de consultas del chat (AgenteCoordinador.analizar_consulta).
+
+Interpreta cada consulta del corpus N veces con AnalizadorConsultas sobre el
+nomenclátor que haya en disco (indice_personajes.json y *_builds.json) y mide
+consultas por segundo y latencia por consulta. La primera pasada incluye la
+construcción de los nomencládores; se informa aparte.
+
+Uso:
+    python benchmarks/bench_consultas.py
+    python benchmarks/bench_consultas.py --corpus benchmarks/consultas.txt --repeticiones 200 --detalle
+"""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agentes.indice_personajes import IndicePersonajes  # noqa: E402
+from agentes.parser_consultas import AnalizadorConsultas  # noqa: E402
+
+CORPUS_POR_DEFECTO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "consultas.txt")
+
+
+def cargar_corpus(ruta):
+    with open(ruta, 'r', encoding='utf-8') as f:
+        return [linea.strip() for linea in f if linea.strip() and not linea.startswith("#")]
+
+
+def interpretar_silencioso(analizador, consulta):
+    # Las correcciones se registran con print: fuera de la medición del resto del proceso
+    with contextlib.redirect_stdout(io.StringIO()):
+        return analizador.interpretar(consulta)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=CORPUS_POR_DEFECTO)
+    parser.add_argument("--repeticiones", type=int, default=100)
+    parser.add_argument("--detalle", action="store_true", help="Muestra la interpretación de cada consulta")
+    args = parser.parse_args()
+
+    consultas = cargar_corpus(args.corpus)
+    analizador = AnalizadorConsultas(IndicePersonajes())
+
+    inicio = time.perf_counter()
+    resultados = [interpretar_silencioso(analizador, consulta) for consulta in consultas]
+    primera_pasada_ms = (time.perf_counter() - inicio) * 1000
+
+    tiempos = []
+    for _ in range(args.repeticiones):
+        for consulta in consultas:
+            inicio = time.perf_counter()
+            interpretar_silencioso(analizador, consulta)
+            tiempos.append(time.perf_counter() - inicio)
+
+    if args.detalle:
+        for consulta, resultado in zip(consultas, resultados):
+            nombre = resultado["nombre_personaje"] or (
+                f"RECHAZADA, sugerencias: {resultado['sugerencias']}" if resultado["sugerencias"] else "SIN NOMBRE"
+            )
+            print(f"{consulta!r:55} -> {resultado['juego']} | {nombre}")
+        print()
+
+    reconocidas = sum(1 for r in resultados if r["nombre_personaje"])
+    rechazadas = sum(1 for r in resultados if not r["nombre_personaje"] and r["sugerencias"])
+    total_s = sum(tiempos)
+    print(f"Consultas: {len(consultas)} ({reconocidas} con personaje, {rechazadas} rechazadas con sugerencias)")
+    print(f"Primera pasada (construye los nomencládores): {primera_pasada_ms:.1f} ms")
+    print(f"Rendimiento: {len(tiempos) / total_s:,.0f} consultas/s")
+    print(f"Latencia: mediana {statistics.median(tiempos) * 1e6:.0f} µs, "
+          f"p95 {statistics.quantiles(tiempos, n=20)[-1] * 1e6:.0f} µs, máx {max(tiempos) * 1e6:.0f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Microbenchmark del parseo de páginas de build guardadas.
+
+Compara, por página y por fuente:
+- completo: BeautifulSoup(html, 'html.parser') de toda la página + extraer_texto (ruta original)
+- dirigido: agentes.parseo.extraer_texto_seccion (lxml si está instalado, si no SoupStrainer)
+
+Tiempo: mediana de N repeticiones. Memoria pico: aumento de ru_maxrss en un proceso hijo
+nuevo por medición (incluye la memoria nativa de lxml, que tracemalloc no ve).
+
+Uso:
+    python benchmarks/bench_parseo.py                 # páginas de cache_http/ (copias del ClienteHTTP)
+    python benchmarks/bench_parseo.py --directorio paginas/ --fuente Prydwen
+"""
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import resource
+import statistics
+import sys
+import time
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup  # noqa: E402
+from agentes.configuraciones import CONFIG_FUENTES  # noqa: E402
+from agentes.parseo import buscar_seccion, extraer_texto_seccion, lxml_html  # noqa: E402
+
+
+def parseo_completo(contenido_html, fuente):
+    sopa = BeautifulSoup(contenido_html, 'html.parser')
+    seccion = buscar_seccion(sopa, fuente)
+    return seccion.get_text(separator=' ', strip=True) if seccion else ""
+
+
+def parseo_dirigido(contenido_html, fuente):
+    return extraer_texto_seccion(contenido_html, fuente)
+
+
+METODOS = {"completo": parseo_completo, "dirigido": parseo_dirigido}
+
+
+def fuente_de_url(url):
+    host = urlparse(url).hostname or ""
+    for fuente, config in CONFIG_FUENTES.items():
+        if urlparse(config["dominio"]).hostname == host:
+            return fuente
+    return None
+
+
+def cargar_paginas(directorio, fuente_forzada=None):
+    paginas = []
+    for ruta_html in sorted(glob.glob(os.path.join(directorio, "*.html"))):
+        fuente = fuente_forzada
+        ruta_meta = ruta_html[:-5] + ".json"
+        if not fuente and os.path.exists(ruta_meta):
+            with open(ruta_meta, 'r', encoding='utf-8') as f:
+                fuente = fuente_de_url(json.load(f).get("url", ""))
+        if fuente:
+            paginas.append((ruta_html, fuente))
+    return paginas
+
+
+def _medir_memoria(metodo, ruta_html, fuente, cola):
+    with open(ruta_html, 'r', encoding='utf-8') as f:
+        contenido_html = f.read()
+    antes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    METODOS[metodo](contenido_html, fuente)
+    despues = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    cola.put((despues - antes) / 1024)  # ru_maxrss está en KB en Linux
+
+
+def medir(metodo, ruta_html, fuente, repeticiones):
+    with open(ruta_html, 'r', encoding='utf-8') as f:
+        contenido_html = f.read()
+
+    tiempos = []
+    longitud = 0
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        longitud = len(METODOS[metodo](contenido_html, fuente))
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+
+    contexto = multiprocessing.get_context("spawn")
+    cola = contexto.Queue()
+    proceso = contexto.Process(target=_medir_memoria, args=(metodo, ruta_html, fuente, cola))
+    proceso.start()
+    pico_mb = cola.get()
+    proceso.join()
+
+    return {"ms": statistics.median(tiempos), "pico_mb": pico_mb, "caracteres": longitud}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--directorio", default="cache_http")
+    parser.add_argument("--fuente", help="fuente de todas las páginas (si no, se deduce de los .json de cache_http)")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    paginas = cargar_paginas(args.directorio, args.fuente)
+    if not paginas:
+        print(f"No hay páginas .html con fuente conocida en '{args.directorio}'.")
+        return
+
+    print(f"Backend dirigido: {'lxml' if lxml_html is not None else 'html.parser + SoupStrainer'}")
+    print(f"{'fuente':<14}{'página':<44}{'completo ms':>12}{'MB':>8}{'dirigido ms':>13}{'MB':>8}{'chars =':>9}")
+    por_fuente = {}
+    for ruta_html, fuente in paginas:
+        completo = medir("completo", ruta_html, fuente, args.repeticiones)
+        dirigido = medir("dirigido", ruta_html, fuente, args.repeticiones)
+        por_fuente.setdefault(fuente, []).append((completo, dirigido))
+        mismo_texto = "sí" if abs(completo["caracteres"] - dirigido["caracteres"]) <= completo["caracteres"] * 0.02 else "no"
+        print(f"{fuente:<14}{os.path.basename(ruta_html)[:42]:<44}"
+              f"{completo['ms']:>12.1f}{completo['pico_mb']:>8.1f}{dirigido['ms']:>13.1f}{dirigido['pico_mb']:>8.1f}{mismo_texto:>9}")
+
+    print("\nMedias por fuente")
+    for fuente, medidas in por_fuente.items():
+        ms_c = statistics.mean(c["ms"] for c, _ in medidas)
+        ms_d = statistics.mean(d["ms"] for _, d in medidas)
+        mb_c = statistics.mean(c["pico_mb"] for c, _ in medidas)
+        mb_d = statistics.mean(d["pico_mb"] for _, d in medidas)
+        print(f"{fuente:<14} {len(medidas)} páginas  tiempo {ms_c:.1f} -> {ms_d:.1f} ms (x{ms_c / max(ms_d, 0.001):.1f})"
+              f"  memoria {mb_c:.1f} -> {mb_d:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
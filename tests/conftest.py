@@ -0,0 +1,85 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from agentes.analista import AgenteAnalista
+from agentes.backends_llm import BackendStub
+from agentes.coordinador import AgenteCoordinador
+from agentes.estadisticas_fuentes import EstadisticasFuentes
+from agentes.indice_personajes import IndicePersonajes
+from agentes.investigador import AgenteInvestigador
+from agentes.traductor import AgenteTraductor
+
+
+@pytest.fixture(autouse=True)
+def directorio_trabajo(tmp_path, monkeypatch):
+    """Los agentes guardan cachés e índices en rutas relativas: cada prueba en su propio directorio."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def crear_coordinador(directorio_trabajo):
+    """
+    crear_coordinador(**agentes) -> AgenteCoordinador con el backend stub, sin navegadores
+    y con estadísticas propias de la prueba; los agentes pasados sustituyen a los de serie.
+    """
+    def crear(**agentes):
+        agentes.setdefault("investigador", AgenteInvestigador(pool=object(), indice=IndicePersonajes(pool=object())))
+        agentes.setdefault("analista", AgenteAnalista(backend=BackendStub()))
+        agentes.setdefault("traductor", AgenteTraductor(backend=BackendStub()))
+        agentes.setdefault("estadisticas", EstadisticasFuentes())
+        return AgenteCoordinador(**agentes)
+    return crear
+
+
+class ServidorFixtures:
+    """
+    Servidor HTTP local con páginas fijas: rutas[ruta] = (estado, cabeceras, cuerpo).
+    Responde 304 si If-None-Match coincide con el ETag de la página.
+    """
+
+    def __init__(self):
+        self.rutas = {}
+        self.peticiones = []
+        servidor = self
+
+        class Manejador(BaseHTTPRequestHandler):
+            def do_GET(self):
+                servidor.peticiones.append((self.path, dict(self.headers)))
+                estado, cabeceras, cuerpo = servidor.rutas.get(self.path, (404, {}, ""))
+                if cabeceras.get("ETag") and self.headers.get("If-None-Match") == cabeceras["ETag"]:
+                    estado, cuerpo = 304, ""
+                datos = cuerpo.encode("utf-8")
+                self.send_response(estado)
+                for clave, valor in cabeceras.items():
+                    self.send_header(clave, valor)
+                self.send_header("Content-Length", str(len(datos)))
+                self.end_headers()
+                self.wfile.write(datos)
+
+            def log_message(self, *args):
+                pass
+
+        self.http = ThreadingHTTPServer(("127.0.0.1", 0), Manejador)
+        self.hilo = threading.Thread(target=self.http.serve_forever, daemon=True)
+
+    def url(self, ruta):
+        return f"http://127.0.0.1:{self.http.server_address[1]}{ruta}"
+
+    def pagina(self, ruta, cuerpo, estado=200, tipo="text/html; charset=utf-8", etag=None):
+        cabeceras = {"Content-Type": tipo}
+        if etag:
+            cabeceras["ETag"] = etag
+        self.rutas[ruta] = (estado, cabeceras, cuerpo)
+        return self.url(ruta)
+
+
+@pytest.fixture
+def servidor_fixtures():
+    servidor = ServidorFixtures()
+    servidor.hilo.start()
+    yield servidor
+    servidor.http.shutdown()
+    servidor.http.server_close()
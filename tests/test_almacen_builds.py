@@ -0,0 +1,93 @@
+import asyncio
+import threading
+
+from agentes.configuraciones import CONFIG_ALMACEN_BUILDS, CONFIG_HSR, FUENTE_PRYDWEN
+
+ACTUALIZADO = 1_000_000.0
+FRESCURA_S = CONFIG_ALMACEN_BUILDS["frescura_s"]["HSR"][FUENTE_PRYDWEN]
+CLAVES = ["build_name", "weapon_recommendations"]
+
+
+class Reloj:
+    def __init__(self, ahora):
+        self.ahora = ahora
+
+    def __call__(self):
+        return self.ahora
+
+
+def coordinador_con_almacen(crear_coordinador, ahora):
+    """
+    Coordinador con una build de Prydwen guardada en ACTUALIZADO y el reloj en ahora.
+    El rastreo se sustituye por uno que guarda "Build Nueva" cuando se le deja continuar.
+    """
+    coordinador = crear_coordinador()
+    coordinador.reloj = Reloj(ACTUALIZADO)
+    coordinador._guardar_build(
+        {"build_name": "Build Guardada", "weapon_recommendations": ["Along the Passing Shore"], "source": FUENTE_PRYDWEN},
+        CLAVES, CONFIG_HSR, "HSR", "Acheron", "guardada"
+    )
+    coordinador.reloj.ahora = ahora
+
+    rastreo = {"llamadas": 0, "iniciado": threading.Event(), "continuar": threading.Event(), "terminado": threading.Event()}
+    rastreo["continuar"].set()
+
+    async def rastrear_y_analizar(juego, nombre_personaje, claves_solicitadas, config_actual, prioridad_fuente, codigo_fuente_elegido, notificar=None):
+        rastreo["llamadas"] += 1
+        rastreo["iniciado"].set()
+        await asyncio.to_thread(rastreo["continuar"].wait, 5)
+        build = {"build_name": "Build Nueva", "weapon_recommendations": ["Along the Passing Shore"], "source": FUENTE_PRYDWEN}
+        coordinador._guardar_build(build, claves_solicitadas, config_actual, juego, nombre_personaje, "refresco")
+        rastreo["terminado"].set()
+        return build, FUENTE_PRYDWEN
+
+    coordinador._rastrear_y_analizar = rastrear_y_analizar
+    return coordinador, rastreo
+
+
+def pedir(coordinador, eventos):
+    return asyncio.run(coordinador.procesar_solicitud_async("HSR", "Acheron", CLAVES, None, "es", eventos.append))
+
+
+def test_build_fresca_se_sirve_sin_rastrear(crear_coordinador):
+    coordinador, rastreo = coordinador_con_almacen(crear_coordinador, ACTUALIZADO + 60)
+    eventos = []
+
+    build, aviso = pedir(coordinador, eventos)
+
+    assert build["build_name"] == "Build Guardada" and aviso is None
+    assert {"etapa": "build_almacenada", "fuente": FUENTE_PRYDWEN, "fresca": True, "antiguedad_s": 60} in eventos
+    assert rastreo["llamadas"] == 0
+
+
+def test_build_vencida_se_sirve_y_se_refresca_una_vez(crear_coordinador):
+    coordinador, rastreo = coordinador_con_almacen(crear_coordinador, ACTUALIZADO + FRESCURA_S + 60)
+    rastreo["continuar"].clear()
+    eventos = []
+
+    build, _ = pedir(coordinador, eventos)
+    assert build["build_name"] == "Build Guardada"
+    assert any(e["etapa"] == "build_almacenada" and not e["fresca"] for e in eventos)
+
+    # Otra petición mientras el refresco sigue en curso: se sirve la guardada y no se lanza otro
+    assert rastreo["iniciado"].wait(5)
+    build, _ = pedir(coordinador, [])
+    assert build["build_name"] == "Build Guardada"
+
+    rastreo["continuar"].set()
+    assert rastreo["terminado"].wait(5)
+    assert rastreo["llamadas"] == 1
+    guardada = coordinador._leer_build(CONFIG_HSR["ruta_archivo"], "HSR", "Acheron")
+    assert guardada["build_name"] == "Build Nueva"
+    assert coordinador._estado_almacenada("HSR", guardada, None) == "fresca"
+
+
+def test_build_demasiado_antigua_se_recalcula(crear_coordinador):
+    coordinador, rastreo = coordinador_con_almacen(crear_coordinador, ACTUALIZADO + CONFIG_ALMACEN_BUILDS["max_antiguedad_s"] + 60)
+    eventos = []
+
+    build, _ = pedir(coordinador, eventos)
+
+    assert build["build_name"] == "Build Nueva"
+    assert rastreo["llamadas"] == 1
+    assert not any(e["etapa"] == "build_almacenada" for e in eventos)
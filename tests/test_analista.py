@@ -0,0 +1,121 @@
+import asyncio
+import json
+
+from agentes.analista import AgenteAnalista
+from agentes.backends_llm import BackendStub
+from agentes.configuraciones import CONFIG_HSR, CONFIG_REINTENTOS_LLM
+
+ESQUEMA = CONFIG_HSR["esquema_build"]
+TEXTO = "Acheron. Best Light Cone: Along the Passing Shore. Relics: Pioneer Diver of Dead Waters. Team: Acheron, Pela."
+
+
+class BackendIncompleto(BackendStub):
+    """La primera respuesta llega sin las armas; el resto, sintetizadas por el stub."""
+
+    def __init__(self):
+        super().__init__()
+        self.prompts = []
+
+    def generar(self, prompt, config=None, modelo=None, prefijo=None, uso=None):
+        self.prompts.append(prompt)
+        respuesta = json.loads(super().generar(prompt, config, modelo, prefijo, uso))
+        if len(self.prompts) == 1:
+            respuesta.pop("weapon_recommendations")
+        return json.dumps(respuesta)
+
+
+class BackendInestable(BackendStub):
+    """Falla una vez con un error transitorio y después responde."""
+
+    def __init__(self):
+        super().__init__()
+        self.fallos_pendientes = 1
+
+    def es_transitorio(self, error):
+        return isinstance(error, ConnectionError)
+
+    def generar(self, prompt, config=None, modelo=None, prefijo=None, uso=None):
+        if self.fallos_pendientes:
+            self.fallos_pendientes -= 1
+            raise ConnectionError("503 sobrecargado")
+        return super().generar(prompt, config, modelo, prefijo, uso)
+
+
+def analizar(analista, texto=TEXTO):
+    return asyncio.run(analista.analizar_texto_con_gemini_async("HSR", "Acheron", texto, ESQUEMA, 4, "es"))
+
+
+def test_salida_valida_y_cacheada():
+    backend = BackendStub()
+    analista = AgenteAnalista(backend=backend)
+
+    build = analizar(analista)
+    assert build["weapon_recommendations"] == ["stub"]
+    assert set(build["main_stats_recommendations"]) == set(ESQUEMA["main_stats_recommendations"])
+    assert analista.metricas_tokens["llamadas"] == 1
+
+    assert analizar(analista) == build
+    assert backend.metricas["llamadas"] == 1
+
+
+def test_reparacion_pide_solo_los_campos_invalidos():
+    backend = BackendIncompleto()
+    analista = AgenteAnalista(backend=backend)
+
+    build = analizar(analista)
+
+    assert build["weapon_recommendations"] == ["stub"]
+    assert len(backend.prompts) == 2
+    assert "weapon_recommendations" in backend.prompts[1] and "team_recommendations" not in backend.prompts[1]
+    assert analista.metricas_desperdicio["reparaciones"] == 1
+    assert analista.metricas_desperdicio["campos_reparados"] == 1
+    assert analista.metricas_desperdicio["analisis_fallidos"] == 0
+
+
+def test_reintento_ante_error_transitorio(monkeypatch):
+    monkeypatch.setitem(CONFIG_REINTENTOS_LLM, "espera_inicial_s", 0.01)
+    analista = AgenteAnalista(backend=BackendInestable())
+
+    build = analizar(analista)
+
+    assert build is not None
+    assert analista.metricas_desperdicio["reintentos_api"] == 1
+    assert analista.metricas_desperdicio["analisis_fallidos"] == 0
+
+
+def test_error_no_transitorio_cuenta_el_prompt_completo():
+    class BackendRoto(BackendStub):
+        def generar(self, prompt, config=None, modelo=None, prefijo=None, uso=None):
+            raise ValueError("respuesta bloqueada")
+
+    analista = AgenteAnalista(backend=BackendRoto())
+
+    assert analizar(analista) is None
+    prefijo, prompt = analista._construir_prompt("HSR", "Acheron", TEXTO, ESQUEMA, 4, "es")
+    assert analista.metricas_desperdicio["analisis_fallidos"] == 1
+    assert analista.metricas_desperdicio["tokens_entrada_perdidos"] >= len(prefijo + prompt) // 4 - 1
+
+
+def test_lote_una_llamada_para_varios_personajes():
+    backend = BackendStub()
+    analista = AgenteAnalista(backend=backend)
+    pares = [("Acheron", TEXTO), ("Pela", "Pela. Team: Acheron, Pela."), ("Gallagher", "Gallagher. Team: Acheron, Gallagher.")]
+
+    builds = analista.analizar_lote("HSR", pares, ESQUEMA, 4)
+
+    assert all(builds[nombre] for nombre, _ in pares)
+    assert backend.metricas["llamadas"] == 1
+    assert analista.metricas_lote["reintentos_individuales"] == 0
+
+
+def test_reparacion_fallida_cuenta_el_prompt_completo():
+    class BackendVacio(BackendStub):
+        def generar(self, prompt, config=None, modelo=None, prefijo=None, uso=None):
+            return "{}"
+
+    analista = AgenteAnalista(backend=BackendVacio())
+
+    assert analizar(analista) is None
+    prefijo, prompt = analista._construir_prompt("HSR", "Acheron", TEXTO, ESQUEMA, 4, "es")
+    assert analista.metricas_desperdicio["analisis_fallidos"] == 1
+    assert analista.metricas_desperdicio["tokens_entrada_perdidos"] >= len(prefijo + prompt) // 4 - 1
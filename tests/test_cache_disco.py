@@ -0,0 +1,62 @@
+import os
+import time
+
+from agentes.cache_disco import CacheDisco
+
+
+def pagina(bytes_aleatorios=40000):
+    """Contenido incompresible: el .gz ocupa ~bytes_aleatorios (40 KB: caben dos en 0.1 MB)."""
+    return {"html": os.urandom(bytes_aleatorios).hex()}
+
+
+def test_acierto_y_fallo():
+    cache = CacheDisco("cache", ttl_s=3600, max_mb=None)
+    cache.guardar("https://prydwen.gg/acheron", {"texto": "Acheron"})
+
+    assert cache.obtener("https://prydwen.gg/acheron") == {"texto": "Acheron"}
+    assert cache.obtener("https://prydwen.gg/kafka") is None
+    assert cache.estadisticas()["aciertos"] == 1 and cache.estadisticas()["fallos"] == 1
+    # El índice persiste: otra instancia sobre el mismo directorio ve la entrada
+    assert CacheDisco("cache", ttl_s=3600, max_mb=None).obtener("https://prydwen.gg/acheron") == {"texto": "Acheron"}
+
+
+def test_entrada_vencida():
+    cache = CacheDisco("cache", ttl_s=3600, max_mb=None)
+    cache.guardar("corta", {"texto": "a"}, ttl_s=0.05)
+    cache.guardar("larga", {"texto": "b"})
+    time.sleep(0.1)
+
+    assert cache.obtener("corta") is None
+    assert cache.obtener("larga") == {"texto": "b"}
+    assert cache.estadisticas()["vencidas"] == 1
+    assert cache.purgar(solo_vencidas=True) == 1
+    assert cache.estadisticas()["entradas"] == 1
+
+
+def test_expulsion_lru_por_tamano():
+    cache = CacheDisco("cache", ttl_s=3600, max_mb=0.1)
+    cache.guardar("a", pagina())
+    time.sleep(0.01)
+    cache.guardar("b", pagina())
+    time.sleep(0.01)
+    cache.obtener("a")
+    time.sleep(0.01)
+
+    cache.guardar("c", pagina())
+
+    # "b" era la menos usada recientemente
+    assert cache.obtener("b") is None
+    assert cache.obtener("a") is not None and cache.obtener("c") is not None
+    assert cache.estadisticas()["expulsadas"] == 1
+    assert len([f for f in os.listdir("cache") if f.endswith(".gz")]) == 2
+
+
+def test_mismo_contenido_no_reescribe_el_valor():
+    cache = CacheDisco("cache", ttl_s=3600, max_mb=None)
+    cache.guardar("a", {"texto": "igual"})
+    ruta = cache._ruta_valor(cache._id("a"))
+    os.utime(ruta, (0, 0))
+
+    cache.guardar("a", {"texto": "igual"})
+
+    assert os.path.getmtime(ruta) == 0
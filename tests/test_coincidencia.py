@@ -0,0 +1,38 @@
+from agentes.coincidencia import IndiceDifuso
+
+PERSONAJES = [("Acheron", "acheron"), ("Kafka", "kafka"), ("Hu Tao", "hu tao"), ("Dan Heng", "dan heng"),
+              ("Dan Heng Imbibitor Lunae", "dan heng imbibitor lunae"),
+              ("Imbibitor Lunae", "dan heng imbibitor lunae"), ("IL", "dan heng imbibitor lunae")]
+
+
+def test_mejor_exacto_tras_normalizar():
+    indice = IndiceDifuso(PERSONAJES)
+    assert indice.mejor("HU-TAO", 0.75) == ("hu tao", 1.0, "hutao")
+
+
+def test_mejor_alias_resuelve_al_valor_canonico():
+    indice = IndiceDifuso(PERSONAJES)
+    assert indice.mejor("il", 0.75)[0] == "dan heng imbibitor lunae"
+
+
+def test_mejor_corrige_errores_de_escritura():
+    indice = IndiceDifuso(PERSONAJES)
+    valor, puntuacion, _ = indice.mejor("acheorn", 0.75)
+    assert valor == "acheron" and 0.75 <= puntuacion < 1.0
+
+
+def test_mejor_por_debajo_del_umbral():
+    indice = IndiceDifuso(PERSONAJES)
+    assert indice.mejor("seele", 0.75) is None
+
+
+def test_mejor_rechaza_empates_entre_valores_distintos():
+    indice = IndiceDifuso([("abcdx", "uno"), ("abcdy", "dos")])
+    assert indice.mejor("abcdz", 0.5) is None
+
+
+def test_buscar_un_candidato_por_valor():
+    indice = IndiceDifuso(PERSONAJES)
+    valores = [valor for valor, _, _ in indice.buscar("dan heng imbibitor", limite=5)]
+    assert len(valores) == len(set(valores))
+    assert valores[0] == "dan heng imbibitor lunae"
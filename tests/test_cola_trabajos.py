@@ -0,0 +1,166 @@
+import asyncio
+import time
+
+from agentes.cola_trabajos import ESTADOS_FINALES, ColaTrabajos
+from agentes.utilidades import en_hilo
+
+
+def crear_cola(ejecutar, **config):
+    return ColaTrabajos(ejecutar, dict({"ruta_bd": "trabajos.sqlite3", "trabajadores": 1}, **config))
+
+
+def esperar_fin(cola, id_trabajo, limite_s=5):
+    fin = time.monotonic() + limite_s
+    while time.monotonic() < fin:
+        trabajo = cola.obtener(id_trabajo)
+        if trabajo["estado"] in ESTADOS_FINALES:
+            return trabajo
+        time.sleep(0.02)
+    raise AssertionError(f"El trabajo sigue en estado {cola.obtener(id_trabajo)['estado']}")
+
+
+async def eco(datos, notificar):
+    notificar({"etapa": "analisis_iniciado"})
+    await asyncio.sleep(float(datos.get("espera_s", 0)))
+    return {"personaje": datos["personaje"]}
+
+
+async def bloqueante(datos, notificar):
+    # Trabajo en un hilo que no atiende la cancelación (como un análisis del modelo)
+    await en_hilo(time.sleep, datos["espera_s"])
+    return {"personaje": datos["personaje"]}
+
+
+def test_timeout_visible_aunque_el_bucle_tarde_en_cerrar():
+    async def hilo_del_bucle(datos, notificar):
+        # El ejecutor por defecto del bucle: asyncio.run espera a este hilo al cerrar
+        await asyncio.to_thread(time.sleep, 1.5)
+
+    cola = crear_cola(hilo_del_bucle)
+    id_trabajo = cola.encolar({}, timeout_s=0.2)
+    inicio = time.monotonic()
+    cola.iniciar()
+
+    assert esperar_fin(cola, id_trabajo)["estado"] == "expirado"
+    assert time.monotonic() - inicio < 1
+
+
+def test_trabajo_completado_con_eventos():
+    cola = crear_cola(eco)
+    id_trabajo = cola.encolar({"personaje": "acheron"})
+    eventos = cola.suscribir(id_trabajo)
+    cola.iniciar()
+
+    trabajo = esperar_fin(cola, id_trabajo)
+
+    assert trabajo["estado"] == "completado"
+    assert trabajo["resultado"] == {"personaje": "acheron"}
+    etapas = []
+    while (evento := eventos.get(timeout=1)) is not None:
+        etapas.append(evento["etapa"])
+    assert etapas == ["trabajo_iniciado", "analisis_iniciado", "trabajo_terminado"]
+
+
+def test_timeout_se_publica_sin_esperar_al_hilo():
+    cola = crear_cola(bloqueante)
+    lento = cola.encolar({"personaje": "lento", "espera_s": 3}, timeout_s=0.2)
+    rapido = cola.encolar({"personaje": "rapido", "espera_s": 0})
+    inicio = time.monotonic()
+    cola.iniciar()
+
+    assert esperar_fin(cola, lento)["estado"] == "expirado"
+    assert esperar_fin(cola, rapido)["estado"] == "completado"
+    # El trabajador queda libre al expirar, no cuando el hilo del trabajo lento termina
+    assert time.monotonic() - inicio < 1.5
+
+
+def test_cancelar_pendiente_y_en_curso():
+    ejecutados = []
+
+    async def registrar(datos, notificar):
+        ejecutados.append(datos["personaje"])
+        return await eco(datos, notificar)
+
+    cola = crear_cola(registrar)
+    en_curso = cola.encolar({"personaje": "largo", "espera_s": 10})
+    pendiente = cola.encolar({"personaje": "pendiente"})
+    cola.iniciar()
+    while cola.obtener(en_curso)["estado"] != "en_curso":
+        time.sleep(0.02)
+
+    assert cola.cancelar(pendiente)
+    assert cola.obtener(pendiente)["estado"] == "cancelado"
+    inicio = time.monotonic()
+    assert cola.cancelar(en_curso)
+    assert esperar_fin(cola, en_curso)["estado"] == "cancelado"
+    assert time.monotonic() - inicio < 1
+
+    assert not cola.cancelar(en_curso)
+    siguiente = cola.encolar({"personaje": "siguiente"})
+    assert esperar_fin(cola, siguiente)["estado"] == "completado"
+    assert ejecutados == ["largo", "siguiente"]
+
+
+def test_fallo_del_trabajo():
+    async def romper(datos, notificar):
+        raise ValueError("fuente caída")
+
+    cola = crear_cola(romper)
+    id_trabajo = cola.encolar({})
+    cola.iniciar()
+
+    trabajo = esperar_fin(cola, id_trabajo)
+    assert trabajo["estado"] == "fallido"
+    assert trabajo["error"] == "fuente caída"
+
+
+def test_prioridad_y_recuperacion_al_reiniciar():
+    ejecutados = []
+
+    async def registrar(datos, notificar):
+        ejecutados.append(datos["personaje"])
+        return datos
+
+    # Primera instancia: encola sin llegar a trabajar (el proceso "se cierra")
+    anterior = crear_cola(registrar)
+    normal = anterior.encolar({"personaje": "normal"})
+    urgente = anterior.encolar({"personaje": "urgente"}, prioridad=1)
+    tardio = anterior.encolar({"personaje": "tardio"})
+    assert [anterior.obtener(i)["posicion"] for i in (urgente, normal, tardio)] == [1, 2, 3]
+
+    cola = crear_cola(registrar)
+    cola.iniciar()
+
+    for id_trabajo in (normal, urgente, tardio):
+        assert esperar_fin(cola, id_trabajo)["estado"] == "completado"
+    assert ejecutados == ["urgente", "normal", "tardio"]
+    assert cola.obtener("no-existe") is None
+
+
+def test_cancelar_justo_al_tomarlo_un_trabajador():
+    """Cancelado entre que el trabajador lo saca de la cola y registra su tarea."""
+    ejecutados = []
+    publicados = []
+
+    async def registrar(datos, notificar):
+        ejecutados.append(datos)
+        await asyncio.sleep(1)
+
+    class ColaConVentana(ColaTrabajos):
+        def _publicar(self, id_trabajo, evento):
+            publicados.append(evento["etapa"])
+            super()._publicar(id_trabajo, evento)
+            if evento["etapa"] == "trabajo_iniciado":
+                assert self.cancelar(id_trabajo)
+
+    cola = ColaConVentana(registrar, {"ruta_bd": "trabajos.sqlite3", "trabajadores": 1})
+    id_trabajo = cola.encolar({"personaje": "acheron"})
+    cola.iniciar()
+
+    trabajo = esperar_fin(cola, id_trabajo)
+    time.sleep(0.2)
+
+    assert trabajo["estado"] == "cancelado"
+    assert publicados == ["trabajo_iniciado", "trabajo_terminado"]
+    assert ejecutados == []
+    assert id_trabajo not in cola._eventos
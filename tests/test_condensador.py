@@ -0,0 +1,57 @@
+from agentes.condensador import AgenteCondensador
+from agentes.configuraciones import CONFIG_CONDENSACION
+from agentes.utilidades import estimar_tokens
+
+
+def historia(i):
+    return f"Chapter {i} of the story follows the wanderer number {i} through a quiet valley at dusk."
+
+
+def consejo(i):
+    return f"Acheron tip {i}: use the light cone with a relic set {i}, aim for speed on feet and crit rate on body."
+
+
+def test_bajo_presupuesto_quita_duplicados_y_navegacion():
+    texto = "Acheron build guide for Honkai. Accept cookies and read our privacy policy. Acheron build guide for Honkai! Use crit rate on body."
+
+    condensado = AgenteCondensador().condensar(texto, "HSR", "Acheron")
+
+    assert condensado == "Acheron build guide for Honkai. Use crit rate on body."
+
+
+def test_sobre_presupuesto_conserva_lo_relevante_en_orden():
+    oraciones = [historia(i) for i in range(300)]
+    for i in range(0, 300, 30):
+        oraciones[i:i + 3] = [consejo(i), consejo(i + 1), consejo(i + 2)]
+    texto = " ".join(oraciones)
+    presupuesto = 1000
+    assert estimar_tokens(texto) > presupuesto
+
+    condensado = AgenteCondensador().condensar(texto, "HSR", "Acheron", presupuesto)
+
+    assert estimar_tokens(condensado) <= presupuesto
+    assert "Chapter" not in condensado
+    posiciones = [condensado.index(f"Acheron tip {i}:") for i in range(0, 300, 30)]
+    assert posiciones == sorted(posiciones)
+
+
+def test_presupuesto_por_defecto_del_juego():
+    texto = " ".join(consejo(i) for i in range(2000))
+    condensador = AgenteCondensador()
+
+    resultado = condensador.procesar_solicitud({"juego": "HSR", "nombre_personaje": "Acheron", "contenido_texto": texto})
+
+    assert resultado["tokens_antes"] == estimar_tokens(texto)
+    assert resultado["tokens_despues"] <= CONFIG_CONDENSACION["presupuesto_tokens"]["HSR"] + 1
+    assert condensador.metricas == {"textos": 1, "tokens_antes": resultado["tokens_antes"], "tokens_despues": resultado["tokens_despues"]}
+
+
+def test_oraciones_enormes_se_trocean():
+    tabla = " ".join(f"relic{i} speed crit" for i in range(200))
+    condensador = AgenteCondensador()
+
+    trozos = condensador._oraciones_unicas(tabla)
+
+    assert len(trozos) > 1
+    assert all(len(t) <= CONFIG_CONDENSACION["max_caracteres_oracion"] for t in trozos)
+    assert " ".join(trozos) == tabla
@@ -0,0 +1,33 @@
+import threading
+import time
+
+from agentes.utilidades import ejecutar_sincrono, en_hilo
+
+PRIORIDAD = [("Rapida", "https://rapida", "/"), ("Lenta", "https://lenta", "/")]
+
+
+def coordinador_con_fuentes(coordinador, duraciones, builds):
+    """Sustituye el intento de cada fuente por un hilo bloqueado durante su duración."""
+    terminadas = {}
+
+    async def intentar_fuente(codigo_fuente, url_base, segmento_ruta, config_actual, nombre_personaje, idioma_objetivo, notificar=None):
+        terminado = terminadas[codigo_fuente] = threading.Event()
+        await en_hilo(lambda: (time.sleep(duraciones[codigo_fuente]), terminado.set()))
+        return builds.get(codigo_fuente)
+
+    coordinador._intentar_fuente = intentar_fuente
+    return coordinador, terminadas
+
+
+def test_la_fuente_perdedora_no_retrasa_la_respuesta(crear_coordinador):
+    coordinador, terminadas = coordinador_con_fuentes(crear_coordinador(), {"Rapida": 0.2, "Lenta": 2.0}, {"Rapida": {"build_name": "A"}})
+
+    inicio = time.monotonic()
+    build, fuente = ejecutar_sincrono(coordinador._intentar_fuentes_concurrente(PRIORIDAD, 0, {}, "Acheron", "en"))
+    transcurrido = time.monotonic() - inicio
+
+    assert (build, fuente) == ({"build_name": "A"}, "Rapida")
+    # La respuesta llega con la fuente ganadora, no cuando termina el hilo de la perdedora
+    assert transcurrido < 1.0
+    assert not terminadas["Lenta"].is_set()
+
@@ -0,0 +1,47 @@
+from agentes.esquemas import esquema_respuesta, validar_build
+
+ESQUEMA = {
+    "character_name": "",
+    "game": "HSR",
+    "weapon_recommendations": [],
+    "main_stats_recommendations": {"body": "Cuerpo", "feet": "Pies"},
+    "team_recommendations": []
+}
+
+
+def test_validar_build_normaliza_tipos():
+    build, invalidos = validar_build({
+        "weapon_recommendations": "Along the Passing Shore",
+        "main_stats_recommendations": {"body": "CRIT Rate", "feet": 30, "extra": "x"},
+        "team_recommendations": ["Acheron, Pela"],
+        "desconocida": 1
+    }, ESQUEMA)
+
+    assert invalidos == []
+    assert build["weapon_recommendations"] == ["Along the Passing Shore"]
+    assert build["main_stats_recommendations"] == {"body": "CRIT Rate", "feet": "30"}
+    assert "desconocida" not in build
+    assert build["game"] == "HSR"
+
+
+def test_validar_build_informa_campos_invalidos():
+    build, invalidos = validar_build({
+        "weapon_recommendations": [{"nombre": "arma"}],
+        "main_stats_recommendations": "CRIT Rate"
+    }, ESQUEMA)
+
+    assert invalidos == ["weapon_recommendations", "main_stats_recommendations", "team_recommendations"]
+    assert build["weapon_recommendations"] == []
+    assert build["main_stats_recommendations"] == {"body": "", "feet": ""}
+
+
+def test_validar_build_sin_objeto():
+    build, invalidos = validar_build(["no", "es", "un", "objeto"], ESQUEMA)
+    assert len(invalidos) == 3
+    assert build["character_name"] == ""
+
+
+def test_esquema_respuesta_parcial_no_exige_metadatos():
+    esquema = esquema_respuesta(ESQUEMA, ["character_name", "weapon_recommendations"])
+    assert list(esquema["properties"]) == ["character_name", "weapon_recommendations"]
+    assert esquema["required"] == ["weapon_recommendations"]
@@ -0,0 +1,52 @@
+import asyncio
+
+from agentes.configuraciones import FUENTE_HONKAILAB, FUENTE_PRYDWEN
+from agentes.estadisticas_fuentes import EstadisticasFuentes
+
+
+def orden_de_fuentes(coordinador, eleccion_fuente=None):
+    """Códigos de fuente en el orden en que el Coordinador las intentaría para Acheron (HSR)."""
+    intentadas = []
+
+    async def rastrear_y_analizar(juego, nombre_personaje, claves_solicitadas, config_actual, prioridad_fuente, codigo_fuente_elegido, notificar=None):
+        intentadas.extend(s[0] for s in prioridad_fuente)
+        return None, None
+
+    coordinador._rastrear_y_analizar = rastrear_y_analizar
+    asyncio.run(coordinador.procesar_solicitud_async("HSR", "Acheron", ["build_name"], eleccion_fuente, "es"))
+    return intentadas
+
+
+def test_sin_historial_se_conserva_el_orden_configurado(crear_coordinador):
+    assert orden_de_fuentes(crear_coordinador()) == [FUENTE_PRYDWEN, FUENTE_HONKAILAB]
+
+
+def test_fuente_que_falla_pasa_detras(crear_coordinador):
+    estadisticas = EstadisticasFuentes()
+    for _ in range(4):
+        estadisticas.registrar("HSR", FUENTE_PRYDWEN, {"url_resuelta": True, "caracteres": 80, "viable": False, "ms_total": 3000})
+        estadisticas.registrar("HSR", FUENTE_HONKAILAB, {"url_resuelta": True, "caracteres": 9000, "viable": True, "ms_total": 3000})
+    coordinador = crear_coordinador(estadisticas=estadisticas)
+
+    assert orden_de_fuentes(coordinador) == [FUENTE_HONKAILAB, FUENTE_PRYDWEN]
+    assert estadisticas.resumen()["HSR"]["fuentes"][FUENTE_PRYDWEN]["texto_corto"] == 4
+
+
+def test_fuente_lenta_pasa_detras(crear_coordinador):
+    estadisticas = EstadisticasFuentes()
+    for _ in range(4):
+        estadisticas.registrar("HSR", FUENTE_PRYDWEN, {"url_resuelta": True, "caracteres": 9000, "viable": True, "ms_total": 40000})
+        estadisticas.registrar("HSR", FUENTE_HONKAILAB, {"url_resuelta": True, "caracteres": 9000, "viable": True, "ms_total": 4000})
+
+    assert orden_de_fuentes(crear_coordinador(estadisticas=estadisticas)) == [FUENTE_HONKAILAB, FUENTE_PRYDWEN]
+
+
+def test_la_eleccion_del_usuario_gana_al_historial(crear_coordinador):
+    estadisticas = EstadisticasFuentes()
+    for _ in range(4):
+        estadisticas.registrar("HSR", FUENTE_PRYDWEN, {"url_resuelta": False, "viable": False, "ms_total": 40000})
+    coordinador = crear_coordinador(estadisticas=estadisticas)
+
+    assert orden_de_fuentes(coordinador) == [FUENTE_HONKAILAB, FUENTE_PRYDWEN]
+    # '1' es Prydwen en el menú de fuentes de HSR
+    assert orden_de_fuentes(coordinador, "1") == [FUENTE_PRYDWEN, FUENTE_HONKAILAB]
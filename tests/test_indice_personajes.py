@@ -0,0 +1,41 @@
+from agentes.configuraciones import CONFIG_GI, FUENTE_GAMEWITH
+from agentes.indice_personajes import IndicePersonajes
+from agentes.investigador import AgenteInvestigador
+
+LISTADO_GAMEWITH = """
+<html><body><div id="page_content">
+  <a href="/genshin/article/show/407254">フリーナ</a>
+  <a href="/genshin/article/show/231234">胡桃の評価とおすすめ聖遺物</a>
+  <a href="/genshin/article/show/275000">雷電将軍</a>
+  <a href="/genshin/article/show/999999">新キャラ</a>
+  <a href="/genshin/ranking">最強キャラランキング</a>
+</div></body></html>
+"""
+
+
+def indice_con_gamewith():
+    indice = IndicePersonajes(pool=object(), config={"ruta_archivo": "indice.json"})
+    listado = indice._indexar(LISTADO_GAMEWITH, FUENTE_GAMEWITH, CONFIG_GI["url_base_secundaria"])
+    indice.datos["listados"][indice._clave("GI", FUENTE_GAMEWITH)] = listado
+    return indice
+
+
+def test_mapa_gamewith_completa_ids_con_nombres_japoneses():
+    mapa = indice_con_gamewith().mapa_gamewith()
+
+    assert "hutao" not in CONFIG_GI["mapa_id_gamewith"]
+    assert mapa["hutao"] == "231234"
+    assert mapa["raidenshogun"] == "275000"
+    # La semilla prevalece y los enlaces sin alias conocido no inventan entradas
+    assert mapa["furina"] == CONFIG_GI["mapa_id_gamewith"]["furina"]
+    assert "999999" not in mapa.values()
+
+
+def test_investigador_resuelve_por_id_fuera_de_la_semilla():
+    investigador = AgenteInvestigador(pool=object(), indice=indice_con_gamewith())
+
+    url = investigador.obtener_url_personaje(
+        CONFIG_GI["url_base_secundaria"], "Hu Tao", CONFIG_GI["segmento_ruta_secundaria"], FUENTE_GAMEWITH, "GI"
+    )
+
+    assert url == "https://gamewith.jp/genshin/article/show/231234"
@@ -0,0 +1,94 @@
+import asyncio
+import json
+
+from agentes.backends_llm import BackendStub
+from agentes.configuraciones import CONFIG_LOCALIZACION
+from agentes.traductor import AgenteTraductor
+
+BUILD_ES = {"character_name": "acheron", "build_name": "Mejor Build General", "weapon_recommendations": ["Lluvia Incesante"],
+            "main_stats_recommendations": {"body": "Tasa CRIT", "feet": "ATQ%"}, "team_recommendations": ["Acheron, Pela, Equipo No Encontrado"]}
+BUILD_EN = {"character_name": "lauma", "build_name": "Mejor Build General", "weapon_recommendations": ["A Thousand Floating Dreams"],
+            "team_recommendations": ["Team Not Found"], "main_stats_recommendations": {"sands": "Energy Recharge"}}
+
+
+class BackendSinTraducciones(BackendStub):
+    """El modelo responde, pero sin ninguna de las cadenas pedidas."""
+
+    def generar(self, prompt, config=None, modelo=None, prefijo=None, uso=None):
+        return "{}"
+
+
+class BackendEco(BackendStub):
+    """Devuelve cada cadena pedida con un prefijo, como si la hubiera traducido."""
+
+    def generar(self, prompt, config=None, modelo=None, prefijo=None, uso=None):
+        lista = json.loads(prompt[prompt.index("["):prompt.rindex("]") + 1])
+        return json.dumps({t: f"T:{t}" for t in lista}, ensure_ascii=False)
+
+
+class BackendEcoReal(BackendEco):
+    respuestas_reales = True
+
+
+def test_idioma_desconocido_se_rechaza(directorio_trabajo):
+    traductor = AgenteTraductor(backend=BackendEcoReal())
+    respuesta = asyncio.run(traductor.recibir_mensaje_async({
+        "cabecera": {"de": "Coordinador", "para": traductor.nombre, "accion": "TRADUCIR_BUILD"},
+        "cuerpo": {"juego": "HSR", "build": BUILD_ES, "idioma_origen": "es", "idioma_objetivo": "de"}
+    }))
+
+    assert respuesta["estado"] == "ERROR" and "'de'" in respuesta["error"]
+    assert not (directorio_trabajo / CONFIG_LOCALIZACION["ruta_glosario"]).exists()
+
+
+def test_alias_de_idioma_se_normaliza(directorio_trabajo):
+    traductor = AgenteTraductor(backend=BackendEcoReal())
+    resultado = asyncio.run(traductor.procesar_solicitud_async(
+        {"juego": "HSR", "build": BUILD_ES, "idioma_origen": "es", "idioma_objetivo": "JA"}
+    ))
+
+    assert resultado["build"]["weapon_recommendations"] == ["T:Lluvia Incesante"]
+    assert list(traductor.glosario.datos["HSR"]) == ["jp"]
+
+
+def test_respuestas_sinteticas_no_van_al_glosario(directorio_trabajo):
+    traductor = AgenteTraductor(backend=BackendEco())
+    resultado = asyncio.run(traductor.procesar_solicitud_async(
+        {"juego": "HSR", "build": BUILD_ES, "idioma_origen": "es", "idioma_objetivo": "en"}
+    ))
+
+    assert resultado["build"]["weapon_recommendations"] == ["T:Lluvia Incesante"]
+    assert traductor.glosario.datos == {}
+    assert not (directorio_trabajo / CONFIG_LOCALIZACION["ruta_glosario"]).exists()
+
+
+def test_mismo_idioma_no_traduce():
+    traductor = AgenteTraductor(backend=BackendSinTraducciones())
+    resultado = asyncio.run(traductor.procesar_solicitud_async(
+        {"juego": "HSR", "build": BUILD_ES, "idioma_origen": "es", "idioma_objetivo": "ES"}
+    ))
+    assert resultado == {"build": BUILD_ES, "sin_traducir": []}
+
+
+def test_traduccion_fallida_se_informa(crear_coordinador):
+    coordinador = crear_coordinador(traductor=AgenteTraductor(backend=BackendSinTraducciones()))
+    eventos = []
+
+    build, aviso = asyncio.run(coordinador._localizar("HSR", BUILD_ES, "es", "en", eventos.append))
+
+    assert build["weapon_recommendations"] == ["Lluvia Incesante"]
+    assert aviso and "'en'" in aviso
+    assert any(e["etapa"] == "traduccion_fallida" for e in eventos)
+
+
+def test_entrada_antigua_sin_fecha_se_recalcula(directorio_trabajo, crear_coordinador):
+    """Las entradas anteriores al almacén no tienen _actualizado: su edad es desconocida."""
+    ruta = directorio_trabajo / "hsr_builds.json"
+    ruta.write_text(json.dumps({"hsr_acheron": dict(BUILD_ES, source="Prydwen")}), encoding="utf-8")
+    contenido = ruta.read_bytes()
+    coordinador = crear_coordinador()
+
+    build = coordinador._leer_build("hsr_builds.json", "HSR", "acheron")
+
+    assert coordinador._estado_almacenada("HSR", build, None) is None
+    assert ruta.read_bytes() == contenido
@@ -0,0 +1,69 @@
+import asyncio
+
+from agentes.analista import AgenteAnalista
+from agentes.backends_llm import BackendStub
+from agentes.condensador import AgenteCondensador
+from agentes.configuraciones import CONFIG_CONDENSACION, CONFIG_HSR, CONFIG_MAP_REDUCE
+from agentes.esquemas import fusionar_builds
+from agentes.utilidades import estimar_tokens
+
+ESQUEMA = CONFIG_HSR["esquema_build"]
+
+
+def pagina_larga(oraciones=1200):
+    """Una guía enorme: todas las oraciones distintas y con vocabulario de build."""
+    return " ".join(
+        f"Acheron section {i}: the light cone number {i} pairs with relic set {i} and planar ornament {i}, "
+        f"aim for speed breakpoint {i} on feet and crit on body."
+        for i in range(oraciones)
+    )
+
+
+def test_pagina_larga_llega_fragmentada_al_analista(crear_coordinador):
+    texto = pagina_larga()
+    umbral = CONFIG_MAP_REDUCE["umbral_tokens"]["HSR"]
+    assert estimar_tokens(texto) > umbral
+    assert CONFIG_CONDENSACION["presupuesto_tokens"]["HSR"] < umbral
+
+    coordinador = crear_coordinador()
+    presupuesto = coordinador._presupuesto_condensacion("HSR", texto)
+    condensado = AgenteCondensador().procesar_solicitud(
+        {"juego": "HSR", "nombre_personaje": "Acheron", "contenido_texto": texto, "presupuesto_tokens": presupuesto}
+    )["contenido_texto"]
+    assert estimar_tokens(condensado) > umbral
+
+    backend = BackendStub()
+    analista = AgenteAnalista(backend=backend)
+    build = asyncio.run(analista.analizar_texto_con_gemini_async("HSR", "Acheron", condensado, ESQUEMA, 4, "es"))
+
+    assert build is not None
+    assert 1 < backend.metricas["llamadas"] <= CONFIG_MAP_REDUCE["max_fragmentos"]
+
+
+def test_pagina_normal_usa_el_presupuesto_del_juego(crear_coordinador):
+    coordinador = crear_coordinador()
+    assert coordinador._presupuesto_condensacion("HSR", pagina_larga(20)) is None
+
+
+def test_fusionar_builds():
+    parciales = [
+        {"weapon_recommendations": ["Along the Passing Shore", "Good Night and Sleep Well"],
+         "main_stats_recommendations": {"body": "CRIT Rate", "feet": "ATK%"},
+         "team_recommendations": ["Acheron, Pela, Jiaoqiu, Aventurine", "Equipo No Encontrado"],
+         "build_name": ""},
+        {"weapon_recommendations": ["good night and sleep well"],
+         "main_stats_recommendations": {"body": "CRIT DMG", "feet": "SPD"},
+         "team_recommendations": ["Pela, Acheron, Aventurine, Jiaoqiu", "Acheron, Silver Wolf, Pela, Fu Xuan"],
+         "build_name": "Fragmento 2"},
+        {"main_stats_recommendations": {"body": "CRIT Rate", "feet": ""}},
+    ]
+
+    fusion = fusionar_builds(parciales, ESQUEMA, max_equipos=3)
+
+    assert fusion["weapon_recommendations"] == ["Good Night and Sleep Well", "Along the Passing Shore"]
+    assert fusion["main_stats_recommendations"]["body"] == "CRIT Rate"
+    assert fusion["main_stats_recommendations"]["feet"] == "ATK%"
+    assert fusion["main_stats_recommendations"]["planar_sphere"] == ""
+    assert fusion["team_recommendations"] == ["Acheron, Pela, Jiaoqiu, Aventurine", "Acheron, Silver Wolf, Pela, Fu Xuan"]
+    assert fusion["build_name"] == "Fragmento 2"
+    assert fusion["game"] == "HSR"
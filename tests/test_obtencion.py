@@ -0,0 +1,110 @@
+import asyncio
+
+from agentes.configuraciones import FUENTE_HONKAILAB
+from agentes.investigador import AgenteInvestigador
+from agentes.obtencion import ClienteHTTP
+
+TEXTO_BUILD = "Acheron build: best light cone and relic sets, main stats and teams. " * 20
+
+
+def pagina_build(texto=TEXTO_BUILD, declaracion=""):
+    return f'{declaracion}<html><body><nav>menu</nav><div class="entry-content"><p>{texto}</p></div></body></html>'
+
+
+class PoolFalso:
+    """Sustituye al pool de Playwright: devuelve un HTML fijo y cuenta las tareas."""
+
+    def __init__(self, html):
+        self.html = html
+        self.tareas = 0
+
+    async def ejecutar_async(self, tarea):
+        self.tareas += 1
+        return self.html
+
+
+def crear_investigador(pool):
+    return AgenteInvestigador(pool=pool, indice=object())
+
+
+def test_ruta_http_sin_playwright(servidor_fixtures):
+    url = servidor_fixtures.pagina("/acheron", pagina_build())
+    pool = PoolFalso(pagina_build("no usado " * 100))
+
+    texto = asyncio.run(crear_investigador(pool).obtener_texto_async(url, FUENTE_HONKAILAB))
+
+    assert "best light cone" in texto and "menu" not in texto
+    assert pool.tareas == 0
+
+
+def test_texto_corto_recurre_a_playwright(servidor_fixtures):
+    url = servidor_fixtures.pagina("/corta", pagina_build("Cargando..."))
+    pool = PoolFalso(pagina_build())
+
+    texto = asyncio.run(crear_investigador(pool).obtener_texto_async(url, FUENTE_HONKAILAB))
+
+    assert "best light cone" in texto
+    assert pool.tareas == 1
+
+
+def test_error_http_recurre_a_playwright(servidor_fixtures):
+    url = servidor_fixtures.pagina("/caida", "error", estado=500)
+    pool = PoolFalso(pagina_build())
+
+    texto = asyncio.run(crear_investigador(pool).obtener_texto_async(url, FUENTE_HONKAILAB))
+
+    assert "best light cone" in texto
+    assert pool.tareas == 1
+
+
+def test_declaracion_de_codificacion_no_rompe_la_extraccion(servidor_fixtures):
+    url = servidor_fixtures.pagina("/xml", pagina_build(declaracion='<?xml version="1.0" encoding="utf-8"?>'))
+    pool = PoolFalso("")
+
+    texto = asyncio.run(crear_investigador(pool).obtener_texto_async(url, FUENTE_HONKAILAB))
+
+    assert "best light cone" in texto
+    assert pool.tareas == 0
+
+
+def test_excepcion_al_extraer_recurre_a_playwright(servidor_fixtures, monkeypatch):
+    url = servidor_fixtures.pagina("/rota", pagina_build())
+    pool = PoolFalso(pagina_build())
+    investigador = crear_investigador(pool)
+    original = investigador._extraer_de_html
+    llamadas = []
+
+    def extraer(contenido_html, codigo_fuente):
+        llamadas.append(codigo_fuente)
+        if len(llamadas) == 1:
+            raise ValueError("documento ilegible")
+        return original(contenido_html, codigo_fuente)
+
+    monkeypatch.setattr(investigador, "_extraer_de_html", extraer)
+    texto = asyncio.run(investigador.obtener_texto_async(url, FUENTE_HONKAILAB))
+
+    assert "best light cone" in texto
+    assert pool.tareas == 1
+
+
+def test_get_condicional_reutiliza_la_copia(servidor_fixtures):
+    url = servidor_fixtures.pagina("/etag", pagina_build(), etag='"v1"')
+    cliente = ClienteHTTP()
+
+    primera = cliente.obtener(url)
+    segunda = cliente.obtener(url)
+
+    assert primera == segunda
+    assert servidor_fixtures.peticiones[1][1].get("If-None-Match") == '"v1"'
+    assert cliente.metricas == {"descargas": 1, "revalidadas_304": 1, "errores": 0}
+
+
+def test_copias_acotadas_por_tamano(servidor_fixtures):
+    cliente = ClienteHTTP({"max_mb_copias": 0.01})
+    for i in range(6):
+        cuerpo = pagina_build(" ".join(f"palabra{i}-{j}" for j in range(2000)))
+        cliente.obtener(servidor_fixtures.pagina(f"/p{i}", cuerpo, etag=f'"{i}"'))
+
+    estadisticas = cliente.copias.estadisticas()
+    assert estadisticas["expulsadas"] > 0
+    assert estadisticas["tamano_mb"] <= 0.01
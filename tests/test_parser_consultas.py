@@ -0,0 +1,67 @@
+from agentes.coincidencia import IndiceDifuso
+from agentes.parser_consultas import CLAVES_BASE, CLAVES_BUILD_COMPLETA, AnalizadorConsultas
+
+NOMBRES = {
+    "HSR": [("acheron", "acheron"), ("aventurine", "aventurine"), ("march 7th", "march 7th"), ("m7", "march 7th"),
+            ("dan heng imbibitor lunae", "dan heng imbibitor lunae")],
+    "ZZZ": [("ellen", "ellen"), ("zhu yuan", "zhu yuan")],
+    "GI": [("furina", "furina"), ("hu tao", "hu tao")]
+}
+
+
+class IndiceFalso:
+    """Nomenclátor fijo; vigente indica si los listados están al día (nomenclátor completo)."""
+
+    def __init__(self, vigente=True):
+        self.vigente = vigente
+
+    def indice_nombres(self, juego):
+        return IndiceDifuso(NOMBRES[juego]) if juego in NOMBRES else None
+
+    def tiene_listado_vigente(self, juego):
+        return self.vigente
+
+
+def interpretar(consulta, vigente=True):
+    return AnalizadorConsultas(IndiceFalso(vigente)).interpretar(consulta)
+
+
+def test_nombre_exacto_decide_el_juego():
+    resultado = interpretar("build de hu tao")
+    assert (resultado["juego"], resultado["nombre_personaje"]) == ("GI", "hu tao")
+    assert resultado["claves_solicitadas"] == CLAVES_BASE + CLAVES_BUILD_COMPLETA["GI"]
+
+
+def test_alias_resuelve_al_nombre_canonico():
+    assert interpretar("build de m7")["nombre_personaje"] == "march 7th"
+    assert interpretar("dame la build de dan heng imbibitor lunae")["nombre_personaje"] == "dan heng imbibitor lunae"
+
+
+def test_palabra_de_juego_mal_escrita_se_corrige():
+    # Personaje aún sin listar: el juego solo se sabe por la palabra clave
+    resultado = interpretar("build de yidhari zenles", vigente=False)
+    assert (resultado["juego"], resultado["nombre_personaje"]) == ("ZZZ", "yidhari")
+
+
+def test_nombre_mal_escrito_se_corrige():
+    assert interpretar("build de acheorn honkai")["nombre_personaje"] == "acheron"
+
+
+def test_solo_las_claves_pedidas():
+    resultado = interpretar("armas y equipo de acheron")
+    assert resultado["claves_solicitadas"] == CLAVES_BASE + ["weapon_recommendations", "team_recommendations"]
+
+    resultado = interpretar("armas de acheron build completa")
+    assert resultado["claves_solicitadas"] == CLAVES_BASE + CLAVES_BUILD_COMPLETA["otros"]
+
+
+def test_nombre_desconocido_con_sugerencias():
+    resultado = interpretar("build de acherox aventura honkai")
+    assert resultado["nombre_personaje"] is None
+    assert "acheron" in resultado["sugerencias"]
+
+
+def test_nombre_desconocido_pasa_sin_listado_vigente():
+    resultado = interpretar("build de acherox aventura honkai", vigente=False)
+    assert resultado["nombre_personaje"] == "acherox aventura"
+    assert resultado["sugerencias"] == []
@@ -0,0 +1,84 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from agentes.configuraciones import CONFIG_COLA_TRABAJOS
+from agentes.pool_navegadores import PoolNavegadores
+
+
+class NavegadorFalso(threading.Thread):
+    """Consume la cola del pool como una ranura real, sin Playwright: funcion(None)."""
+
+    def __init__(self, pool):
+        super().__init__(daemon=True)
+        self.pool = pool
+
+    def run(self):
+        while (tarea := self.pool._tareas.get()) is not None:
+            funcion, _, futuro, inicio = tarea
+            if not futuro.set_running_or_notify_cancel():
+                continue
+            inicio.set_result(None)
+            try:
+                futuro.set_result(funcion(None))
+            except Exception as e:
+                futuro.set_exception(e)
+
+
+def crear_pool(navegadores=1):
+    pool = PoolNavegadores({"tamano": navegadores, "timeout_tarea_s": 0.5})
+    pool._ranuras = [NavegadorFalso(pool) for _ in range(navegadores)]
+    for ranura in pool._ranuras:
+        ranura.start()
+    return pool
+
+
+def tarea(duracion_s, resultado, ejecutadas=None):
+    def _tarea(pagina):
+        if ejecutadas is not None:
+            ejecutadas.append(resultado)
+        time.sleep(duracion_s)
+        return resultado
+    return _tarea
+
+
+def test_tamano_por_defecto_cubre_las_tareas_de_cada_trabajo():
+    assert PoolNavegadores().config["tamano"] >= 2 * CONFIG_COLA_TRABAJOS["trabajadores"]
+
+
+def test_la_espera_en_cola_no_agota_el_timeout():
+    pool = crear_pool()
+
+    async def dos_tareas():
+        # La segunda espera 0.4 s a que el único navegador quede libre: en total supera el timeout
+        return await asyncio.gather(pool.ejecutar_async(tarea(0.4, "a")), pool.ejecutar_async(tarea(0.2, "b")))
+
+    assert asyncio.run(dos_tareas()) == ["a", "b"]
+    assert pool.ejecutar(tarea(0.1, "c")) == "c"
+    pool.cerrar()
+
+
+def test_timeout_desde_el_inicio():
+    pool = crear_pool()
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(pool.ejecutar_async(tarea(1.0, "lenta")))
+    pool.cerrar()
+
+
+def test_cancelada_en_cola_no_se_ejecuta():
+    pool = crear_pool()
+    ejecutadas = []
+
+    async def cancelar_la_segunda():
+        primera = asyncio.ensure_future(pool.ejecutar_async(tarea(0.3, "primera", ejecutadas)))
+        segunda = asyncio.ensure_future(pool.ejecutar_async(tarea(0.1, "segunda", ejecutadas)))
+        await asyncio.sleep(0.1)
+        segunda.cancel()
+        return await primera
+
+    assert asyncio.run(cancelar_la_segunda()) == "primera"
+    time.sleep(0.3)
+    assert ejecutadas == ["primera"]
+    pool.cerrar()
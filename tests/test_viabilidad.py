@@ -0,0 +1,56 @@
+from agentes.configuraciones import CONFIG_VIABILIDAD, FUENTE_GAMEWITH, FUENTE_PRYDWEN
+from agentes.viabilidad import FiltroViabilidad
+
+RELLENO = "The story section talks about the Emanator of Nihility and her long journey across the stars. "
+TERMINOS = ["light cone", "relic", "planar", "ornament", "body", "feet", "speed", "break effect", "eidolon", "trace"]
+
+
+def pagina(aciertos, relleno=12, nombre="Acheron"):
+    """Guía de `nombre` con relleno y los primeros `aciertos` términos de build de HSR."""
+    return f"{nombre} guide. " + RELLENO * relleno + " ".join(f"Use {t}." for t in TERMINOS[:aciertos])
+
+
+def motivo(texto, nombre="Acheron", codigo_fuente=FUENTE_PRYDWEN, **config):
+    return FiltroViabilidad(config).evaluar("HSR", nombre, texto, codigo_fuente)["motivo"]
+
+
+def test_pagina_de_build_pasa():
+    resultado = FiltroViabilidad().evaluar("HSR", "Acheron", pagina(10), FUENTE_PRYDWEN)
+    assert resultado["viable"] and resultado["motivo"] is None
+    assert resultado["aciertos"] == resultado["terminos"] == 10
+
+
+def test_texto_corto():
+    texto = pagina(10, relleno=0)
+    assert len(texto) < CONFIG_VIABILIDAD["min_caracteres"]
+    assert motivo(texto) == "texto_corto"
+
+
+def test_umbral_de_aciertos():
+    minimo = CONFIG_VIABILIDAD["min_aciertos"]
+    assert motivo(pagina(minimo - 1)) == "sin_vocabulario_build"
+    assert motivo(pagina(minimo)) is None
+
+
+def test_umbral_de_terminos_distintos():
+    repetida = "Acheron guide. " + RELLENO * 12 + "Use relic. " * 10
+    assert motivo(repetida) == "sin_vocabulario_build"
+    assert motivo(repetida, min_terminos_distintos=1) is None
+
+
+def test_vocabulario_disperso():
+    assert motivo(pagina(10, relleno=1000)) == "vocabulario_disperso"
+    assert motivo(pagina(10, relleno=1000), min_densidad=0.1) is None
+
+
+def test_aviso_solo_descarta_paginas_cortas_sin_vocabulario():
+    assert motivo("Acheron. Access denied. " + RELLENO * 8) == "pagina_de_aviso"
+    # Una build con banner de cookies no es una página de aviso
+    assert motivo("We value your privacy. Accept all cookies. " + pagina(10) * 2) is None
+
+
+def test_nombre_del_personaje():
+    assert motivo(pagina(10, nombre="Kafka")) == "sin_nombre_personaje"
+    assert motivo(pagina(10, nombre="March"), nombre="March 7th") is None
+    # GameWith escribe el nombre en japonés: no se exige
+    assert motivo(pagina(10, nombre="アケロン"), codigo_fuente=FUENTE_GAMEWITH) is None
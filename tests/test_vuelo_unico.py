@@ -0,0 +1,94 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from agentes.vuelo_unico import VueloUnico
+
+
+def test_peticiones_simultaneas_comparten_una_ejecucion():
+    vuelo = VueloUnico("Prueba")
+    ejecuciones = []
+    eventos = []
+
+    async def calcular(notificar):
+        ejecuciones.append(1)
+        await asyncio.sleep(0.2)
+        notificar({"etapa": "analisis_completado"})
+        return {"build": ["Acheron"]}
+
+    async def peticiones():
+        return await asyncio.gather(*(vuelo.ejecutar("hsr:acheron", calcular, eventos.append) for _ in range(5)))
+
+    resultados = asyncio.run(peticiones())
+
+    assert len(ejecuciones) == 1
+    assert all(r == {"build": ["Acheron"]} for r in resultados)
+    # Cada seguidor recibe su propia copia
+    resultados[1]["build"].append("Pela")
+    assert resultados[0]["build"] == ["Acheron"]
+    assert vuelo.metricas["compartidas"] == 4
+    assert [e["etapa"] for e in eventos].count("solicitud_compartida") == 4
+    assert [e["etapa"] for e in eventos].count("analisis_completado") == 5
+
+
+def test_comparte_entre_hilos_con_bucles_distintos():
+    """Como Flask: cada petición en su propio hilo y bucle de eventos."""
+    vuelo = VueloUnico("Prueba")
+    ejecuciones = []
+    resultados = []
+
+    async def calcular(notificar):
+        ejecuciones.append(1)
+        await asyncio.sleep(0.3)
+        return "build"
+
+    def peticion():
+        resultados.append(asyncio.run(vuelo.ejecutar("clave", calcular)))
+
+    hilos = [threading.Thread(target=peticion) for _ in range(3)]
+    for hilo in hilos:
+        hilo.start()
+        time.sleep(0.02)
+    for hilo in hilos:
+        hilo.join()
+
+    assert ejecuciones == [1]
+    assert resultados == ["build"] * 3
+
+
+def test_suscriptor_que_falla_no_rompe_al_seguidor():
+    vuelo = VueloUnico("Prueba")
+
+    async def calcular(notificar):
+        await asyncio.sleep(0.1)
+        return 42
+
+    def desconectado(evento):
+        raise BrokenPipeError("cliente desconectado")
+
+    async def peticiones():
+        return await asyncio.gather(vuelo.ejecutar("k", calcular), vuelo.ejecutar("k", calcular, desconectado))
+
+    assert asyncio.run(peticiones()) == [42, 42]
+
+
+def test_error_del_lider_llega_a_los_seguidores():
+    vuelo = VueloUnico("Prueba")
+
+    async def calcular(notificar):
+        await asyncio.sleep(0.1)
+        raise ValueError("fuente caída")
+
+    async def peticiones():
+        return await asyncio.gather(*(vuelo.ejecutar("k", calcular) for _ in range(3)), return_exceptions=True)
+
+    resultados = asyncio.run(peticiones())
+    assert all(isinstance(r, ValueError) for r in resultados)
+    assert vuelo.metricas["en_vuelo"] == 0
+
+    # Tras el fallo la clave queda libre: la siguiente petición vuelve a calcular
+    with pytest.raises(ValueError):
+        asyncio.run(vuelo.ejecutar("k", calcular))
+    assert vuelo.metricas["ejecuciones"] == 2